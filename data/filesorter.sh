@@ -2,43 +2,31 @@
 
 # via Jakub Adamski :D
 
-REPOS=$(ls processed-commits_*.csv | sed 's/.\{15\}$//' | uniq)
-for r in $REPOS
+# Processed data is in dataset/repo=<repo>/date=<date>/stage=<stage>/
+# partitions (see githubanalysis/processing/dataset_catalog.py).
+# For each repo and stage, keep the latest date's partition and move
+# older ones to the same path under older_dataset/; then move 2024
+# partitions there too.
+
+move_to_older() {
+    mkdir -p "older_$(dirname "$1")"
+    mv "$1" "older_$(dirname "$1")/"
+}
+
+for REPO in dataset/repo=*/
 do
-    ALL=($(ls $r* | sort -r))
-    [ ${#ALL[@]} -gt 1 ] && mv "${ALL[@]:1}" older_processed_commits/
+    STAGES=$(ls -d "$REPO"date=*/stage=* | sed 's/.*\/stage=//' | sort -u)
+    for STAGE in $STAGES
+    do
+        ALL=($(ls -d "$REPO"date=*/stage="$STAGE" | sort -r))
+        for OLD in "${ALL[@]:1}"
+        do
+            move_to_older "$OLD"
+        done
+    done
 done
 
-REPOS=$(ls processed-commits_*_2024*.csv)
-mv $REPOS older_processed_commits/
-
-REPOS=$(ls processed-issues_*.csv | sed 's/.\{15\}$//' | uniq)
-for r in $REPOS
-do
-    ALL=($(ls $r* | sort -r))
-    [ ${#ALL[@]} -gt 1 ] && mv "${ALL[@]:1}" older_processed_issues/
-done
-
-REPOS=$(ls processed-issues_*_2024*.csv)
-mv $REPOS older_processed_issues/
-
-REPOS=$(ls commits_changes_*.csv | sed 's/.\{15\}$//' | uniq)
-for r in $REPOS
+for OLD in dataset/repo=*/date=2024-*/stage=*
 do
-    ALL=($(ls $r* | sort -r))
-    [ ${#ALL[@]} -gt 1 ] && mv "${ALL[@]:1}" older_commits_changes/
+    [ -d "$OLD" ] && move_to_older "$OLD"
 done
-
-REPOS=$(ls commits_changes_*_2024*.csv)
-mv $REPOS older_commits_changes/
-
-REPOS=$(ls commits_cats_stats_*.csv | sed 's/.\{15\}$//' | uniq)
-for r in $REPOS
-do
-    ALL=($(ls $r* | sort -r))
-    [ ${#ALL[@]} -gt 1 ] && mv "${ALL[@]:1}" older_commits_cats_stats/
-done
-
-REPOS=$(ls commits_cats_stats_*_2024*.csv)
-mv $REPOS older_commits_cats_stats/
-
@@ -5,10 +5,12 @@ from pathlib import Path
 import gc
 import datetime
 import argparse
+import hashlib
 
 import logging
 import utilities.get_default_logger as loggit
 from utilities.repo_names_write_out import RepoNamesListCreator
+from utilities.frame_storage import read_frame
 from githubanalysis.visualization.plot_dendrogram import Dendrogrammer
 from githubanalysis.visualization.plot_multidim_PCA import PlotPCA
 
@@ -16,7 +18,7 @@ import random
 import pandas as pd
 import numpy as np
 
-from sklearn.cluster import AgglomerativeClustering
+from scipy.cluster.hierarchy import linkage, cut_tree
 from sklearn.metrics import calinski_harabasz_score
 from sklearn.decomposition import PCA
 
@@ -61,6 +63,13 @@ def contribution_types_editor(CBRI: int, rough_type_cat: str) -> str:
         return "creates commits and creates issues and assigned issues"
 
 
+def clustering_data_key(clustering_data: pd.DataFrame) -> str:
+    """Fingerprint of `clustering_data`'s columns and values, to key its cached linkage by."""
+    digest = hashlib.sha1(repr(list(clustering_data.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(clustering_data, index=False).values)
+    return digest.hexdigest()
+
+
 class DataAnalyser:
     logger: logging.Logger
     in_notebook: bool
@@ -100,6 +109,8 @@ class DataAnalyser:
         )
         self.data_write_location.mkdir()
         self.image_write_location.mkdir()
+        # ward linkage per clustering dataset (see get_ward_linkage())
+        self.ward_linkages: dict[str, np.ndarray] = {}
 
     def subset_sample_to_repos(
         self,
@@ -517,6 +528,24 @@ class DataAnalyser:
         clustering_data = cleaned_data_with_interactions[clustering_variables]
         return clustering_data
 
+    def get_ward_linkage(self, clustering_data: pd.DataFrame) -> np.ndarray:
+        """
+        Ward (euclidean) hierarchical clustering linkage of `clustering_data`,
+        as from scipy's `linkage()`. It's computed once per dataset and kept,
+        so evaluating each N of clusters, the final cluster labels and the
+        dendrograms all cut the same tree rather than re-clustering.
+        """
+        key = clustering_data_key(clustering_data)
+        if key not in self.ward_linkages:
+            gc.collect()  # the linkage needs a distance matrix of n^2/2 floats
+            self.logger.info(
+                f"Computing ward linkage for clustering data of shape {clustering_data.shape}."
+            )
+            self.ward_linkages[key] = linkage(
+                clustering_data, method="ward", metric="euclidean"
+            )
+        return self.ward_linkages[key]
+
     def evaluate_n_clusters(
         self,
         clustering_data: pd.DataFrame,
@@ -541,26 +570,16 @@ class DataAnalyser:
         self.logger.info(f"clustering data is df, with shape: {clustering_data.shape}.")
 
         X = clustering_data  # sample data, naming according to clustering/ML practices
+        # range: start at 2 because need min of 2 clusters
+        # end on max_clusters_to_eval number, increases by 1
+        eval_ns = list(range(2, max_clusters_to_eval + 1, 1))
         eval_chs = []
-        eval_ns = []
-
-        for n_clusters in range(2, max_clusters_to_eval + 1, 1):
-            # range: start at 2 because need min of 2 clusters
-            # end on max_clusters_to_eval number, increases by 1
-            gc.collect()
 
-            model = AgglomerativeClustering(
-                n_clusters=n_clusters,
-                metric="euclidean",
-                linkage="ward",
-            )
-            model_predictions = model.fit_predict(X)
-            cluster_labels = model_predictions
+        # one column of cluster labels per n_clusters, all cut from the same tree
+        all_cluster_labels = cut_tree(self.get_ward_linkage(X), n_clusters=eval_ns)
+        for n_clusters, cluster_labels in zip(eval_ns, all_cluster_labels.T):
             eval_chs.append(calinski_harabasz_score(X, cluster_labels))
-            eval_ns.append(n_clusters)
-            self.logger.info(
-                f"CH score for n_clusters {n_clusters} is {calinski_harabasz_score(X, cluster_labels)}."
-            )
+            self.logger.info(f"CH score for n_clusters {n_clusters} is {eval_chs[-1]}.")
         eval_df = pd.DataFrame(  # return df of scores per n of clusters evaluated.
             {
                 "CH_score": eval_chs,
@@ -614,20 +633,17 @@ class DataAnalyser:
             generate_clusters = best_n_clusters
             self.logger.info(f"Generating best_n_clusters: {best_n_clusters}.")
 
-        model = AgglomerativeClustering(
-            n_clusters=generate_clusters, metric="euclidean", linkage="ward"
-        )
-
         X = clustering_data
         self.logger.info(
             f"Attempting clustering with dataset shape {clustering_data.shape} and {len(clustering_data.columns)} columns: {clustering_data.columns}."
         )
 
-        # fit the hierarchical clustering algorithm to dataset X
-        model_predictions = model.fit_predict(X)
-        # create the cluster_labels vector showing which cluster
+        # cut the dataset's hierarchical clustering tree into generate_clusters
+        # clusters, giving the cluster_labels vector showing which cluster
         # each repo-individual belongs to
-        cluster_labels = model_predictions
+        cluster_labels = cut_tree(
+            self.get_ward_linkage(X), n_clusters=generate_clusters
+        )[:, 0]
 
         return cluster_labels
 
@@ -833,7 +849,7 @@ class DataAnalyser:
             filename="sample_cleaned_data_",
         )
 
-        interact = pd.read_csv(
+        interact = read_frame(
             interactions_data_file,
             header=0,
             low_memory=False,
@@ -948,6 +964,7 @@ class DataAnalyser:
         dendrogrammer.plot_dendrogram(
             clustering_data=clustering_data,
             colours=["#D50032", "#1D2A3D", "#FDBC42"],
+            ward_clustering=self.get_ward_linkage(clustering_data),
         )
 
         # clustering:
@@ -1138,7 +1155,7 @@ def main():
     )
 
     # dataanalyser.read_location
-    data_df = pd.read_csv(
+    data_df = read_frame(
         Path(dataanalyser.data_read_location, data_arg),
         header=0,
         low_memory=False,
@@ -5,6 +5,13 @@
 # in 2008 23rd IEEE/ACM International Conference on Automated Software Engineering - Workshops, Sep. 2008, pp. 63–71.
 # doi: 10.1109/ASEW.2008.4686322.
 
+import numpy as np
+import pandas as pd
+
+# lower edges of size categories (numbers of files changed), for np.digitize()
+SIZE_BINS = [1, 6, 26, 126]
+SIZE_CATEGORIES = np.array([None, "tiny", "small", "medium", "large"], dtype=object)
+
 
 def hattori_lanza_commit_size_classification(commit_size: int | None) -> str | None:
     """
@@ -43,3 +50,22 @@ def hattori_lanza_commit_size_classification(commit_size: int | None) -> str | N
         return "large"
     else:
         return None
+
+
+def classify_commit_sizes(commit_sizes: pd.Series) -> pd.Series:
+    """
+    Hattori-Lanza size category of each of `commit_sizes` (numbers of
+    files changed), as hattori_lanza_commit_size_classification() but for
+    a whole column at once: binned with np.digitize() on SIZE_BINS.
+    Missing (NaN/None) and zero sizes get None.
+
+    :param commit_sizes: number of unique files changed per commit
+    :type: pd.Series
+    :return: category per commit ("tiny", "small", "medium", "large" or None), with the same index
+    :rtype: pd.Series
+    """
+    sizes = pd.to_numeric(commit_sizes, errors="coerce").to_numpy(dtype=float)
+    assert not (sizes < 0).any(), "Warning! Cannot process negative numbers."
+    bin_numbers = np.digitize(sizes, SIZE_BINS)
+    bin_numbers[np.isnan(sizes)] = 0  # NaN would otherwise land in the top bin
+    return pd.Series(SIZE_CATEGORIES[bin_numbers], index=commit_sizes.index)
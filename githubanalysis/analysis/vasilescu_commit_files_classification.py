@@ -1,11 +1,16 @@
 """Application of Vasilescu et al. 2014 method of classifying commits by filetypes of files changed, using pre-obtained github commit data for Research Software repositories"""
 
+import functools
 import logging
+import numpy as np
 import pandas as pd
 import re
 
 import utilities.get_default_logger as loggit
 
+# most recently used filenames to keep categories of (see first_matching_category())
+FILENAME_MEMO_SIZE = 100_000
+
 
 class Vasilescu_Commit_Classifier:
     logger: logging.Logger
@@ -431,6 +436,14 @@ class Vasilescu_Commit_Classifier:
             "unknown": self.cat_unknown,  # Unknown
         }
 
+        # compiled once: one pattern per category, plus all categories in one
+        self.category_patterns = {
+            cat: re.compile(category_alternation(filetypes))
+            for cat, filetypes in self.cat_list_dict.items()
+        }
+        self.any_category_pattern = make_any_category_pattern(self.cat_list_dict)
+        self.category_rank = {cat: i for i, cat in enumerate(self.cat_list_dict)}
+
     def vasilescu_check_category(self, category: str, filestr: str) -> str:
         """
         This checks a given filename string `filestr` against a specified
@@ -445,31 +458,56 @@ class Vasilescu_Commit_Classifier:
         ), f"WARNING! Your category must match one of the following: {self.cat_list_dict.keys()} OR 'any' to search ALL categories."
         assert isinstance(filestr, str)
 
-        v_cat = "no_categorisation"
-        search_cat = category
-
-        if (
-            search_cat == "any"
-        ):  # run ALL the search categories in the order specified, using this function recursively.
-            for cat in self.cat_list_dict.keys():
-                check_rslt = self.vasilescu_check_category(
-                    category=cat, filestr=filestr
-                )
-                if check_rslt != "no_categorisation":
-                    v_cat = check_rslt
-                    return v_cat
-                    break  # break means we're returning the FIRST matching category.
+        # rules are all lower case; matching lower-cased filenames is
+        # the same as re.IGNORECASE but quicker
+        if category == "any":
+            # first category (in order) with a matching rule: see make_any_category_pattern()
+            return first_matching_category(self.any_category_pattern, filestr.lower())
 
-        else:
-            for filetype in self.cat_list_dict[search_cat]:
-                if re.search(filetype, filestr, flags=re.IGNORECASE):
-                    v_cat = search_cat
-                    return v_cat
-                    break
-                else:
-                    continue
+        if self.category_patterns[category].match(filestr.lower()):
+            return category
+        return "no_categorisation"
+
+    def classify_filenames(self, filenames) -> np.ndarray:
+        """
+        Vasilescu category (as vasilescu_check_category(category='any')) of
+        each of `filenames` (list, array or pd.Series of str); each distinct
+        filename is checked once.
+
+        :param filenames: filenames (with paths) of files changed
+        :type: list | np.ndarray | pd.Series
+        :return: category per filename, in the same order
+        :rtype: np.ndarray
+        """
+        filenames = np.asarray(filenames, dtype=object)
+        unique_filenames, positions = np.unique(filenames, return_inverse=True)
+        categories = np.array(
+            [
+                self.vasilescu_check_category(category="any", filestr=filestr)
+                for filestr in unique_filenames
+            ],
+            dtype=object,
+        )
+        return categories[positions]
+
+    def classify_commit_files(self, commit_files: pd.DataFrame) -> pd.Series:
+        """
+        Vasilescu category of each commit in `commit_files` (one row per
+        file changed: 'commit_sha' and 'filename' columns) for many commits
+        at once, as vasilescu_commit_files_classification(): each file is
+        categorised, and a commit gets its lowest index'd file category.
 
-        return v_cat
+        :param commit_files: files changed per commit
+        :type: pd.DataFrame
+        :return: category per commit, indexed by commit_sha
+        :rtype: pd.Series
+        """
+        ranks = pd.Series(
+            self.classify_filenames(commit_files["filename"]),
+            index=commit_files.index,
+        ).map(self.category_rank)
+        commit_ranks = ranks.groupby(commit_files["commit_sha"], sort=False).min()
+        return commit_ranks.map(dict(enumerate(self.cat_list_dict)))
 
     def vasilescu_commit_files_classification(
         self, commit_changes_df: pd.DataFrame | None, commit_hash: str
@@ -495,20 +533,60 @@ class Vasilescu_Commit_Classifier:
             return v_cat, commit_hash
 
         elif len(commit_changes_df) > 1:  # check multiple files from one commit hash
-            files_results = []
-            for file in commit_changes_df["filename"]:
-                # this_filestr = file
-                rslt = self.vasilescu_check_category(category="any", filestr=file)
-                files_results.append(rslt)
-
-            unique_categories = set(files_results)
-            if len(unique_categories) == 1:
-                v_cat = files_results[0]
-                return v_cat, commit_hash
-            else:
-                # print("TIE-BREAKER REQUIRED")
-                v_cat = sorted(
-                    unique_categories,
-                    key=lambda x: list(self.cat_list_dict.keys()).index(x),
-                )[0]  # get lowest index'd category returned
-                return v_cat, commit_hash
+            files_results = self.classify_filenames(commit_changes_df["filename"])
+            # lowest index'd category returned (tie-breaker if several)
+            v_cat = min(files_results, key=self.category_rank.__getitem__)
+            return v_cat, commit_hash
+
+
+@functools.lru_cache(maxsize=FILENAME_MEMO_SIZE)
+def first_matching_category(any_category_pattern: re.Pattern, filename: str) -> str:
+    """
+    Group name (category) matched by `any_category_pattern` for lower-cased
+    `filename`, or 'no_categorisation'.
+    Memoised at module level (LRU, bounded by FILENAME_MEMO_SIZE), so the
+    same paths (README.md, setup.py, ...) are only matched once per process,
+    across all commits, classifiers and repos. Keyed by the pattern too, so
+    classifiers with different rules don't share results.
+    """
+    match = any_category_pattern.match(filename)
+    return match.lastgroup if match is not None else "no_categorisation"
+
+
+def filename_memo_stats() -> dict[str, int | float]:
+    """Hits, misses, hit rate and size of this process's filename category memo."""
+    info = first_matching_category.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def category_alternation(filetypes: list[str]) -> str:
+    """
+    Rules of a category as one regex to match from the start of a filename.
+    Rules are searched for anywhere in a filename, and nearly all start
+    with '.*', so each is the same as '.*' + rule without its leading '.*'.
+    """
+    rules = [filetype.removeprefix(".*") for filetype in filetypes]
+    return f".*(?:{'|'.join(rules)})"
+
+
+def make_any_category_pattern(cat_list_dict: dict[str, list[str]]) -> re.Pattern:
+    """
+    All categories' rules as one regex, a named group per category in
+    `cat_list_dict` order. Matched from the start of a filename, the
+    alternation tries categories in that order, so the group that matches
+    is the first category with a matching rule (as checking one category
+    after another), in a single call.
+    """
+    return re.compile(
+        "|".join(
+            f"(?P<{cat}>{category_alternation(filetypes)})"
+            for cat, filetypes in cat_list_dict.items()
+        )
+    )
@@ -0,0 +1,157 @@
+"""On-disk cache of GH API commit detail (`/commits/{sha}`) responses, keyed by repo name and commit sha."""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+
+class CommitDetailsCache:
+    """
+    Commit details for a given sha never change, so once fetched they can be
+    reused by reruns, re-analyses and other branches/repos sharing history.
+
+    Payloads are stored zlib-compressed in a SQLite file. When the total size
+    of stored payloads goes over `max_size_bytes`, least recently used
+    entries are evicted until it is back under 90% of that size.
+    SQLite handles locking, so several processes can share one cache file;
+    within a process, threads share one connection behind a lock.
+    The SQLite file is only opened (and made) on first use, so runs that
+    never fetch commit details (eg from a local clone) don't leave one behind.
+    """
+
+    path: Path
+    max_size_bytes: int
+
+    def __init__(
+        self,
+        path: str = "data/commit_details_cache.sqlite",
+        max_size_bytes: int = 2 * 1024**3,
+    ) -> None:
+        self.path = Path(path)
+        self.max_size_bytes = max_size_bytes
+
+        # one connection shared by enrichment fetch threads (see RunCommits.getcommitschangesvcats);
+        # re-entrant as put() may evict
+        self.lock = threading.RLock()
+        self.conn: sqlite3.Connection | None = None
+        # running estimate of stored size, set on connect(); re-checked against
+        # the file (which other processes may also be writing to) before evicting.
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self) -> sqlite3.Connection:
+        """Connection to the cache, opened on first call; call with self.lock held."""
+        if self.conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS commit_details (
+                    repo_name TEXT NOT NULL,
+                    commit_sha TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (repo_name, commit_sha)
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_used ON commit_details (last_used)"
+            )
+            self.conn.commit()
+            self._size = self.total_size()
+        return self.conn
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if getattr(self, "conn", None) is not None:
+            with self.lock:
+                self.conn.close()
+                self.conn = None
+
+    def __len__(self) -> int:
+        with self.lock:
+            row = (
+                self.connect().execute("SELECT COUNT(*) FROM commit_details").fetchone()
+            )
+        return row[0]
+
+    def total_size(self) -> int:
+        with self.lock:
+            return (
+                self.connect()
+                .execute("SELECT COALESCE(SUM(size), 0) FROM commit_details")
+                .fetchone()[0]
+            )
+
+    def get(self, repo_name: str, commit_sha: str) -> Any | None:
+        """Return cached json for `commit_sha` in `repo_name`, or None if not cached."""
+        with self.lock:
+            conn = self.connect()
+            row = conn.execute(
+                "SELECT payload FROM commit_details WHERE repo_name = ? AND commit_sha = ?",
+                (repo_name, commit_sha),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            with conn:
+                conn.execute(
+                    "UPDATE commit_details SET last_used = ? WHERE repo_name = ? AND commit_sha = ?",
+                    (time.time(), repo_name, commit_sha),
+                )
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, repo_name: str, commit_sha: str, commit_json: Any) -> None:
+        """Store `commit_json` for `commit_sha` in `repo_name`, evicting old entries if over size."""
+        payload = zlib.compress(json.dumps(commit_json).encode("utf-8"))
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO commit_details VALUES (?, ?, ?, ?, ?)",
+                    (repo_name, commit_sha, payload, len(payload), time.time()),
+                )
+            self._size += len(payload)
+            if self._size > self.max_size_bytes:
+                self._size = self.total_size()
+                if self._size > self.max_size_bytes:
+                    self.evict(target_size_bytes=int(self.max_size_bytes * 0.9))
+
+    def evict(self, target_size_bytes: int) -> int:
+        """Delete least recently used entries until total size <= `target_size_bytes`. Returns number deleted."""
+        with self.lock:
+            return self._evict(target_size_bytes)
+
+    def _evict(self, target_size_bytes: int) -> int:
+        size = self.total_size()
+        evicted = 0
+        conn = self.connect()
+        with conn:
+            rows = conn.execute(
+                "SELECT repo_name, commit_sha, size FROM commit_details ORDER BY last_used"
+            )
+            to_delete = []
+            for repo_name, commit_sha, entry_size in rows:
+                if size <= target_size_bytes:
+                    break
+                to_delete.append((repo_name, commit_sha))
+                size -= entry_size
+            conn.executemany(
+                "DELETE FROM commit_details WHERE repo_name = ? AND commit_sha = ?",
+                to_delete,
+            )
+            evicted = len(to_delete)
+        self._size = size
+        return evicted
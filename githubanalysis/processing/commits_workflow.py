@@ -1,23 +1,32 @@
 """Workflow for running commits processing and analysis code for 1 repo."""
 
 import logging
+import queue
+import threading
+import time
 import pandas as pd
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import numpy as np
 
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import frame_path, read_frame
+from utilities.github_rate_limiter import get_rate_limiter
 from utilities.check_gh_reponse import UnexpectedAPIError
 from githubanalysis.processing.get_all_branches_commits import AllBranchesCommitsGetter
 from githubanalysis.processing.get_commit_changes import CommitChanges
+from githubanalysis.processing.get_local_git_commits import LocalGitCommitsGetter
 from githubanalysis.processing.reformat_commits import CommitReformatter
+from githubanalysis.processing.job_queue import JobQueue
+from githubanalysis.processing.dataset_catalog import DatasetCatalog
 import githubanalysis.analysis.hattori_lanza_commit_size_classification as sizecat
 from githubanalysis.analysis.hattori_lanza_commit_content_classification import (
     Hattori_Lanza_Content_Classification,
 )
 from githubanalysis.analysis.vasilescu_commit_files_classification import (
     Vasilescu_Commit_Classifier,
+    filename_memo_stats,
 )
 
 
@@ -29,6 +38,7 @@ class RunCommits:
     sanitised_repo_name: str
     repo_name: str
     write_read_location: str
+    changes_source: str
 
     def __init__(
         self,
@@ -37,6 +47,15 @@ class RunCommits:
         config_path: str,
         write_read_location: str,
         logger: None | logging.Logger = None,
+        changes_source: str = "rest",
+        incremental: bool = False,
+        resume: bool = True,
+        job_queue: JobQueue | None = None,
+        storage_format: str = "csv",
+        keep_full_payload: bool = False,
+        enrich_workers: int = 4,
+        classify_chunk_size: int = 500,
+        progress_every: int = 100,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -57,16 +76,81 @@ class RunCommits:
         self.sanitised_repo_name = repo_name.replace("/", "-")
         self.repo_name = repo_name
         self.write_read_location = write_read_location
+        # "rest": one request per commit, with filenames for vasilescu categories
+        # "graphql": batched change totals only (no filenames; see getcommitschangesbatched)
+        # "git": commits AND per-file changes from one local mirror clone, no API calls
+        assert changes_source in [
+            "rest",
+            "graphql",
+            "git",
+        ], f"changes_source must be 'rest', 'graphql' or 'git', not {changes_source}."
+        self.changes_source = changes_source
+        self.localgitcommitsgetter: LocalGitCommitsGetter | None = None
+        # only fetch commits new since last run (API commits listing only)
+        self.incremental = incremental
+        # per-stage state of this repo's runs: reuse outputs of stages
+        # already done (on any date) unless resume is False. Incremental
+        # runs always re-fetch, so later stages then re-run too.
+        self.resume = resume and not incremental
+        # default JobQueue (at write_read_location) is made when a stage first runs
+        self._job_queue = job_queue
+        # "csv" or "parquet" (typed columns; needs pyarrow) for files written out
+        self.storage_format = storage_format
+        # processed data goes to <write_read_location>dataset/repo=/date=/stage= partitions
+        self.catalog = DatasetCatalog(root=f"{write_read_location}dataset/")
+        # raw commits dumps keep GH's full payloads, not just fields in raw_schema.COMMIT_SCHEMA
+        self.keep_full_payload = keep_full_payload
+        # commit changes enrichment (see getcommitschangesvcats()): number of
+        # threads fetching from the API at once, commits per batch of
+        # vasilescu classification, and commits between progress log lines
+        assert enrich_workers > 0, "enrich_workers must be at least 1."
+        self.enrich_workers = enrich_workers
+        self.classify_chunk_size = classify_chunk_size
+        self.progress_every = progress_every
+
+    @property
+    def job_queue(self) -> JobQueue:
+        if self._job_queue is None:
+            self._job_queue = JobQueue(
+                path=f"{self.write_read_location}workflow_jobs.sqlite"
+            )
+        return self._job_queue
+
+    def get_local_git_commits_getter(self) -> LocalGitCommitsGetter:
+        """
+        Set up (once) the local mirror clone used when changes_source is "git",
+        reading all its commits and file changes.
+        """
+        if self.localgitcommitsgetter is None:
+            self.localgitcommitsgetter = LocalGitCommitsGetter(
+                repo_name=self.repo_name,
+                in_notebook=self.in_notebook,
+                logger=self.logger,
+            )
+            self.localgitcommitsgetter.clone_repo()
+            self.localgitcommitsgetter.read_commits_and_changes()
+        return self.localgitcommitsgetter
 
     def generate_all_branches_commits(self):
+        if self.changes_source == "git":
+            all_branches_commits = (
+                self.get_local_git_commits_getter().get_all_branches_commits(
+                    write_out_location=self.write_read_location
+                )
+            )
+            self.logger.info("did localgitcommitsgetter()")
+            return all_branches_commits
+
         allbranchescommitsgetter = AllBranchesCommitsGetter(
             repo_name=self.repo_name,
             in_notebook=self.in_notebook,
             config_path=self.config_path,
+            keep_full_payload=self.keep_full_payload,
         )
         # TODO: this does not need to take repo name
         all_branches_commits = allbranchescommitsgetter.get_all_branches_commits(
-            repo_name=self.repo_name
+            repo_name=self.repo_name,
+            incremental=self.incremental,
         )
         self.logger.info("did allbranchescommitsgetter()")
         return all_branches_commits
@@ -86,10 +170,15 @@ class RunCommits:
         self.logger.info("did reformat commits")
 
         if writeout:
-            reformat_commits.save_formatted_commits(
-                write_out_location=self.write_read_location
+            write_out = self.catalog.write(
+                reformat_commits.reformatted_commits,
+                stage="processed-commits",
+                repo=self.sanitised_repo_name,
+                date=self.current_date_info,
+                storage_format=self.storage_format,
+                index=True,
             )
-            self.logger.info("saved out reformat commits")
+            self.logger.info(f"saved out reformat commits to {write_out}")
 
         return reformat_commits.reformatted_commits
 
@@ -99,14 +188,25 @@ class RunCommits:
         to get up to date commits data for that repo, then reformats it.
         """
 
-        formatted_commits_filename = f"{self.write_read_location}processed-commits_{self.sanitised_repo_name}_{self.current_date_info}.csv"
+        formatted_commits_filename = frame_path(
+            self.catalog.partition_stem(
+                "processed-commits", self.sanitised_repo_name, self.current_date_info
+            ),
+            self.storage_format,
+        )
+        if self.resume:
+            fetched_output = self.job_queue.done_output(
+                "commits", self.repo_name, "fetched"
+            )
+            if fetched_output is not None:  # eg from before midnight
+                formatted_commits_filename = fetched_output
         formatted_commits_path = Path(formatted_commits_filename)
         self.logger.info(
             f"checking whether formatted commits dataset already exists at path {formatted_commits_path}"
         )
 
-        if formatted_commits_path.is_file():  # read in existing dataset
-            processed_commits_df = pd.read_csv(
+        if self.resume and formatted_commits_path.is_file():  # read in existing dataset
+            processed_commits_df = read_frame(
                 formatted_commits_filename, index_col=0, header=0
             )
 
@@ -114,65 +214,170 @@ class RunCommits:
             return processed_commits_df
 
         else:  # run steps to get commits data and generate dataset
-            return self.process_format_commits(
-                self.generate_all_branches_commits(), writeout=True
-            )
+            with self.job_queue.run_stage("commits", self.repo_name, "fetched") as job:
+                processed_commits_df = self.process_format_commits(
+                    self.generate_all_branches_commits(), writeout=True
+                )
+                job["output_path"] = formatted_commits_filename
+            return processed_commits_df
 
     def getcommitschangesvcats(
         self,
         commitchanges: CommitChanges,
         processed_commits: pd.DataFrame,
         vasilescucommitclassifier: Vasilescu_Commit_Classifier,
+        localgitcommitsgetter: LocalGitCommitsGetter | None = None,
     ):
         """
-        Loops through commits in processed commits df (generated by
-        `reformat_commits_object()`), and generates temporary dataframe
-        per commit, including number of changes per commit, number of
-        files per commit, and filenames of those changed files per
-        commit, from tuples returned by internal functions.
-        Returns lists of tuples for n_files, n_changes and v_category.
+        Gets a temporary dataframe of changes per commit in processed
+        commits df (generated by `reformat_commits_object()`), giving
+        number of changes per commit, number of files per commit, and
+        filenames of those changed files per commit.
+        Up to `enrich_workers` threads fetch commits' changes at once,
+        handing them through a bounded queue to this thread, which counts
+        them up and gives their filenames vasilescu categories (see
+        classify_commit_files()) in chunks of `classify_chunk_size`
+        commits while fetching carries on.
+        If `localgitcommitsgetter` is given, the per-commit dataframes
+        come from its local clone (in one thread) instead of the GH API.
+        Commits hitting an UnexpectedAPIError are logged and skipped.
+        Returns lists of tuples for n_files, n_changes and v_category, in
+        processed commits order.
         """
 
         self.logger.info("Beginning getcommitschangesvcats( ).")
-        n_files: list[tuple[int | None, str]] = []
-        n_changes: list[tuple[int | None, str]] = []
-        v_category: list[tuple[str, str]] = []
-
-        i = 0
-        for commit in processed_commits["commit_sha"]:
-            i += 1
-            self.logger.info(
-                f"Getting change numbers and v_cats for {i} of {len(processed_commits)} commits for repo {self.repo_name}."
-            )
+        commits = list(processed_commits["commit_sha"])
+        if localgitcommitsgetter is not None:
+            get_changes = localgitcommitsgetter.get_commit_changes
+            n_workers = 1  # reads from memory; no requests to overlap
+        else:
+            get_changes = commitchanges.get_commit_changes_with_retries
+            n_workers = self.enrich_workers
+
+        # (position, commit, changes df or exception) from fetch workers;
+        # bounded so fetching can't run far ahead of classification
+        fetched: queue.Queue = queue.Queue(maxsize=2 * n_workers)
+        stop = threading.Event()
+
+        def fetch(position: int, commit: str) -> None:
+            if stop.is_set():
+                return
+            # every commit must put exactly one result, or the consumer waits
+            # for it forever; so even BaseExceptions (eg SystemExit) are
+            # caught here, and handed on to be handled (or re-raised) by consumer
             try:
-                tmpdf = commitchanges.get_commit_changes_with_retries(
-                    commit_hash=commit
-                )
-            except UnexpectedAPIError as e:
-                self.logger.error(
-                    f"Unexpected API error: {e}; skipping to next commit."
-                )
-                continue
-
-            n_files.append(
-                commitchanges.get_commit_files_changed(
-                    commit_changes_df=tmpdf, commit_hash=commit
+                result = get_changes(commit_hash=commit)
+            except BaseException as e:
+                result = e
+            while not stop.is_set():
+                try:
+                    fetched.put((position, commit, result), timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        got: dict[int, tuple[tuple, tuple]] = {}  # position: (n_files, n_changes)
+        v_cats: dict[str, str] = {}
+        commit_files: list[pd.DataFrame] = []
+        n_skipped = 0
+        start_time = time.monotonic()
+
+        def classify_chunk() -> None:
+            if commit_files:
+                v_cats.update(
+                    vasilescucommitclassifier.classify_commit_files(
+                        pd.concat(commit_files)
+                    )
                 )
+                commit_files.clear()
+
+        executor = ThreadPoolExecutor(max_workers=n_workers)
+        try:
+            for position, commit in enumerate(commits):
+                executor.submit(fetch, position, commit)
+
+            for n_done in range(1, len(commits) + 1):
+                position, commit, tmpdf = fetched.get()
+                if isinstance(tmpdf, UnexpectedAPIError):
+                    self.logger.error(
+                        f"Unexpected API error: {tmpdf}; skipping to next commit."
+                    )
+                    n_skipped += 1
+                elif isinstance(tmpdf, BaseException):
+                    raise tmpdf
+                else:
+                    got[position] = (
+                        commitchanges.get_commit_files_changed(
+                            commit_changes_df=tmpdf, commit_hash=commit
+                        ),
+                        commitchanges.get_commit_total_changes(
+                            commit_changes_df=tmpdf, commit_hash=commit
+                        ),
+                    )
+                    if tmpdf is not None:
+                        commit_files.append(
+                            tmpdf[["filename"]].assign(commit_sha=commit)
+                        )
+                    if len(commit_files) >= self.classify_chunk_size:
+                        # apply Vasilescu et al commit classification (filetype) method:
+                        classify_chunk()
+
+                if n_done % self.progress_every == 0 or n_done == len(commits):
+                    elapsed = time.monotonic() - start_time
+                    self.logger.info(
+                        f"Got changes for {n_done} of {len(commits)} commits ({n_skipped} skipped) for repo {self.repo_name}; {n_done / elapsed if elapsed else 0:.1f} commits/s over {elapsed:.0f} s with {n_workers} fetch workers."
+                    )
+            classify_chunk()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        n_files = [got[position][0] for position in sorted(got)]
+        n_changes = [got[position][1] for position in sorted(got)]
+        v_category = [
+            (
+                v_cats.get(commits[position], "no_categorisation [EMPTY]"),
+                commits[position],
             )
+            for position in sorted(got)
+        ]
+        return n_files, n_changes, v_category
+
+    def getcommitschangesbatched(
+        self,
+        commitchanges: CommitChanges,
+        processed_commits: pd.DataFrame,
+        batch_size: int = 50,
+    ):
+        """
+        Batched alternative to `getcommitschangesvcats()`, getting number
+        of changes and number of files per commit via GraphQL requests of
+        `batch_size` commits each instead of one REST request per commit.
+        GraphQL gives no filenames, so every commit gets vasilescu
+        category "no_categorisation [NO FILENAMES]".
+        Returns lists of tuples for n_files, n_changes and v_category in
+        the same form as `getcommitschangesvcats()`.
+        """
+
+        self.logger.info("Beginning getcommitschangesbatched( ).")
+        totals = commitchanges.get_commits_changes_batch(
+            commit_hashes=list(processed_commits["commit_sha"]),
+            batch_size=batch_size,
+        )
 
+        n_files: list[tuple[int | None, str]] = []
+        n_changes: list[tuple[int | None, str]] = []
+        v_category: list[tuple[str, str]] = []
+
+        for commit, files_changed, number_changes in zip(
+            totals["commit_hash"], totals["n_files_changed"], totals["n_changes"]
+        ):
+            n_files.append((None if pd.isna(files_changed) else files_changed, commit))
             n_changes.append(
-                commitchanges.get_commit_total_changes(
-                    commit_changes_df=tmpdf, commit_hash=commit
-                )
+                (None if pd.isna(number_changes) else number_changes, commit)
             )
+            v_category.append(("no_categorisation [NO FILENAMES]", commit))
 
-            # apply Vasilescu et al commit classification (filetype) method:
-            v_category.append(
-                vasilescucommitclassifier.vasilescu_commit_files_classification(
-                    commit_changes_df=tmpdf,
-                    commit_hash=commit,
-                )
-            )
         return n_files, n_changes, v_category
 
     def merge_stats(
@@ -213,81 +418,105 @@ class RunCommits:
             validate="one_to_one",
         )
 
-    def classify_content(self, processed_commits: pd.DataFrame):
-        hattorilanzaclassifier = Hattori_Lanza_Content_Classification(
-            in_notebook=self.in_notebook
-        )
+    def classify_content(self, processed_commits: pd.DataFrame) -> pd.Series:
         """
         Run Hattori & Lanza commit message content classification method
         on processed commit data.
         """
+        hattorilanzaclassifier = Hattori_Lanza_Content_Classification(
+            in_notebook=self.in_notebook
+        )
+        return hattorilanzaclassifier.classify_many(processed_commits["commit_message"])
 
-        results = []
-
-        for msg in processed_commits["commit_message"]:
-            rslt = hattorilanzaclassifier.hattori_lanza_commit_content_classification(
-                msg
-            )
-            results.append(rslt)
-
-        return results
-
-    def classify_size(self, processed_commits: pd.DataFrame) -> list[str | None]:
-        results: list[str | None] = []
+    def classify_size(self, processed_commits: pd.DataFrame) -> pd.Series:
+        """
+        Run Hattori & Lanza commit size classification method (by number
+        of files changed) on processed commit data.
+        """
+        return sizecat.classify_commit_sizes(processed_commits["n_files_changed"])
 
-        for num_files in processed_commits["n_files_changed"]:
-            self.logger.debug(
-                f"Commit size df n_files_changed is {num_files} of type {type(num_files)}."
-            )
-            if isinstance(num_files, float) and not np.isnan(num_files):
-                num = int(num_files)
-            elif isinstance(num_files, int):
-                num = num_files
-            else:
-                self.logger.warning(
-                    f"Number of files: expeced int or float got {num_files} of type {type(num_files)}"
+    def classify_commits(
+        self,
+        processed_commits: pd.DataFrame,
+        commit_files: pd.DataFrame | None = None,
+        vasilescucommitclassifier: Vasilescu_Commit_Classifier | None = None,
+    ) -> pd.DataFrame:
+        """
+        All three commit categories for `processed_commits`, each worked
+        out for the whole column at once: 'hattori_lanza_content_cat' (from
+        commit messages), 'hattori_lanza_size_cat' (from n_files_changed,
+        if there) and 'vasilescu_category'. Vasilescu categories come from
+        `commit_files` (one row per file changed: 'commit_sha' and
+        'filename') if given; otherwise any 'vasilescu_category' column already in
+        `processed_commits` (ie from enrich_commits()) is kept.
+        """
+        categories = pd.DataFrame(index=processed_commits.index)
+        categories["hattori_lanza_content_cat"] = self.classify_content(
+            processed_commits
+        )
+        if "n_files_changed" in processed_commits.columns:
+            categories["hattori_lanza_size_cat"] = self.classify_size(processed_commits)
+
+        if commit_files is not None:
+            if vasilescucommitclassifier is None:
+                vasilescucommitclassifier = Vasilescu_Commit_Classifier(
+                    repo_name=self.repo_name,
+                    in_notebook=self.in_notebook,
+                    config_path=self.config_path,
                 )
-                num = None
-            results.append(
-                sizecat.hattori_lanza_commit_size_classification(commit_size=num)
+            v_cats = vasilescucommitclassifier.classify_commit_files(commit_files)
+            categories["vasilescu_category"] = processed_commits["commit_sha"].map(
+                v_cats
             )
+        elif "vasilescu_category" in processed_commits.columns:
+            categories["vasilescu_category"] = processed_commits["vasilescu_category"]
+        return categories
 
-        return results
-
-    def do_it_all(self):
+    def enrich_commits(self, processed_commits: pd.DataFrame):
         """
-        Runs main commits workflow; picks up using formatted commit .csv
-        file if this exists; returns df of processed, categorised commit
-        data.
+        Get number of files changed, number of changes and vasilescu
+        category per commit (from `changes_source`) and merge them into
+        `processed_commits`. Writes the result out to csv and returns it
+        with the path written to.
         """
-        self.logger.info("checking whether formatted commits dataset already exists")
-        # if all processed commits here from same day, don't re-run getter steps.
-        processed_commits = self.check_existing_formatted_commits()
-        self.logger.info("got formatted commits data")
-
-        if processed_commits is None or processed_commits.empty:
-            raise pd.errors.EmptyDataError(
-                "Frame is None or pd.DataFrame is empty; perhaps no commits?"
-            )
-
         commitchanges = CommitChanges(
             repo_name=self.repo_name,
             in_notebook=self.in_notebook,
             config_path=self.config_path,
+            pool_maxsize=max(10, self.enrich_workers),
         )
-        vasilescucommitclassifier = Vasilescu_Commit_Classifier(
-            repo_name=self.repo_name,
-            in_notebook=self.in_notebook,
-            config_path=self.config_path,
-        )
-        n_files, n_changes, v_category = self.getcommitschangesvcats(
-            commitchanges,
-            processed_commits,
-            vasilescucommitclassifier,
-        )
+        if self.changes_source == "rest":
+            ratelimiter = get_rate_limiter(self.config_path)
+            self.logger.info(
+                f"Rate limit budget is {ratelimiter.status()}; {len(processed_commits)} commit changes requests should take ~{ratelimiter.estimate_seconds(len(processed_commits)):.0f} seconds."
+            )
+        if self.changes_source == "graphql":
+            n_files, n_changes, v_category = self.getcommitschangesbatched(
+                commitchanges,
+                processed_commits,
+            )
+        else:
+            vasilescucommitclassifier = Vasilescu_Commit_Classifier(
+                repo_name=self.repo_name,
+                in_notebook=self.in_notebook,
+                config_path=self.config_path,
+            )
+            n_files, n_changes, v_category = self.getcommitschangesvcats(
+                commitchanges,
+                processed_commits,
+                vasilescucommitclassifier,
+                localgitcommitsgetter=self.get_local_git_commits_getter()
+                if self.changes_source == "git"
+                else None,
+            )
         self.logger.info(
             "did get commits changes; get vasilescu categories; return lists"
         )
+        if self.changes_source != "graphql":
+            memo_stats = filename_memo_stats()
+            self.logger.info(
+                f"Vasilescu filename memo (all repos so far in this process): {memo_stats['hits']} hits, {memo_stats['misses']} misses ({memo_stats['hit_rate']:.1%} hit rate), {memo_stats['size']} filenames kept."
+            )
 
         processed_commits = self.merge_stats(
             n_files,
@@ -300,56 +529,98 @@ class RunCommits:
             f"Info details of `processed_commits` {len(processed_commits)} length df object is {processed_commits.info()}"
         )
 
-        write_out = f"{self.write_read_location}commits_changes_{self.sanitised_repo_name}_{self.current_date_info}.csv"
-        processed_commits.to_csv(
-            path_or_buf=write_out,
-            header=True,
-            index=False,
-            na_rep="",
-            mode="w",
+        write_out = self.catalog.write(
+            processed_commits,
+            stage="commits_changes",
+            repo=self.sanitised_repo_name,
+            date=self.current_date_info,
+            storage_format=self.storage_format,
         )
         self.logger.info(
             f"writing processed commits with changes and v_cats file out to this path / filename: {write_out}"
         )
+        return processed_commits, write_out
 
-        processed_commits = processed_commits.dropna(
-            subset=["n_files_changed", "n_changes"]
-        )  # drop rows with NaN values / missing data from commit changes
-        self.logger.debug(
-            f"Info details of `processed_commits` {len(processed_commits)} length df object is {processed_commits.info()}"
-        )
+    def do_it_all(self):
+        """
+        Runs main commits workflow; picks up using formatted commit .csv
+        file if this exists; returns df of processed, categorised commit
+        data.
+        Stages already done for this repo (see JobQueue) are picked up
+        from their output files rather than re-run.
+        """
+        if self.resume and self.job_queue.done_output(
+            "commits", self.repo_name, "enriched", depends_on="fetched"
+        ):
+            written_output = self.job_queue.done_output(
+                "commits", self.repo_name, "written", depends_on="enriched"
+            )
+            if written_output is not None:
+                self.logger.info(
+                    f"Commits workflow already completed for repo {self.repo_name}; reading {written_output}."
+                )
+                return read_frame(written_output)
 
-        processed_commits["hattori_lanza_content_cat"] = self.classify_content(
-            processed_commits
-        )
-        self.logger.info("did hattori lanza commits content classification")
-        self.logger.debug(
-            f"Info details of `processed_commits` object is {processed_commits.info()}"
-        )
+        self.logger.info("checking whether formatted commits dataset already exists")
+        # if all processed commits here from same day, don't re-run getter steps.
+        processed_commits = self.check_existing_formatted_commits()
+        self.logger.info("got formatted commits data")
 
-        processed_commits["hattori_lanza_size_cat"] = self.classify_size(
-            processed_commits
-        )
-        self.logger.info("did hattori lanza size classification")
-        self.logger.debug(
-            f"Info details of `processed_commits` object is {processed_commits.info()}"
-        )
+        if processed_commits is None or processed_commits.empty:
+            raise pd.errors.EmptyDataError(
+                "Frame is None or pd.DataFrame is empty; perhaps no commits?"
+            )
 
-        write_out = f"{self.write_read_location}commits_cats_stats_{self.sanitised_repo_name}_{self.current_date_info}.csv"
-        self.logger.info(
-            f"writing post-workflow file out to this path / filename: {write_out}"
+        enriched_output = (
+            self.job_queue.done_output(
+                "commits", self.repo_name, "enriched", depends_on="fetched"
+            )
+            if self.resume
+            else None
         )
+        if enriched_output is not None:
+            self.logger.info(
+                f"Commit changes already got for repo {self.repo_name}; reading {enriched_output}."
+            )
+            processed_commits = read_frame(enriched_output)
+        else:
+            with self.job_queue.run_stage("commits", self.repo_name, "enriched") as job:
+                processed_commits, job["output_path"] = self.enrich_commits(
+                    processed_commits
+                )
 
-        processed_commits.to_csv(
-            path_or_buf=write_out,
-            header=True,
-            index=False,
-            na_rep="",
-            mode="w",
-        )
-        self.logger.info("did writeout")
-        self.logger.debug(
-            f"Info details of FINAL `processed_commits` object is {processed_commits.info()}"
-        )
+        with self.job_queue.run_stage("commits", self.repo_name, "classified"):
+            processed_commits = processed_commits.dropna(
+                subset=["n_files_changed", "n_changes"]
+            )  # drop rows with NaN values / missing data from commit changes
+            self.logger.debug(
+                f"Info details of `processed_commits` {len(processed_commits)} length df object is {processed_commits.info()}"
+            )
+
+            categories = self.classify_commits(processed_commits)
+            processed_commits[categories.columns] = categories
+            self.logger.info(
+                "did hattori lanza commits content and size classification"
+            )
+            self.logger.debug(
+                f"Info details of `processed_commits` object is {processed_commits.info()}"
+            )
+
+        with self.job_queue.run_stage("commits", self.repo_name, "written") as job:
+            write_out = self.catalog.write(
+                processed_commits,
+                stage="commits_cats_stats",
+                repo=self.sanitised_repo_name,
+                date=self.current_date_info,
+                storage_format=self.storage_format,
+            )
+            self.logger.info(
+                f"writing post-workflow file out to this path / filename: {write_out}"
+            )
+            self.logger.info("did writeout")
+            self.logger.debug(
+                f"Info details of FINAL `processed_commits` object is {processed_commits.info()}"
+            )
+            job["output_path"] = write_out
 
         return processed_commits
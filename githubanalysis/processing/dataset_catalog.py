@@ -0,0 +1,175 @@
+"""Partitioned (repo=/date=/stage=) store of processed workflow data, with a catalog of the latest version per repo and stage."""
+
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utilities.frame_storage import write_frame
+
+# stages are named after the flat files they replace, eg processed-commits_<repo>_<date>.csv
+FLAT_FILE_PATTERN = re.compile(
+    r"^(?P<stage>processed-commits|commits_changes|commits_cats_stats|processed-issues)_(?P<repo>.+)_(?P<date>[0-9]{4}-[0-9]{2}-[0-9]{2})\.(csv|parquet)$"
+)
+
+
+class DatasetCatalog:
+    """
+    Processed data is written to
+    `<root>/repo=<owner-repo>/date=<YYYY-MM-DD>/stage=<stage>/part.<csv|parquet>`
+    and each write is recorded in `<root>/catalog.sqlite`, so loaders can
+    ask for the latest file per repo for a stage (`latest_paths()`)
+    instead of listing the data folder and matching filenames, which
+    picks up every dated duplicate.
+    Repos are keyed by sanitised repo name (owner-repo), as in filenames.
+    Nothing is made under `root` until data is first written or recorded.
+
+    Example:
+
+    catalog = DatasetCatalog('data/dataset/')
+    catalog.write(commits_df, stage='commits_cats_stats', repo='JeschkeLab-DeerLab', date='2024-10-17')
+    for repo, path in catalog.latest_paths('commits_cats_stats').items():
+        df = read_frame(path)
+    """
+
+    root: Path
+
+    def __init__(self, root: str = "data/dataset/") -> None:
+        self.root = Path(root)
+        self.conn: sqlite3.Connection | None = None
+
+    def __del__(self):
+        if getattr(self, "conn", None) is not None:
+            self.conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """Connection to `<root>/catalog.sqlite`, opened (and made) on first call."""
+        if self.conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.root / "catalog.sqlite", timeout=60)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS datasets (
+                    stage TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    n_rows INTEGER,
+                    written_at REAL NOT NULL,
+                    PRIMARY KEY (stage, repo, date)
+                )
+                """
+            )
+            self.conn.commit()
+        return self.conn
+
+    def partition_stem(self, stage: str, repo: str, date: str) -> str:
+        """Path (without file extension) for `stage` data of `repo` on `date`."""
+        partition = self.root / f"repo={repo}" / f"date={date}" / f"stage={stage}"
+        return str(partition / "part")
+
+    def register(
+        self, stage: str, repo: str, date: str, path: str, n_rows: int | None = None
+    ) -> None:
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?)",
+                (stage, repo, date, str(path), n_rows, time.time()),
+            )
+
+    def write(
+        self,
+        df: pd.DataFrame,
+        stage: str,
+        repo: str,
+        date: str,
+        storage_format: str = "csv",
+        index: bool = False,
+    ) -> str:
+        """Write `df` to its partition (see write_frame()) and record it in the catalog; returns path written to."""
+        path_stem = self.partition_stem(stage, repo, date)
+        Path(path_stem).parent.mkdir(parents=True, exist_ok=True)
+        path = write_frame(
+            df,
+            path_stem=path_stem,
+            storage_format=storage_format,
+            index=index,
+        )
+        # a partition holds one format; drop any other left from earlier runs
+        for other in Path(path).parent.glob("part.*"):
+            if str(other) != path:
+                other.unlink()
+        self.register(stage, repo, date, path, n_rows=len(df))
+        return path
+
+    def latest_paths(self, stage: str) -> dict[str, str]:
+        """Path of latest (by date, then write time) existing file for `stage`, keyed by repo."""
+        if self.conn is None and not (self.root / "catalog.sqlite").exists():
+            return {}  # nothing recorded yet
+        rows = (
+            self.connect()
+            .execute(
+                "SELECT repo, path FROM datasets WHERE stage = ? ORDER BY repo, date, written_at",
+                (stage,),
+            )
+            .fetchall()
+        )
+        latest = {}
+        for repo, path in rows:  # later rows overwrite earlier ones per repo
+            if os.path.exists(path):
+                latest[repo] = path
+        return latest
+
+    def latest_path(self, stage: str, repo: str) -> str | None:
+        return self.latest_paths(stage).get(repo)
+
+    def import_flat_files(self, read_location: str | Path) -> int:
+        """
+        Record existing `<stage>_<repo>_<date>.<csv|parquet>` files in
+        `read_location` in the catalog where they are (so data from before
+        the partitioned layout can be found through the catalog).
+        Returns number of files recorded.
+        """
+        n_files = 0
+        for filename in sorted(os.listdir(read_location)):
+            match = FLAT_FILE_PATTERN.match(filename)
+            if match is None:
+                continue
+            self.register(
+                stage=match.group("stage"),
+                repo=match.group("repo"),
+                date=match.group("date"),
+                path=str(Path(read_location) / filename),
+            )
+            n_files += 1
+        return n_files
+
+
+def find_stage_files(read_location: str | Path, stage: str) -> list[str]:
+    """
+    Paths of the latest `stage` file per repo under `read_location`: from
+    the catalog at `<read_location>/dataset/` if it has any, otherwise from
+    flat `<stage>_<repo>_<date>` files in `read_location`, keeping only the
+    latest date per repo.
+    """
+    if (Path(read_location) / "dataset" / "catalog.sqlite").exists():
+        latest = DatasetCatalog(str(Path(read_location) / "dataset")).latest_paths(
+            stage
+        )
+        if latest:
+            return [latest[repo] for repo in sorted(latest)]
+
+    latest_flat: dict[str, tuple[str, str]] = {}
+    for filename in os.listdir(read_location):
+        match = FLAT_FILE_PATTERN.match(filename)
+        if match is None or match.group("stage") != stage:
+            continue
+        repo, date = match.group("repo"), match.group("date")
+        if repo not in latest_flat or date > latest_flat[repo][0]:
+            latest_flat[repo] = (date, str(Path(read_location) / filename))
+    return [latest_flat[repo][1] for repo in sorted(latest_flat)]
@@ -1,15 +1,19 @@
 """Function to retrieve all commits across ALL branches for a given GitHub repository and remove duplicates."""
 
 import os
-import requests
-from requests.adapters import HTTPAdapter, Retry
 import logging
-import pandas as pd
 import datetime
 import json
+from pathlib import Path
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
 import utilities.get_default_logger as loggit
 import githubanalysis.processing.setup_github_auth as ghauth
 from utilities.check_gh_reponse import raise_if_response_error, run_with_retries
+from utilities.github_session import make_github_session, DEFAULT_ETAG_CACHE_PATH
+from utilities.ndjson_stream import NDJSONWriter, iter_ndjson, ndjson_path
+from githubanalysis.processing.page_checkpoint import PageCheckpoint
+from githubanalysis.processing.raw_schema import COMMIT_SCHEMA, project_records
 
 import githubanalysis.processing.get_branches as branchgetter
 # import githubanalysis.processing.deduplicate_commits as dedupcommits
@@ -28,8 +32,15 @@ def make_url(
         return f"{repos_api_url}{repo_name}/commits?sha={branch}&per_page={per_pg}&page={page}"
 
 
-def deduplicate_commits(all_branches_commits: dict[str, list]):
-    shas = set()
+def deduplicate_commits(
+    all_branches_commits: dict[str, list], shas: set[str] | None = None
+):
+    """
+    Drop commits already seen on an earlier branch (in dict order).
+    Pass `shas` to carry seen shas over between calls, eg branch by branch.
+    """
+    if shas is None:
+        shas = set()
     modified: dict[str, list] = {}
     for branch_name, commits in all_branches_commits.items():
         modified[branch_name] = []
@@ -41,6 +52,59 @@ def deduplicate_commits(all_branches_commits: dict[str, list]):
     return modified
 
 
+def merge_commits(
+    stored_commits: dict[str, list], new_commits: dict[str, list]
+) -> dict[str, list]:
+    """
+    Merge newly fetched commits (per branch sha) into previously stored
+    deduplicated commits, newest commits first within each branch,
+    and deduplicate the result.
+    """
+    merged: dict[str, list] = {
+        branch_sha: list(commits) for branch_sha, commits in stored_commits.items()
+    }
+    for branch_sha, commits in new_commits.items():
+        merged[branch_sha] = list(commits) + merged.get(branch_sha, [])
+    return deduplicate_commits(merged)
+
+
+def write_branch_commits(
+    writer: NDJSONWriter, branch_sha: str, commits: list[dict]
+) -> None:
+    """Raw commit dumps hold one `{"branch_sha": ..., "commit": <GH API commit>}` line per commit."""
+    for commit in commits:
+        writer.write({"branch_sha": branch_sha, "commit": commit})
+
+
+def iter_branch_commits(path: str) -> Iterator[tuple[str, dict]]:
+    """
+    `(branch_sha, commit)` pairs from a raw commits dump, one at a time:
+    ndjson(.gz/.zst) as written by write_branch_commits(), or a (whole
+    file) json dict of lists from before streaming write-out.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as json_file:
+            for branch_sha, commits in json.load(json_file).items():
+                for commit in commits:
+                    yield branch_sha, commit
+        return
+    for record in iter_ndjson(path):
+        yield record["branch_sha"], record["commit"]
+
+
+def read_branch_commits(path: str) -> dict[str, list]:
+    """Raw commits dump as a dict of lists of commits keyed by branch sha."""
+    branches_commits: dict[str, list] = {}
+    for branch_sha, commit in iter_branch_commits(path):
+        branches_commits.setdefault(branch_sha, []).append(commit)
+    return branches_commits
+
+
+def make_store_path(write_out: str) -> str:
+    """Undated file holding all commits seen so far, keyed by branch sha."""
+    return f"{write_out}_store.json"
+
+
 class AllBranchesCommitsGetter:
     # if not given a better option, use my default settings for logging
     logger: logging.Logger
@@ -51,6 +115,11 @@ class AllBranchesCommitsGetter:
         in_notebook: bool,
         config_path: str,
         logger: None | logging.Logger = None,
+        max_workers: int = 4,
+        etag_cache_path: str | None = DEFAULT_ETAG_CACHE_PATH,
+        checkpoint_dir: str | None = "data/checkpoints/",
+        raw_codec: str = "gzip",
+        keep_full_payload: bool = False,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -62,15 +131,18 @@ class AllBranchesCommitsGetter:
         else:
             self.logger = logger
 
-        self.s = requests.Session()
-        retries = Retry(
-            total=10,
-            connect=5,
-            read=3,
-            backoff_factor=1,
-            status_forcelist=[202, 502, 503, 504],
+        if etag_cache_path is not None and in_notebook:
+            etag_cache_path = f"../../{etag_cache_path}"
+        # conditional requests: unchanged pages on refresh runs come back as 304s
+        self.s = make_github_session(
+            etag_cache_path=etag_cache_path,
+            pool_maxsize=max_workers,
+            config_path=config_path,
         )
-        self.s.mount("https://", HTTPAdapter(max_retries=retries))
+        self.etag_cache_path = etag_cache_path
+        # number of commit pages fetched at once by _multipage_commit_grabber()
+        assert max_workers > 0, "max_workers must be at least 1."
+        self.max_workers = max_workers
         self.gh_token = ghauth.setup_github_auth(config_path=config_path)
         self.headers = {"Authorization": "token " + self.gh_token}
         self.config_path = config_path
@@ -80,6 +152,31 @@ class AllBranchesCommitsGetter:
             "%Y-%m-%d"
         )  # run this at start of script not in loop to avoid midnight/long-run commits
         self.sanitised_repo_name = repo_name.replace("/", "-")
+        # per-branch spill files of commit pages done, so a rerun after a
+        # failure part-way through a big repo doesn't start again (None disables)
+        if checkpoint_dir is not None and in_notebook:
+            checkpoint_dir = f"../../{checkpoint_dir}"
+        self.checkpoint_dir = checkpoint_dir
+        # compression of raw commits dumps: 'none', 'gzip' or 'zstd'
+        self.raw_codec = raw_codec
+        # keep only fields used downstream (see raw_schema) unless asked for GH's full payloads
+        self.commit_schema = None if keep_full_payload else COMMIT_SCHEMA
+
+    def make_checkpoint(self, branch: str) -> PageCheckpoint | None:
+        if self.checkpoint_dir is None:
+            return None
+        return PageCheckpoint(
+            f"{self.checkpoint_dir}commits_{self.sanitised_repo_name}_{branch}.ndjson"
+        )
+
+    def clear_checkpoints(self) -> None:
+        """Remove all commit page checkpoints for this repo, once commits are written out."""
+        if self.checkpoint_dir is None:
+            return
+        for path in Path(self.checkpoint_dir).glob(
+            f"commits_{self.sanitised_repo_name}_*.ndjson"
+        ):
+            path.unlink()
 
     def _singlepage_commit_grabber(
         self,
@@ -105,7 +202,7 @@ class AllBranchesCommitsGetter:
         )
         assert api_response.ok, f"API response is: {api_response}"
 
-        all_commits = api_response.json()
+        all_commits = project_records(api_response.json(), self.commit_schema)
 
         return all_commits
 
@@ -116,18 +213,29 @@ class AllBranchesCommitsGetter:
         repo_name: str,
         branch: str,
         per_pg: str | int,
+        checkpoint: PageCheckpoint | None = None,
     ) -> list[dict]:
+        """
+        Get all pages of commits for `branch`, several pages at once.
+        If `checkpoint` is given, each page is saved to it when got, and
+        pages it already has (from an earlier, failed run) are not requested again.
+        """
         commit_links_last = commit_links["last"]["url"].split("&page=")[1]
         pages_commits = int(commit_links_last)
 
-        all_commits = pd.DataFrame()
-        all_commits = []
-        pg_range = range(1, (pages_commits + 1))
-        for i in pg_range:
+        pages_to_get = list(range(1, pages_commits + 1))
+        if checkpoint is not None and len(checkpoint) > 0:
+            pages_to_get = [
+                page for page in pages_to_get if page not in checkpoint.pages
+            ]
+            self.logger.info(
+                f"Resuming commit grab for repo {repo_name}, on branch {branch}: {len(checkpoint)} pages already got, {len(pages_to_get)} to go."
+            )
+
+        def grab_page(page: int) -> tuple[list[dict], int | None]:
             self.logger.info(
-                f">> Running commit grab for repo {repo_name}, on branch {branch}, in page {i} of {pages_commits}."
+                f">> Running commit grab for repo {repo_name}, on branch {branch}, in page {page} of {pages_commits}."
             )
-            page = i
             commits_url = make_url(repos_api_url, repo_name, branch, per_pg, page)
             self.logger.info(f"API is checking url: {commits_url}")
 
@@ -148,11 +256,151 @@ class AllBranchesCommitsGetter:
             self.logger.debug(
                 f"record ID request headers limit/remaining: {headers_out}/{headers_out.get('x-ratelimit-remaining')}"
             )
+            remaining = headers_out.get("x-ratelimit-remaining")
 
-            json_pg = api_response.json()
-            all_commits.extend(json_pg)
+            return (
+                project_records(api_response.json(), self.commit_schema),
+                int(remaining) if remaining else None,
+            )
 
-        return all_commits
+        # Fetch pages in batches of up to max_workers at once. If the rate
+        # limit is nearly used up, drop to one page at a time so
+        # run_with_retries() can wait for the reset without a burst of
+        # parallel requests all hitting 403s.
+        pages_commits_got: dict[int, list] = {}
+        remaining_limit: int | None = None
+        i = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while i < len(pages_to_get):
+                if remaining_limit is not None and remaining_limit <= self.max_workers:
+                    batch_size = 1
+                else:
+                    batch_size = self.max_workers
+                pages = pages_to_get[i : i + batch_size]
+
+                # executor.map() returns results in page order
+                batch_remaining = []
+                for page, (json_pg, remaining) in zip(
+                    pages, executor.map(grab_page, pages)
+                ):
+                    pages_commits_got[page] = json_pg
+                    if checkpoint is not None:
+                        checkpoint.append(page, json_pg)
+                    if remaining is not None:
+                        batch_remaining.append(remaining)
+
+                remaining_limit = min(batch_remaining) if batch_remaining else None
+                i += len(pages)
+
+        if checkpoint is not None:
+            return checkpoint.items()
+        return [
+            commit
+            for page in sorted(pages_commits_got)
+            for commit in pages_commits_got[page]
+        ]
+
+    def _incremental_commit_grabber(
+        self,
+        repos_api_url: str,
+        repo_name: str,
+        branch: str,
+        per_pg: str | int,
+        known_shas: set[str],
+    ) -> list[dict]:
+        """
+        Get commits for `branch` newest-first, page by page, stopping once a
+        whole page is made up of already-known commits (or pages run out).
+        A full known page, rather than the first known sha, is used to stop
+        as listings are ordered by date, so commits newly brought in by a
+        merge can sit below known ones.
+        """
+        new_commits = []
+        page = 1
+        while True:
+            self.logger.info(
+                f">> Running incremental commit grab for repo {repo_name}, on branch {branch}, in page {page}."
+            )
+            commits_url = make_url(repos_api_url, repo_name, branch, per_pg, page)
+
+            api_response = run_with_retries(
+                fn=lambda: raise_if_response_error(
+                    api_response=self.s.get(url=commits_url, headers=self.headers),
+                    repo_name=repo_name,
+                    logger=self.logger,
+                ),
+                logger=self.logger,
+            )
+            assert api_response.ok, f"API response is: {api_response}"
+
+            json_pg = project_records(api_response.json(), self.commit_schema)
+            unknown = [commit for commit in json_pg if commit["sha"] not in known_shas]
+            new_commits.extend(unknown)
+
+            if len(unknown) == 0 or "next" not in api_response.links:
+                return new_commits
+            page += 1
+
+    def get_branch_commits(
+        self,
+        repo_name: str,
+        branch_sha: str,
+        per_pg: str | int = 100,
+        known_shas: set[str] | None = None,
+    ) -> list[dict]:
+        """
+        All commits on branch `branch_sha`, newest first; or, given
+        `known_shas` (incremental runs), only those not already known.
+        """
+        repos_api_url = "https://api.github.com/repos/"
+        if known_shas is not None:
+            if branch_sha in known_shas:
+                # branch head already seen: all its history is stored
+                self.logger.info(
+                    f"No new commits on branch {branch_sha} of repo {repo_name} since last run."
+                )
+                return []
+            return self._incremental_commit_grabber(
+                repos_api_url, repo_name, branch_sha, per_pg, known_shas
+            )
+
+        try:
+            page = 1  # try first page only
+            commits_url = make_url(repos_api_url, repo_name, branch_sha, per_pg, page)
+
+            # important bit: API request with auth headers
+            api_response = run_with_retries(
+                fn=lambda: raise_if_response_error(
+                    api_response=self.s.get(url=commits_url, headers=self.headers),
+                    repo_name=repo_name,
+                    logger=self.logger,
+                ),
+                logger=self.logger,
+            )
+
+            assert (
+                api_response.status_code != 401
+            ), f"WARNING! The API response code is 401: Unauthorised. Check your GitHub Personal Access Token is not expired. API Response for query {commits_url} is {api_response}"
+            # assertion check on 401 only as unauthorise is more likely to stop whole run than 404 which may apply to given repo only
+
+            commit_links = api_response.links
+
+            if "last" in commit_links:
+                return self._multipage_commit_grabber(
+                    commit_links,
+                    repos_api_url,
+                    repo_name,
+                    branch_sha,
+                    per_pg,
+                    checkpoint=self.make_checkpoint(branch_sha),
+                )
+            return self._singlepage_commit_grabber(
+                repos_api_url, repo_name, branch_sha, per_pg
+            )
+
+        except Exception as e:
+            self.logger.error(f"Exception error at get_all_branches_commits(): {e}")
+            raise
 
     def get_all_branches_commits(
         self,
@@ -160,6 +408,7 @@ class AllBranchesCommitsGetter:
         per_pg=100,
         out_filename: str = "all-branches-commits",
         write_out_location: str = "data/",
+        incremental: bool = False,
     ) -> dict[str, list[str]]:
         """
         Obtain all DEDUPLICATED commits data from all API request pages for ALL BRANCHES of a given GitHub repo `repo_name`.
@@ -173,9 +422,15 @@ class AllBranchesCommitsGetter:
         :type: str
         :param: write_out_location: path of location to write file out to (Default: 'data/')
         :type: str
+        :param incremental: only fetch commits not already in the repo's `<out_filename>_<repo>_store.json` from earlier runs, and merge them in; the dated raw json then holds only newly fetched commits. (Default: False)
+        :type: bool
         :return: `unique_commits_all_branches` dict of lists for repo `repo_name`.
         :rtype: dict
 
+        Raw and deduplicated commits are streamed out branch by branch to
+        `<out_filename>_<repo>_<date>[_deduplicated].ndjson.gz` (see
+        write_branch_commits(); read back with iter_branch_commits()).
+
         Example:
 
         # setting up logger
@@ -190,8 +445,8 @@ class AllBranchesCommitsGetter:
         # run function
         all_branches_commits = allbranchescommitsgetter.get_all_branches_commits(repo_name=repo_name)
         # ... response info from logger
-        INFO:Commits data written out to file for repo JeschkeLab/DeerLab ../../data/all-branches-commits_JeschkeLab-DeerLab_2024-09-23.json.
-        INFO:566 UNIQUE (deduplicated) commits data written out for all branches of JeschkeLab/DeerLab at ../../data/all-branches-commits_JeschkeLab-DeerLab_2024-09-23_deduplicated.json.
+        INFO:Raw repo commits data (including duplicates) from all branches written out to file for repo JeschkeLab/DeerLab ../../data/all-branches-commits_JeschkeLab-DeerLab_2024-09-23.ndjson.gz.
+        INFO:566 UNIQUE (deduplicated) commits data written out for all branches of JeschkeLab/DeerLab at ../../data/all-branches-commits_JeschkeLab-DeerLab_2024-09-23_deduplicated.ndjson.gz.
         """
 
         self.logger.debug(
@@ -203,73 +458,75 @@ class AllBranchesCommitsGetter:
         else:
             write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}"
 
-        write_out_extra_info_json = f"{write_out}_{self.current_date_info}.json"
+        # incremental runs: commits stored from previous runs; new commits are
+        # found against all their shas (see _incremental_commit_grabber())
+        store_path = make_store_path(write_out)
+        stored_commits: dict[str, list] = {}
+        if incremental and os.path.exists(store_path):
+            with open(store_path, "r") as json_file:
+                store = json.load(json_file)
+            stored_commits = store["commits"]
+            self.logger.info(
+                f"Loaded {sum(len(c) for c in stored_commits.values())} previously stored commits for repo {repo_name} from {store_path}."
+            )
+        known_shas = {
+            commit["sha"] for commits in stored_commits.values() for commit in commits
+        }
 
         branches_shas = branchgetter.get_branch_shas(
-            repo_name, self.config_path, per_pg
+            repo_name, self.config_path, per_pg, etag_cache_path=self.etag_cache_path
         )
 
-        all_branches_commits = {}
-
-        for branch_sha in branches_shas:
-            try:
-                page = 1  # try first page only
-                repos_api_url = "https://api.github.com/repos/"
-                commits_url = make_url(
-                    repos_api_url, repo_name, branch_sha, per_pg, page
-                )
+        raw_json = ndjson_path(f"{write_out}_{self.current_date_info}", self.raw_codec)
+        dedup_json = ndjson_path(
+            f"{write_out}_{self.current_date_info}_deduplicated", self.raw_codec
+        )
 
-                # important bit: API request with auth headers
-                api_response = run_with_retries(
-                    fn=lambda: raise_if_response_error(
-                        api_response=self.s.get(url=commits_url, headers=self.headers),
-                        repo_name=repo_name,
-                        logger=self.logger,
-                    ),
-                    logger=self.logger,
+        # each branch's commits are written out as soon as they're got, so
+        # only the deduplicated commits are kept, not every branch's copy
+        new_commits: dict[str, list] = {}
+        unique_commits_all_branches: dict[str, list] = {}
+        seen_shas: set[str] = set()
+        with (
+            NDJSONWriter(raw_json) as raw_writer,
+            NDJSONWriter(dedup_json) as dedup_writer,
+        ):
+            for branch_sha in branches_shas:
+                branch_commits = self.get_branch_commits(
+                    repo_name,
+                    branch_sha,
+                    per_pg,
+                    known_shas=known_shas if incremental and stored_commits else None,
                 )
-
-                assert (
-                    api_response.status_code != 401
-                ), f"WARNING! The API response code is 401: Unauthorised. Check your GitHub Personal Access Token is not expired. API Response for query {commits_url} is {api_response}"
-                # assertion check on 401 only as unauthorise is more likely to stop whole run than 404 which may apply to given repo only
-
-                commit_links = api_response.links
-
-                if "last" in commit_links:
-                    all_commits = self._multipage_commit_grabber(
-                        commit_links, repos_api_url, repo_name, branch_sha, per_pg
-                    )
+                write_branch_commits(raw_writer, branch_sha, branch_commits)
+                if incremental:
+                    new_commits[branch_sha] = branch_commits
                 else:
-                    all_commits = self._singlepage_commit_grabber(
-                        repos_api_url, repo_name, branch_sha, per_pg
+                    unique_branch_commits = deduplicate_commits(
+                        {branch_sha: branch_commits}, shas=seen_shas
+                    )[branch_sha]
+                    unique_commits_all_branches[branch_sha] = unique_branch_commits
+                    write_branch_commits(
+                        dedup_writer, branch_sha, unique_branch_commits
                     )
 
-                all_branches_commits[branch_sha] = all_commits
-
-            except Exception as e:
-                self.logger.error(f"Exception error at get_all_branches_commits(): {e}")
-                raise
-
-        unique_commits_all_branches = deduplicate_commits(all_branches_commits)
-
-        write_out_extra_info_dedup = (
-            f"{write_out}_{self.current_date_info}_deduplicated.json"
-        )
-
-        with open(write_out_extra_info_json, "w") as json_file:
-            json.dump(all_branches_commits, json_file)
-
-        with open(write_out_extra_info_dedup, "w") as json_file:
-            json.dump(unique_commits_all_branches, json_file)
+            if incremental:
+                unique_commits_all_branches = merge_commits(stored_commits, new_commits)
+                with open(store_path, "w") as json_file:
+                    json.dump({"commits": unique_commits_all_branches}, json_file)
+                self.logger.info(
+                    f"{sum(len(c) for c in new_commits.values())} new commits merged into commits store for repo {repo_name} at {store_path}."
+                )
+                for branch_sha, commits in unique_commits_all_branches.items():
+                    write_branch_commits(dedup_writer, branch_sha, commits)
 
-        if not os.path.exists(write_out_extra_info_json):
+        if not os.path.exists(raw_json):
             self.logger.error(
-                f"JSON file does NOT exist at path: {os.path.exists(write_out_extra_info_json)}"
+                f"Raw commits file does NOT exist at path: {os.path.exists(raw_json)}"
             )
 
         self.logger.info(
-            f"Raw repo commits data (including duplicates) from all branches written out to file for repo {repo_name} {write_out_extra_info_json}."
+            f"Raw repo commits data (including duplicates) from all branches written out to file for repo {repo_name} {raw_json}."
         )
 
         # calculate number of unique commits
@@ -278,7 +535,8 @@ class AllBranchesCommitsGetter:
         )
 
         self.logger.info(
-            f"{total_commit_count} UNIQUE (deduplicated) commits written out for all branches of {repo_name} at {write_out_extra_info_dedup}."
+            f"{total_commit_count} UNIQUE (deduplicated) commits written out for all branches of {repo_name} at {dedup_json}."
         )
+        self.clear_checkpoints()
 
         return unique_commits_all_branches
@@ -3,14 +3,16 @@
 import os
 import json
 import datetime
-import requests
-from requests.adapters import HTTPAdapter, Retry
 import traceback
 import logging
 
 import utilities.get_default_logger as loggit
 import githubanalysis.processing.setup_github_auth as ghauth
 from utilities.check_gh_reponse import raise_if_response_error, run_with_retries
+from utilities.github_session import make_github_session, DEFAULT_ETAG_CACHE_PATH
+from utilities.ndjson_stream import NDJSONWriter, ndjson_path, read_ndjson
+from githubanalysis.processing.page_checkpoint import PageCheckpoint
+from githubanalysis.processing.raw_schema import ISSUE_SCHEMA, project_records
 
 REPOS_API_URL = "https://api.github.com/repos/"
 
@@ -26,10 +28,43 @@ def make_url(
     pulls: bool,
     per_pg: int | str,
     page: int | str,
+    since: str | None = None,
 ):
+    if (
+        since is not None
+    ):  # only issues updated at or after `since`, oldest update first
+        return f"{repos_api_url}{repo_name}/issues?state={state}&pulls={pulls}&since={since}&sort=updated&direction=asc&per_page={per_pg}&page={page}"
     return f"{repos_api_url}{repo_name}/issues?state={state}&pulls={pulls}&per_page={per_pg}&page={page}"
 
 
+def upsert_issues(stored_issues: list[dict], new_issues: list[dict]) -> list[dict]:
+    """
+    Merge `new_issues` into `stored_issues` by issue `id`, replacing stored
+    versions of updated issues. Returned newest-created first (by issue
+    number), as GH API issue listings are by default.
+    """
+    issues_by_id = {issue["id"]: issue for issue in stored_issues}
+    for issue in new_issues:
+        issues_by_id[issue["id"]] = issue
+    return sorted(issues_by_id.values(), key=lambda x: x["number"], reverse=True)
+
+
+def max_updated_at(issues: list[dict]) -> str | None:
+    """Latest `updated_at` timestamp (ISO 8601 strings sort by time) in `issues`."""
+    return max((issue["updated_at"] for issue in issues), default=None)
+
+
+def read_raw_issues(path: str) -> list[dict]:
+    """
+    Issues from a raw issues dump: ndjson(.gz/.zst) of one issue per line,
+    or a (whole file) json list from before streaming write-out.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    return read_ndjson(path)
+
+
 def is_this_single_page(issue_links: dict) -> bool:
     if issue_links == {}:
         return True
@@ -55,6 +90,10 @@ class IssueGetter:
         in_notebook: bool,
         config_path: str,
         logger: None,
+        etag_cache_path: str | None = DEFAULT_ETAG_CACHE_PATH,
+        checkpoint_dir: str | None = "data/checkpoints/",
+        raw_codec: str = "gzip",
+        keep_full_payload: bool = False,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -66,15 +105,12 @@ class IssueGetter:
         else:
             self.logger = logger
 
-        self.s = requests.Session()
-        retries = Retry(
-            total=10,
-            connect=5,
-            read=3,
-            backoff_factor=1,
-            status_forcelist=[202, 502, 503, 504],
+        if etag_cache_path is not None and in_notebook:
+            etag_cache_path = f"../../{etag_cache_path}"
+        # conditional requests: unchanged pages on refresh runs come back as 304s
+        self.s = make_github_session(
+            etag_cache_path=etag_cache_path, config_path=config_path
         )
-        self.s.mount("https://", HTTPAdapter(max_retries=retries))
         self.gh_token = ghauth.setup_github_auth(config_path=config_path)
         self.headers = {"Authorization": "token " + self.gh_token}
         self.config_path = config_path
@@ -84,6 +120,23 @@ class IssueGetter:
             "%Y-%m-%d"
         )  # run this at start of script not in loop to avoid midnight/long-run commits
         self.sanitised_repo_name = repo_name.replace("/", "-")
+        # spill file of issue pages done, so a rerun after a failure
+        # part-way through a big repo doesn't start again (None disables)
+        if checkpoint_dir is not None and in_notebook:
+            checkpoint_dir = f"../../{checkpoint_dir}"
+        self.checkpoint_dir = checkpoint_dir
+        # compression of raw issues dumps: 'none', 'gzip' or 'zstd'
+        self.raw_codec = raw_codec
+        # keep only fields used downstream (see raw_schema) unless asked for GH's full payloads
+        self.issue_schema = None if keep_full_payload else ISSUE_SCHEMA
+
+    def make_checkpoint(self, since: str | None = None) -> PageCheckpoint | None:
+        if self.checkpoint_dir is None:
+            return None
+        since_info = "" if since is None else f"_since-{since.replace(':', '-')}"
+        return PageCheckpoint(
+            f"{self.checkpoint_dir}issues_{self.sanitised_repo_name}{since_info}.ndjson"
+        )
 
     def check_repo_has_issues(self, repo_name: str) -> bool:
         repos_api_url = "https://api.github.com/repos/"
@@ -122,7 +175,18 @@ class IssueGetter:
         self,
         repos_api_url: str,
         repo_name: str,
+        since: str | None = None,
+        checkpoint: PageCheckpoint | None = None,
+        writer: NDJSONWriter | None = None,
     ) -> list[dict]:
+        """
+        Get all pages of issues by following `next` links.
+        If `checkpoint` is given, each page and its `next` link is saved to
+        it when got, and a rerun carries on from its last page.
+        If `writer` is given, issues are written to it a page at a time.
+        Issues are kept once each by `id`, as the listing can shift between
+        pages (or since a checkpointed run) so an issue shows up twice.
+        """
         page = 1
 
         issues_url = make_url(
@@ -132,11 +196,29 @@ class IssueGetter:
             pulls=True,
             per_pg=100,  # default is 30 on GH API
             page=page,
+            since=since,
         )
 
         all_issues = []
+        seen_ids: set[int] = set()
         api_response = None
 
+        if checkpoint is not None and checkpoint.resume_point() is not None:
+            last_page, next_url = checkpoint.resume_point()
+            for issue in checkpoint.items():
+                if issue["id"] not in seen_ids:
+                    seen_ids.add(issue["id"])
+                    all_issues.append(issue)
+            self.logger.info(
+                f"Resuming issue grab for repo {repo_name} after page {last_page}; {len(all_issues)} issues already got."
+            )
+            if writer is not None:
+                writer.write_many(all_issues)
+            if next_url is None:
+                return all_issues
+            issues_url = next_url
+            page = last_page + 1
+
         while page < 50000:  # stupidly large number just in case we never escape
             self.logger.info(
                 f">> Running issue grab for repo {repo_name}, in page {page}."
@@ -159,21 +241,37 @@ class IssueGetter:
                 f"API request headers limit/remaining: {headers_out}/{headers_out.get('x-ratelimit-remaining')}"
             )
 
-            json_pg = api_response.json()  # get crucial json
-            if not json_pg:  # check emptiness of result.
+            json_pg = project_records(
+                api_response.json(), self.issue_schema
+            )  # get crucial json
+            if not json_pg and since is not None:
+                self.logger.info(f"No issues updated since {since}.")
+            elif not json_pg:  # check emptiness of result.
                 self.logger.debug("Result of api_response.json() is empty list.")
                 self.logger.error(
                     f"Result of API request is an empty json. Error - cannot currently handle this result nicely. Traceback: {traceback.format_exc()}"
                 )
 
             # this should be the important aggregator bit...
-            all_issues.extend(json_pg)
+            new_issues = [issue for issue in json_pg if issue["id"] not in seen_ids]
+            seen_ids.update(issue["id"] for issue in new_issues)
+            all_issues.extend(new_issues)
+            if writer is not None:
+                writer.write_many(new_issues)
             self.logger.info(f"all_issues length is now {len(all_issues)}")
 
             self.logger.debug(f"Total number of issues grabbed is {len(all_issues)}.")
 
             # expect None if there is no next. .get() doesn't fail if out of scope:
             response_next = api_response.links.get("next")
+            if checkpoint is not None:
+                checkpoint.append(
+                    page,
+                    json_pg,
+                    next_url=response_next["url"]
+                    if response_next is not None
+                    else None,
+                )
 
             # if this is a single-page repo, it runs once then returns out.
             if response_next is not None:
@@ -193,15 +291,19 @@ class IssueGetter:
         repo_name: str,
         out_filename="all-issues",
         write_out_location="data/",
+        since: str | None = None,
     ) -> list:
         """
         Obtains all fields of data from all pages for a given github repo `repo_name`.
+        If `since` is given, only issues updated at or after that time are obtained.
         :param repo_name: cleaned `repo_name` string without github url root or trailing slashes.
         :type: str
         :param out_filename: filename suffix indicating issues content (Default: 'issues')
         :type: str
         :param: write_out_location: path of location to write file out to (Default: 'data/')
         :type: str
+        :param since: ISO 8601 timestamp e.g. '2024-10-17T15:16:33Z'; only get issues updated since then. (Default: None; get all issues)
+        :type: str
         :returns: `all_issues` pd.DataFrame containing 30 fields per issue for given repo `repo_name`.
         :rtype: Dict
         """
@@ -215,18 +317,26 @@ class IssueGetter:
         else:
             write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}"
 
-        write_out_extra_info_json = f"{write_out}_{self.current_date_info}.json"
+        # one issue per line, written out a page at a time
+        write_out_extra_info_json = ndjson_path(
+            f"{write_out}_{self.current_date_info}", self.raw_codec
+        )
 
         # create empty dict to store issues data
         all_issues = {}
 
         # count open issue tickets
+        checkpoint = self.make_checkpoint(since=since)
         try:
             self.logger.info("issue_links: multipage function used.")
-            all_issues = self._page_issues_grabber(
-                REPOS_API_URL,
-                repo_name,
-            )
+            with NDJSONWriter(write_out_extra_info_json) as writer:
+                all_issues = self._page_issues_grabber(
+                    REPOS_API_URL,
+                    repo_name,
+                    since=since,
+                    checkpoint=checkpoint,
+                    writer=writer,
+                )
             self.logger.debug(f"Type of all_issues is: {type(all_issues)}")
 
         except Exception as e:
@@ -239,8 +349,8 @@ class IssueGetter:
             f"{len(all_issues)} issues returned from repo {repo_name} at {write_out_extra_info_json}."
         )
 
-        with open(write_out_extra_info_json, "w") as json_file:
-            json.dump(all_issues, json_file)
+        if checkpoint is not None:
+            checkpoint.clear()
 
         if not os.path.exists(write_out_extra_info_json):
             self.logger.error(
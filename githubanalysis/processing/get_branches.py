@@ -1,14 +1,12 @@
 """Function to retrieve and return branches info for a given GitHub repository."""
 
-import requests
-from requests.adapters import HTTPAdapter, Retry
-
 import githubanalysis.processing.setup_github_auth as ghauth
 from utilities.check_gh_reponse import (
     run_with_retries,
     raise_if_response_error,
 )
 import utilities.get_default_logger as loggit
+from utilities.github_session import make_github_session, DEFAULT_ETAG_CACHE_PATH
 
 
 logger = loggit.get_default_logger(
@@ -20,7 +18,10 @@ logger = loggit.get_default_logger(
 
 
 def get_branch_shas(
-    repo_name, config_path="githubanalysis/config.cfg", per_pg=100
+    repo_name,
+    config_path="githubanalysis/config.cfg",
+    per_pg=100,
+    etag_cache_path: str | None = DEFAULT_ETAG_CACHE_PATH,
 ) -> set[str]:
     """
     Get branch info for given repo repo_name and return it.
@@ -31,6 +32,8 @@ def get_branch_shas(
     :type: str
     :param per_pg: number of items per page in paginated GitHub API requests. Default=100 (GH's default= 30)
     :type: int
+    :param etag_cache_path: file path of ETag store for conditional requests, or None to not use them. Default='data/etag_cache.sqlite'.
+    :type: str | None
     :return: Branch hashes in a set for repo `repo_name`.
     :rtype: set of strings
 
@@ -42,15 +45,7 @@ def get_branch_shas(
     gh_token = ghauth.setup_github_auth(config_path=config_path)
     headers = {"Authorization": "token " + gh_token}
 
-    s = requests.Session()
-    retries = Retry(
-        total=10,
-        connect=5,
-        read=3,
-        backoff_factor=1,
-        status_forcelist=[202, 502, 503, 504],
-    )
-    s.mount("https://", HTTPAdapter(max_retries=retries))
+    s = make_github_session(etag_cache_path=etag_cache_path, config_path=config_path)
 
     # assemble API call
     api_response = run_with_retries(
@@ -3,15 +3,17 @@
 import pandas as pd
 import logging
 import datetime
-import requests
-from requests.adapters import HTTPAdapter, Retry
 
 import utilities.get_default_logger as loggit
 from utilities.check_gh_reponse import (
     raise_if_response_error,
     run_with_retries,
+    RepoNotFoundError,
+    UnexpectedAPIError,
 )
+from utilities.github_session import make_github_session
 import githubanalysis.processing.setup_github_auth as ghauth
+from githubanalysis.processing.commit_details_cache import CommitDetailsCache
 
 from typing import TypedDict
 
@@ -24,11 +26,83 @@ class CommitInfo(TypedDict):
     deletions: int
 
 
+class CommitTotals(TypedDict):
+    commit_hash: str
+    n_files_changed: int | None
+    n_changes: int | None
+    additions: int | None
+    deletions: int | None
+
+
+GRAPHQL_API_URL = "https://api.github.com/graphql"
+
+
 def make_commit_url(repos_api_url: str, repo_name: str, commit_sha: str):
     """Combine elements of API string for github API request"""
     return f"{repos_api_url}{repo_name}/commits/{commit_sha}"
 
 
+def make_commits_graphql_query(repo_name: str, commit_shas: list[str]) -> str:
+    """
+    Build a single GraphQL query requesting change totals for several
+    commits at once, using one aliased `object(oid:)` lookup per sha.
+    Aliases are `c0`, `c1`, ... in the same order as `commit_shas`.
+    """
+    owner, name = repo_name.split("/", 1)
+    lookups = "\n".join(
+        f'    c{i}: object(oid: "{sha}") {{ ... on Commit {{ oid additions deletions changedFilesIfAvailable }} }}'
+        for i, sha in enumerate(commit_shas)
+    )
+    return f'query {{\n  repository(owner: "{owner}", name: "{name}") {{\n{lookups}\n  }}\n}}'
+
+
+def parse_commits_graphql_response(
+    response_json: dict, commit_shas: list[str]
+) -> list[CommitTotals]:
+    """
+    Pull change totals out of the json returned for a query built by
+    `make_commits_graphql_query()`. Shas GitHub could not resolve to a
+    commit with totals (null nodes, other git objects which come back as
+    `{}`, or commits too big for `changedFilesIfAvailable`) are left out,
+    for callers to get another way; commits touching no files get None
+    totals, matching the REST path where `get_commit_changes()` returns
+    None for those.
+    """
+    repository = (response_json.get("data") or {}).get("repository") or {}
+    totals: list[CommitTotals] = []
+    for i, sha in enumerate(commit_shas):
+        commit = repository.get(f"c{i}")
+        if (
+            not isinstance(commit, dict)
+            or commit.get("additions") is None
+            or commit.get("deletions") is None
+            or commit.get("changedFilesIfAvailable") is None
+        ):
+            continue
+        n_files = commit["changedFilesIfAvailable"]
+        if n_files == 0:
+            totals.append(
+                {
+                    "commit_hash": sha,
+                    "n_files_changed": None,
+                    "n_changes": None,
+                    "additions": None,
+                    "deletions": None,
+                }
+            )
+        else:
+            totals.append(
+                {
+                    "commit_hash": sha,
+                    "n_files_changed": n_files,
+                    "n_changes": commit["additions"] + commit["deletions"],
+                    "additions": commit["additions"],
+                    "deletions": commit["deletions"],
+                }
+            )
+    return totals
+
+
 class CommitChanges:
     logger: logging.Logger
 
@@ -38,6 +112,8 @@ class CommitChanges:
         in_notebook: bool,
         config_path: str,
         logger: None | logging.Logger = None,
+        cache_path: str | None = "data/commit_details_cache.sqlite",
+        pool_maxsize: int = 10,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -49,18 +125,11 @@ class CommitChanges:
         else:
             self.logger = logger
 
-        self.s = requests.Session()
-        self.s.mount(
-            "https://",
-            HTTPAdapter(
-                max_retries=Retry(
-                    total=10,
-                    connect=5,
-                    read=3,
-                    backoff_factor=1,
-                    status_forcelist=[202, 502, 503, 504],
-                )
-            ),
+        # no conditional requests here: commit details never change, and
+        # are kept in CommitDetailsCache instead. pool_maxsize: connections
+        # kept open for threads fetching at once (see RunCommits.enrich_workers)
+        self.s = make_github_session(
+            etag_cache_path=None, pool_maxsize=pool_maxsize, config_path=config_path
         )
         self.gh_token = ghauth.setup_github_auth(config_path=config_path)
         self.headers = {"Authorization": "token " + self.gh_token}
@@ -72,9 +141,18 @@ class CommitChanges:
         )  # run this at start of script not in loop to avoid midnight/long-run commits
         self.sanitised_repo_name = repo_name.replace("/", "-")
         self.repo_name = repo_name
+        # commit details never change for a given sha, so keep them on disk
+        # between runs; cache_path=None turns this off.
+        if cache_path is not None and in_notebook:
+            cache_path = f"../../{cache_path}"
+        self.cache = (
+            CommitDetailsCache(path=cache_path) if cache_path is not None else None
+        )
 
     def __del__(self):
         self.s.close()
+        if getattr(self, "cache", None) is not None:
+            self.cache.close()
 
     def get_commit_changes_with_retries(self, commit_hash: str, max_retries=25):
         return run_with_retries(
@@ -83,7 +161,20 @@ class CommitChanges:
             max_retries,
         )
 
-    def get_commit_changes(self, commit_hash: str) -> pd.DataFrame | None:
+    def get_commit_json(self, commit_hash: str) -> dict:
+        """
+        Get GH API commit details json for `commit_hash`, from the on-disk
+        cache if it's been fetched before, otherwise from the API (and
+        then stored in the cache).
+        """
+        if self.cache is not None:
+            commit_json = self.cache.get(self.repo_name, commit_hash)
+            if commit_json is not None:
+                self.logger.info(
+                    f"Using cached commit details for commit-hash {commit_hash} for repo {self.repo_name}."
+                )
+                return commit_json
+
         repos_api_url = "https://api.github.com/repos/"
         commit_url = make_commit_url(repos_api_url, self.repo_name, commit_hash)
 
@@ -110,6 +201,13 @@ class CommitChanges:
         )
 
         commit_json = api_response.json()
+        if self.cache is not None:
+            self.cache.put(self.repo_name, commit_hash, commit_json)
+
+        return commit_json
+
+    def get_commit_changes(self, commit_hash: str) -> pd.DataFrame | None:
+        commit_json = self.get_commit_json(commit_hash=commit_hash)
 
         if commit_json["files"] == []:
             commit_changes: list[CommitInfo] = [
@@ -153,6 +251,124 @@ class CommitChanges:
             else:
                 return commit_changes_df
 
+    def _graphql_commits_batch(self, commit_shas: list[str]) -> list[CommitTotals]:
+        query = make_commits_graphql_query(self.repo_name, commit_shas)
+
+        api_response = run_with_retries(
+            fn=lambda: raise_if_response_error(
+                api_response=self.s.post(
+                    url=GRAPHQL_API_URL, headers=self.headers, json={"query": query}
+                ),
+                repo_name=self.repo_name,
+                logger=self.logger,
+            ),
+            logger=self.logger,
+        )
+        response_json = api_response.json()
+
+        if response_json.get("errors"):
+            self.logger.error(
+                f"GraphQL query for {len(commit_shas)} commits of repo {self.repo_name} returned errors: {response_json['errors']}"
+            )
+        if (response_json.get("data") or {}).get("repository") is None:
+            raise UnexpectedAPIError(
+                f"GraphQL response for repo {self.repo_name} contains no repository data; errors: {response_json.get('errors')}"
+            )
+
+        return parse_commits_graphql_response(response_json, commit_shas)
+
+    def get_commits_changes_batch(
+        self, commit_hashes: list[str], batch_size: int = 50
+    ) -> pd.DataFrame:
+        """
+        Get change totals for many commits using the GitHub GraphQL API,
+        `batch_size` commits per request, rather than one REST request per
+        commit as in get_commit_changes( ).
+
+        GraphQL does not list the files changed by a commit, so this gives
+        counts only (no filenames): one row per commit with columns
+        commit_hash, n_files_changed, n_changes, additions, deletions.
+        `n_changes` is additions + deletions, which is what
+        get_commit_total_changes( ) sums over per-file 'changes'.
+        Commits GraphQL can't give totals for are got one at a time from
+        the REST API instead (see get_commit_totals_rest( )); any that
+        can't be got there either are logged and left out.
+
+        :param commit_hashes: commit shas to get change totals for.
+        :type: list[str]
+        :param batch_size: number of commits per GraphQL request (Default: 50; GitHub caps query complexity so keep this <= 100)
+        :type: int
+        :return: dataframe of change totals per commit.
+        :rtype: pd.DataFrame
+        """
+        assert 0 < batch_size <= 100, "batch_size must be between 1 and 100."
+
+        totals: list[CommitTotals] = []
+        for pos in range(0, len(commit_hashes), batch_size):
+            batch = list(commit_hashes[pos : pos + batch_size])
+            self.logger.info(
+                f"Getting change totals for commits {pos + 1}-{pos + len(batch)} of {len(commit_hashes)} for repo {self.repo_name} via GraphQL."
+            )
+            batch_totals = {
+                commit_totals["commit_hash"]: commit_totals
+                for commit_totals in self._graphql_commits_batch(batch)
+            }
+            unresolved = [sha for sha in batch if sha not in batch_totals]
+            if unresolved:
+                self.logger.warning(
+                    f"{len(unresolved)} of {len(batch)} commits could not be resolved via GraphQL for repo {self.repo_name}; getting those via REST."
+                )
+            for sha in unresolved:
+                commit_totals = self.get_commit_totals_rest(sha)
+                if commit_totals is not None:
+                    batch_totals[sha] = commit_totals
+            totals.extend(batch_totals[sha] for sha in batch if sha in batch_totals)
+
+        return pd.DataFrame(
+            totals,
+            columns=[
+                "commit_hash",
+                "n_files_changed",
+                "n_changes",
+                "additions",
+                "deletions",
+            ],
+        )
+
+    def get_commit_totals_rest(self, commit_hash: str) -> CommitTotals | None:
+        """
+        Change totals for `commit_hash` from its REST commit details, in the
+        same form as parse_commits_graphql_response( ) gives; None (logged)
+        if the API can't give them.
+        """
+        try:
+            commit_changes_df = self.get_commit_changes_with_retries(
+                commit_hash=commit_hash
+            )
+        except (UnexpectedAPIError, RepoNotFoundError) as e:
+            self.logger.error(
+                f"Could not get changes for commit {commit_hash} of repo {self.repo_name} via REST either; skipping it. Error: {e}"
+            )
+            return None
+
+        n_files, _ = self.get_commit_files_changed(commit_changes_df, commit_hash)
+        n_changes, _ = self.get_commit_total_changes(commit_changes_df, commit_hash)
+        if n_files is None:
+            return {
+                "commit_hash": commit_hash,
+                "n_files_changed": None,
+                "n_changes": None,
+                "additions": None,
+                "deletions": None,
+            }
+        return {
+            "commit_hash": commit_hash,
+            "n_files_changed": n_files,
+            "n_changes": int(n_changes),
+            "additions": int(commit_changes_df.additions.sum()),
+            "deletions": int(commit_changes_df.deletions.sum()),
+        }
+
     def get_commit_total_changes(
         self, commit_changes_df: pd.DataFrame | None, commit_hash: str
     ) -> tuple[int | None, str]:
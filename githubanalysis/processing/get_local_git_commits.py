@@ -0,0 +1,313 @@
+"""Get all-branches commits and per-commit file changes for a GitHub repository from a single local mirror clone instead of the GH API."""
+
+import os
+import re
+import shutil
+import logging
+import datetime
+import subprocess
+import pandas as pd
+
+import utilities.get_default_logger as loggit
+from utilities.check_gh_reponse import RepoNotFoundError
+from utilities.ndjson_stream import NDJSONWriter, ndjson_path
+from githubanalysis.processing.get_all_branches_commits import (
+    deduplicate_commits,
+    write_branch_commits,
+)
+from githubanalysis.processing.get_commit_changes import CommitInfo
+
+# field and record separators for `git log --format` output;
+# these can't appear in names, emails, dates or (sane) commit messages.
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+LOG_FORMAT = FIELD_SEP.join(["%H", "%an", "%ae", "%ad", "%cn", "%ce", "%cd", "%B"])
+
+# e.g. 5812129+FlicAnderson@users.noreply.github.com or FlicAnderson@users.noreply.github.com
+NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?(?P<login>[^@]+)@users\.noreply\.github\.com$")
+
+
+def make_clone_url(repo_name: str) -> str:
+    return f"https://github.com/{repo_name}.git"
+
+
+def login_from_email(email: str) -> str | None:
+    """
+    Local git objects only hold name and email, not GitHub usernames.
+    GitHub 'noreply' emails contain the username, so use that if present.
+    """
+    match = NOREPLY_EMAIL.match(email)
+    return match.group("login") if match is not None else None
+
+
+def parse_numstat(numstat: str) -> list[tuple[int, int, str]]:
+    """
+    Parse `--numstat -z` output into (additions, deletions, filename) per file.
+    With -z, paths are given as-is (not C-quoted) and each entry ends in a
+    NUL; renames have an empty path then old and new paths as separate
+    NUL-ended fields. The new path is kept, as the GH API reports.
+    """
+    files = []
+    fields = iter(numstat.split("\0"))
+    for field in fields:
+        field = field.lstrip("\n")  # newline between log message and numstat
+        if field == "":
+            continue
+        added, deleted, path = field.split("\t", 2)
+        if path == "":  # rename: old path, new path follow
+            next(fields)
+            path = next(fields)
+        # binary files show as `-`; GH API reports 0 changes for them
+        additions = 0 if added == "-" else int(added)
+        deletions = 0 if deleted == "-" else int(deleted)
+        files.append((additions, deletions, path))
+    return files
+
+
+def parse_git_log(git_log_output: str) -> tuple[dict[str, dict], dict[str, list]]:
+    """
+    Parse output of `git log --numstat -z --format=<RECORD_SEP><LOG_FORMAT><FIELD_SEP>`
+    into commit records shaped like the GH API commits listing (the fields
+    used by CommitReformatter), and per-commit file change lists shaped
+    like CommitInfo rows from CommitChanges.get_commit_changes().
+    """
+    commits: dict[str, dict] = {}
+    changes: dict[str, list] = {}
+
+    for record in git_log_output.split(RECORD_SEP)[1:]:
+        fields = record.split(FIELD_SEP)
+        sha, a_name, a_email, a_date, c_name, c_email, c_date, message, numstat = fields
+
+        author_login = login_from_email(a_email)
+        committer_login = login_from_email(c_email)
+
+        commits[sha] = {
+            "sha": sha,
+            "commit": {
+                "author": {"name": a_name, "email": a_email, "date": a_date},
+                "committer": {"name": c_name, "email": c_email, "date": c_date},
+                "message": message.rstrip("\n"),
+            },
+            "author": {"login": author_login} if author_login is not None else None,
+            "committer": {"login": committer_login}
+            if committer_login is not None
+            else None,
+        }
+
+        commit_changes: list[CommitInfo] = [
+            {
+                "commit_hash": sha,
+                "filename": path,
+                "changes": additions + deletions,
+                "additions": additions,
+                "deletions": deletions,
+            }
+            for additions, deletions, path in parse_numstat(numstat)
+        ]
+        changes[sha] = commit_changes
+
+    return commits, changes
+
+
+class LocalGitCommitsGetter:
+    # if not given a better option, use my default settings for logging
+    logger: logging.Logger
+
+    def __init__(
+        self,
+        repo_name,
+        in_notebook: bool,
+        clone_location: str = "data/clones/",
+        logger: None | logging.Logger = None,
+    ) -> None:
+        if logger is None:
+            self.logger = loggit.get_default_logger(
+                console=False,
+                set_level_to="INFO",
+                log_name="logs/get_local_git_commits_logs.txt",
+                in_notebook=in_notebook,
+            )
+        else:
+            self.logger = logger
+
+        self.in_notebook = in_notebook
+        # write-out file setup
+        self.current_date_info = datetime.datetime.now().strftime(
+            "%Y-%m-%d"
+        )  # run this at start of script not in loop to avoid midnight/long-run commits
+        self.sanitised_repo_name = repo_name.replace("/", "-")
+        self.repo_name = repo_name
+
+        if self.in_notebook:
+            clone_location = f"../../{clone_location}"
+        self.clone_path = f"{clone_location}{self.sanitised_repo_name}.git"
+
+        self.commits: dict[str, dict] = {}
+        self.changes: dict[str, list] = {}
+
+    def _git(self, *args: str) -> str:
+        completed = subprocess.run(
+            ["git", "-C", self.clone_path, *args],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env={**os.environ, "TZ": "UTC"},
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"git {args[0]} failed for repo {self.repo_name} at {self.clone_path}: {completed.stderr.strip()}"
+            )
+        return completed.stdout
+
+    def clone_repo(self, clone_url: str | None = None) -> str:
+        """
+        Make (or refresh) a bare mirror clone of the repo at `self.clone_path`.
+        Uses https://github.com/<repo_name>.git unless `clone_url` is given.
+        """
+        if clone_url is None:
+            clone_url = make_clone_url(self.repo_name)
+
+        if os.path.isdir(self.clone_path):
+            self.logger.info(
+                f"Updating existing mirror clone of {self.repo_name} at {self.clone_path}."
+            )
+            self._git("remote", "update", "--prune")
+            return self.clone_path
+
+        self.logger.info(
+            f"Mirror cloning {self.repo_name} from {clone_url} into {self.clone_path}."
+        )
+        os.makedirs(os.path.dirname(self.clone_path), exist_ok=True)
+        completed = subprocess.run(
+            ["git", "clone", "--mirror", "--quiet", clone_url, self.clone_path],
+            capture_output=True,
+            text=True,
+            # stop git prompting for credentials on private/missing repos
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+        if completed.returncode != 0:
+            if os.path.isdir(self.clone_path):
+                shutil.rmtree(self.clone_path)
+            raise RepoNotFoundError(
+                f"Could not mirror clone repo {self.repo_name} from {clone_url}: {completed.stderr.strip()}"
+            )
+        return self.clone_path
+
+    def read_commits_and_changes(self) -> None:
+        """
+        Read every commit reachable from any branch, plus its numstat file
+        changes, in one `git log` pass over the local clone. Uses -z so that
+        renamed and non-ASCII paths come out as-is, as the GH API gives them.
+        Uses `--branches` rather than `--all` as mirror clones also hold
+        GitHub's refs/pull/* refs, which the GH API branches path skips.
+        Merge commits are diffed against their first parent, as the GH API does.
+        """
+        git_log_output = self._git(
+            "log",
+            "--branches",
+            "--numstat",
+            "-z",
+            "--diff-merges=first-parent",
+            "--date=format-local:%Y-%m-%dT%H:%M:%SZ",
+            f"--format={RECORD_SEP}{LOG_FORMAT}{FIELD_SEP}",
+        )
+        self.commits, self.changes = parse_git_log(git_log_output)
+        self.logger.info(
+            f"Read {len(self.commits)} commits from local clone of {self.repo_name}."
+        )
+
+    def get_branch_shas(self) -> list[str]:
+        """
+        Get branch head shas from local clone; cf get_branches.get_branch_shas().
+        """
+        refs = self._git("for-each-ref", "--format=%(objectname)", "refs/heads/")
+        return list(dict.fromkeys(refs.split()))  # unique, in ref order
+
+    def get_all_branches_commits(
+        self,
+        clone_url: str | None = None,
+        out_filename: str = "all-branches-commits",
+        write_out_location: str = "data/",
+    ) -> dict[str, list]:
+        """
+        Obtain all DEDUPLICATED commits for ALL BRANCHES of the repo from a
+        local mirror clone. Output matches (and is written out with the same
+        filenames as) AllBranchesCommitsGetter.get_all_branches_commits(),
+        except that `author` and `committer` GitHub usernames are only known
+        where the commit email is a GitHub 'noreply' address.
+        Clones and reads the repo only if its commits aren't already loaded
+        (e.g. by clone_repo() then read_commits_and_changes()).
+
+        :param clone_url: url/path to clone from (Default: None; uses GitHub https url for repo)
+        :type: str
+        :param out_filename: filename suffix indicating commits content (Default: 'all-branches-commits')
+        :type: str
+        :param: write_out_location: path of location to write file out to (Default: 'data/')
+        :type: str
+        :return: `unique_commits_all_branches` dict of lists keyed by branch sha.
+        :rtype: dict
+
+        Example:
+
+        localgitcommitsgetter = LocalGitCommitsGetter(repo_name='JeschkeLab/DeerLab', in_notebook=False)
+        all_branches_commits = localgitcommitsgetter.get_all_branches_commits()
+        commit_changes_df = localgitcommitsgetter.get_commit_changes(commit_hash=...)
+        """
+        if not self.commits:
+            self.clone_repo(clone_url=clone_url)
+            self.read_commits_and_changes()
+
+        all_branches_commits = {}
+        for branch_sha in self.get_branch_shas():
+            branch_commits = self._git("rev-list", branch_sha).split()
+            all_branches_commits[branch_sha] = [
+                self.commits[sha] for sha in branch_commits
+            ]
+
+        unique_commits_all_branches = deduplicate_commits(all_branches_commits)
+
+        if self.in_notebook:
+            write_out = f"../../{write_out_location}{out_filename}_{self.sanitised_repo_name}"  # look further up for correct path
+        else:
+            write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}"
+
+        write_out_extra_info_json = ndjson_path(f"{write_out}_{self.current_date_info}")
+        write_out_extra_info_dedup = ndjson_path(
+            f"{write_out}_{self.current_date_info}_deduplicated"
+        )
+
+        with NDJSONWriter(write_out_extra_info_json) as writer:
+            for branch_sha, commits in all_branches_commits.items():
+                write_branch_commits(writer, branch_sha, commits)
+
+        with NDJSONWriter(write_out_extra_info_dedup) as writer:
+            for branch_sha, commits in unique_commits_all_branches.items():
+                write_branch_commits(writer, branch_sha, commits)
+
+        total_commit_count = sum(
+            len(commits_list) for commits_list in unique_commits_all_branches.values()
+        )
+        self.logger.info(
+            f"{total_commit_count} UNIQUE (deduplicated) commits from local clone written out for all branches of {self.repo_name} at {write_out_extra_info_dedup}."
+        )
+
+        return unique_commits_all_branches
+
+    def get_commit_changes(self, commit_hash: str) -> pd.DataFrame | None:
+        """
+        Per-file changes for `commit_hash` from the local clone, in the same
+        shape as CommitChanges.get_commit_changes(): None for commits not in
+        the clone or with no file changes. Needs get_all_branches_commits()
+        (or read_commits_and_changes()) run first.
+        """
+        if commit_hash not in self.changes:
+            self.logger.error(
+                f"Commit {commit_hash} not found in local clone of {self.repo_name}."
+            )
+            return None
+
+        commit_changes = self.changes[commit_hash]
+        if commit_changes == []:
+            return None
+        return pd.DataFrame(commit_changes)
@@ -7,7 +7,17 @@ import pandas as pd
 from pathlib import Path
 
 import utilities.get_default_logger as loggit
-from githubanalysis.processing.get_all_pages_issues import IssueGetter, NoIssuesError
+from utilities.frame_storage import read_frame
+from githubanalysis.processing.job_queue import JobQueue
+from githubanalysis.processing.dataset_catalog import DatasetCatalog
+from githubanalysis.processing.get_all_pages_issues import (
+    IssueGetter,
+    NoIssuesError,
+    upsert_issues,
+    max_updated_at,
+    read_raw_issues,
+)
+from utilities.ndjson_stream import ndjson_path
 
 
 class RunIssues:
@@ -26,6 +36,11 @@ class RunIssues:
         config_path: str,
         write_read_location: str,
         logger: None | logging.Logger = None,
+        incremental: bool = False,
+        resume: bool = True,
+        job_queue: JobQueue | None = None,
+        storage_format: str = "csv",
+        keep_full_payload: bool = False,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -46,6 +61,25 @@ class RunIssues:
         self.sanitised_repo_name = repo_name.replace("/", "-")
         self.repo_name = repo_name
         self.write_read_location = write_read_location
+        # only fetch issues updated since last run, merging into stored issues
+        self.incremental = incremental
+        # per-stage state of this repo's runs (see JobQueue): reuse outputs
+        # of stages already done, on any date, unless resume is False
+        self.resume = resume and not incremental
+        # default JobQueue (at write_read_location) is made when a stage first runs
+        self._job_queue = job_queue
+        # "csv" or "parquet" (typed columns; needs pyarrow) for processed issues
+        self.storage_format = storage_format
+        # raw issues dumps keep GH's full payloads, not just fields in raw_schema.ISSUE_SCHEMA
+        self.keep_full_payload = keep_full_payload
+
+    @property
+    def job_queue(self) -> JobQueue:
+        if self._job_queue is None:
+            self._job_queue = JobQueue(
+                path=f"{self.write_read_location}workflow_jobs.sqlite"
+            )
+        return self._job_queue
 
     def check_repo_valid(self) -> bool:
         issuesgetter = IssueGetter(
@@ -69,36 +103,95 @@ class RunIssues:
     def check_existing_formatted_issues(self):
         pass
 
+    def get_issues_incremental(self, issuesgetter: IssueGetter) -> list:
+        """
+        Get issues updated since the newest `updated_at` in this repo's
+        stored issues (all issues if nothing is stored yet), upsert them
+        into the stored issues by `id`, and save the result back.
+        """
+        if self.in_notebook:
+            store_filename = f"../../{self.write_read_location}all-issues_{self.sanitised_repo_name}_store.json"  # look further up for correct path
+        else:
+            store_filename = f"{self.write_read_location}all-issues_{self.sanitised_repo_name}_store.json"
+        store_path = Path(store_filename)
+
+        stored_issues = []
+        since = None
+        if store_path.is_file():
+            with open(store_filename) as f1:
+                store = json.load(f1)
+            stored_issues = store["issues"]
+            since = store["max_updated_at"]
+            self.logger.info(
+                f"Loaded {len(stored_issues)} stored issues for repo {self.repo_name}; getting issues updated since {since}."
+            )
+
+        # dated raw json of just this run's updates, kept apart from
+        # 'all-issues' files which get_issues() treats as complete
+        new_issues = issuesgetter.get_all_pages_issues(
+            repo_name=self.repo_name,
+            out_filename="all-issues-updates",
+            write_out_location=self.write_read_location,
+            since=since,
+        )
+        all_issues = upsert_issues(stored_issues, new_issues)
+
+        with open(store_filename, "w") as f2:
+            json.dump(
+                {"issues": all_issues, "max_updated_at": max_updated_at(all_issues)},
+                f2,
+            )
+        self.logger.info(
+            f"Upserted {len(new_issues)} new or updated issues; {len(all_issues)} issues stored for repo {self.repo_name} at {store_filename}."
+        )
+        return all_issues
+
     def get_issues(self):
         issuesgetter = IssueGetter(
             repo_name=self.repo_name,
             in_notebook=self.in_notebook,
             config_path=self.config_path,
             logger=self.logger,
+            keep_full_payload=self.keep_full_payload,
         )
 
-        raw_issues_filename = f"{self.write_read_location}all-issues_{self.sanitised_repo_name}_{self.current_date_info}.json"
+        if self.incremental:
+            return self.get_issues_incremental(issuesgetter)
+
+        raw_issues_filename = ndjson_path(
+            f"{self.write_read_location}all-issues_{self.sanitised_repo_name}_{self.current_date_info}",
+            issuesgetter.raw_codec,
+        )
+        if self.resume:
+            fetched_output = self.job_queue.done_output(
+                "issues", self.repo_name, "fetched"
+            )
+            if fetched_output is not None:  # eg from before midnight
+                raw_issues_filename = fetched_output
         raw_issues_path = Path(raw_issues_filename)
         self.logger.info(
             f"Checking whether issue tickets data for repo {self.repo_name} for today's date already exists at path {raw_issues_path}."
         )
 
-        if raw_issues_path.is_file():
-            with open(raw_issues_filename) as f1:
-                raw_issues_json = json.load(f1)
-                f1.close
+        if self.resume and raw_issues_path.is_file():
+            raw_issues_json = read_raw_issues(raw_issues_filename)
             assert isinstance(
                 raw_issues_json,
                 list,  # json wrapped in list
-            ), f"Error reading in raw .json file: {raw_issues_filename}."
-            self.logger.info("Reading in existing issues raw .json file.")
+            ), f"Error reading in raw issues file: {raw_issues_filename}."
+            self.logger.info("Reading in existing issues raw file.")
             return raw_issues_json
         else:
             # run main issue getting function:
             self.logger.info(
                 "No existing issues file found; getting issues via GH API."
             )
-            all_issues = issuesgetter.get_all_pages_issues(repo_name=self.repo_name)
+            with self.job_queue.run_stage("issues", self.repo_name, "fetched") as job:
+                all_issues = issuesgetter.get_all_pages_issues(
+                    repo_name=self.repo_name,
+                    write_out_location=self.write_read_location,
+                )
+                job["output_path"] = raw_issues_filename
             return all_issues
 
     def format_issues_object(self, issues_object: list) -> pd.DataFrame:
@@ -174,21 +267,46 @@ class RunIssues:
         issues_df: pd.DataFrame,
         write_out_location: str,
         out_filename: str = "processed-issues",
-    ):
+    ) -> str:
         """
-        Save the reformatted commits data out to csv file.
+        Save the reformatted issues data out to csv (or parquet; see
+        `storage_format`) file in the `<write_out_location>dataset/`
+        partition for stage `out_filename`; returns path written to.
         """
-        write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}_{self.current_date_info}.csv"
+        catalog = DatasetCatalog(root=f"{write_out_location}dataset/")
+        write_out = catalog.partition_stem(
+            out_filename, self.sanitised_repo_name, self.current_date_info
+        )
 
         if issues_df is not None:
-            issues_df.to_csv(path_or_buf=write_out, mode="w", index=True, header=True)
+            write_out = catalog.write(
+                issues_df,
+                stage=out_filename,
+                repo=self.sanitised_repo_name,
+                date=self.current_date_info,
+                storage_format=self.storage_format,
+                index=True,
+            )
             self.logger.info(f"Saved out issues data to {write_out}.")
+            return write_out
         else:
             raise RuntimeError(
                 f"Error in save_formatted_issues(): Failed saving formatted issues data out to {write_out}."
             )
 
     def run_all_issues(self):  # -> pd.DataFrame:
+        if self.resume and self.job_queue.done_output(
+            "issues", self.repo_name, "fetched"
+        ):
+            written_output = self.job_queue.done_output(
+                "issues", self.repo_name, "written", depends_on="fetched"
+            )
+            if written_output is not None:
+                self.logger.info(
+                    f"Issues workflow already completed for repo {self.repo_name}; reading {written_output}."
+                )
+                return read_frame(written_output, index_col=0)
+
         self.logger.info(f"Checking whether repo {self.repo_name} has issues enabled.")
         worth_running = self.check_repo_valid()
 
@@ -221,9 +339,11 @@ class RunIssues:
             ), "WARNING: processed_issues is NOT in dataframe format after running format_issues_object(); check types for errors"
 
             # Write out to CSV
-            self.save_formatted_issues(
-                issues_df=processed_issues, write_out_location=self.write_read_location
-            )
+            with self.job_queue.run_stage("issues", self.repo_name, "written") as job:
+                job["output_path"] = self.save_formatted_issues(
+                    issues_df=processed_issues,
+                    write_out_location=self.write_read_location,
+                )
             self.logger.info("Wrote out processed issues data to csv.")
 
             # final happy case return:
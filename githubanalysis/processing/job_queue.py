@@ -0,0 +1,158 @@
+"""Durable per-repo, per-stage workflow state, so runs resume where they stopped."""
+
+import sqlite3
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+
+class JobQueue:
+    """
+    Records the state of each stage of a workflow ('commits', 'issues')
+    for each repo in a SQLite file: 'running', 'done' or 'failed', with
+    number of attempts, last error and the file the stage wrote out.
+
+    Workflows check `done_output()` before running a stage and reuse its
+    output file if there is one, so a rerun picks up where the last run
+    stopped, whatever the date in the output filename.
+    SQLite handles locking, so worker processes can share one file.
+
+    Example:
+
+    jobqueue = JobQueue('data/workflow_jobs.sqlite')
+    with jobqueue.run_stage('commits', 'JeschkeLab/DeerLab', 'fetched') as job:
+        ...  # get and write out commits
+        job['output_path'] = 'data/processed-commits_JeschkeLab-DeerLab_2024-10-17.csv'
+    """
+
+    path: Path
+
+    def __init__(self, path: str = "data/workflow_jobs.sqlite") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                workflow TEXT NOT NULL,
+                repo_name TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                output_path TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (workflow, repo_name, stage)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if getattr(self, "conn", None) is not None:
+            self.conn.close()
+            self.conn = None
+
+    def start(self, workflow: str, repo_name: str, stage: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO jobs (workflow, repo_name, stage, status, attempts, updated_at)
+                VALUES (?, ?, ?, 'running', 1, ?)
+                ON CONFLICT (workflow, repo_name, stage) DO UPDATE SET
+                    status = 'running', attempts = attempts + 1, updated_at = excluded.updated_at
+                """,
+                (workflow, repo_name, stage, time.time()),
+            )
+
+    def complete(
+        self,
+        workflow: str,
+        repo_name: str,
+        stage: str,
+        output_path: str | None = None,
+    ) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = 'done', last_error = NULL, output_path = ?, updated_at = ?
+                WHERE workflow = ? AND repo_name = ? AND stage = ?
+                """,
+                (output_path, time.time(), workflow, repo_name, stage),
+            )
+
+    def fail(self, workflow: str, repo_name: str, stage: str, error: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ?
+                WHERE workflow = ? AND repo_name = ? AND stage = ?
+                """,
+                (error, time.time(), workflow, repo_name, stage),
+            )
+
+    def get(self, workflow: str, repo_name: str, stage: str) -> dict | None:
+        """State of `stage` of `workflow` for `repo_name`, or None if never run."""
+        cursor = self.conn.execute(
+            "SELECT * FROM jobs WHERE workflow = ? AND repo_name = ? AND stage = ?",
+            (workflow, repo_name, stage),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([col[0] for col in cursor.description], row))
+
+    def done_output(
+        self,
+        workflow: str,
+        repo_name: str,
+        stage: str,
+        depends_on: str | None = None,
+    ) -> str | None:
+        """
+        Output file of `stage` if it's done and that file still exists,
+        otherwise None (ie stage needs running).
+        If `depends_on` stage has been run again since `stage` was done,
+        `stage`'s output is out of date, so None is returned too.
+        """
+        job = self.get(workflow, repo_name, stage)
+        if job is None or job["status"] != "done" or job["output_path"] is None:
+            return None
+        if not Path(job["output_path"]).is_file():
+            return None
+        if depends_on is not None:
+            earlier = self.get(workflow, repo_name, depends_on)
+            if earlier is not None and earlier["updated_at"] > job["updated_at"]:
+                return None
+        return job["output_path"]
+
+    @contextmanager
+    def run_stage(self, workflow: str, repo_name: str, stage: str):
+        """
+        Mark stage as running, then done when the block exits, with
+        `output_path` set from `job['output_path']` if the block sets it;
+        or failed (with traceback) if the block raises, re-raising the error.
+        """
+        self.start(workflow, repo_name, stage)
+        job: dict = {"output_path": None}
+        try:
+            yield job
+        except BaseException:
+            self.fail(workflow, repo_name, stage, error=traceback.format_exc())
+            raise
+        self.complete(workflow, repo_name, stage, output_path=job["output_path"])
+
+    def summary(self, workflow: str) -> pd.DataFrame:
+        """All recorded stage states for `workflow`, one row per repo and stage."""
+        return pd.read_sql_query(
+            "SELECT * FROM jobs WHERE workflow = ? ORDER BY repo_name, stage",
+            self.conn,
+            params=(workflow,),
+        )
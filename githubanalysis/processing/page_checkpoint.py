@@ -0,0 +1,79 @@
+"""Spill file of completed pages for GH API paginators, so interrupted listings resume from the last page done."""
+
+import json
+import os
+from pathlib import Path
+
+
+class PageCheckpoint:
+    """
+    Newline-delimited json file with one line per completed page:
+    `{"page": <n>, "next_url": <url or null>, "items": [...]}`.
+    Each page is appended (and flushed) as soon as it's fetched, so if a
+    run dies part-way through a listing, a rerun gets the pages already
+    done from here and carries on from the last `next_url` (or, for
+    paginators fetching by page number, from the pages not yet done).
+    Call `clear()` once the whole listing is got.
+    A partly written last line (from dying mid-write) is cut off the
+    file on load, so pages appended afterwards start on a line of their own.
+    """
+
+    path: Path
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pages: dict[int, list] = {}
+        self.next_urls: dict[int, str | None] = {}
+
+        if self.path.is_file():
+            with open(self.path, "r+b") as spill_file:
+                complete_up_to = 0  # offset just after last complete line
+                for line in spill_file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("line not finished")
+                        record = json.loads(line)
+                    except ValueError:  # incl. json.JSONDecodeError
+                        break
+                    self.pages[record["page"]] = record["items"]
+                    self.next_urls[record["page"]] = record["next_url"]
+                    complete_up_to += len(line)
+                spill_file.truncate(complete_up_to)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def append(self, page: int, items: list, next_url: str | None = None) -> None:
+        with open(self.path, "a") as spill_file:
+            spill_file.write(
+                json.dumps({"page": page, "next_url": next_url, "items": items}) + "\n"
+            )
+            spill_file.flush()
+            os.fsync(spill_file.fileno())
+        self.pages[page] = items
+        self.next_urls[page] = next_url
+
+    def last_page(self) -> int | None:
+        return max(self.pages, default=None)
+
+    def resume_point(self) -> tuple[int, str | None] | None:
+        """
+        `(last page done, its next_url)` for paginators following `next`
+        links; None if there are no pages yet. A `next_url` of None means
+        the listing was already finished.
+        """
+        last_page = self.last_page()
+        if last_page is None:
+            return None
+        return last_page, self.next_urls[last_page]
+
+    def items(self) -> list:
+        """All items from pages done, in page order."""
+        return [item for page in sorted(self.pages) for item in self.pages[page]]
+
+    def clear(self) -> None:
+        if self.path.is_file():
+            self.path.unlink()
+        self.pages = {}
+        self.next_urls = {}
@@ -8,6 +8,7 @@ import pandas as pd
 import logging
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import read_frame, write_frame
 
 
 class PrepDataCombined:
@@ -21,6 +22,7 @@ class PrepDataCombined:
         self,
         in_notebook: bool,
         logger: None | logging.Logger = None,
+        storage_format: str = "csv",
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -39,6 +41,8 @@ class PrepDataCombined:
         )  # at start of script to avoid midnight/long-run issues
         self.read_location = Path("data/" if not in_notebook else "../../data/")
         self.write_location = Path("data/" if not in_notebook else "../../data/")
+        # "csv" or "parquet" (typed columns; needs pyarrow) for per-dev files written out
+        self.storage_format = storage_format
 
     def process_multi_origin_data(
         self,
@@ -66,10 +70,10 @@ class PrepDataCombined:
 
         start_time = datetime.datetime.now()
 
-        commits_multirepo = pd.read_csv(commits_data_file)
+        commits_multirepo = read_frame(commits_data_file)
         self.logger.info(f"length of commits df is {len(commits_multirepo)}")
 
-        issues_multirepo = pd.read_csv(issues_data_file)
+        issues_multirepo = read_frame(issues_data_file)
         self.logger.info(f"length of issues df is {len(issues_multirepo)}")
 
         commits_multirepo = commits_multirepo.drop_duplicates(
@@ -119,11 +123,15 @@ class PrepDataCombined:
 
         n_repos_omnirepo = int(omnirepo.groupby("repo_name").ngroups)
 
-        filestr = f"merged-data-per-dev_x{omnirepo['repo_name'].nunique()}-repos_{self.current_date_info}.csv"
+        filestr = f"merged-data-per-dev_x{omnirepo['repo_name'].nunique()}-repos_{self.current_date_info}"
         writeout_path = Path(write_location, filestr)
 
         try:
-            omnirepo.to_csv(path_or_buf=writeout_path, header=True, index=False)
+            writeout_path = write_frame(
+                omnirepo,
+                path_stem=str(writeout_path),
+                storage_format=self.storage_format,
+            )
             self.logger.info(f"Merged dataset file written out to {writeout_path}")
 
             end_time = datetime.datetime.now()
@@ -133,7 +141,7 @@ class PrepDataCombined:
             )
 
             self.logger.info(
-                f"Saved devs_commits_data df for {n_repos_omnirepo} repos with {len(omnirepo)} devs to file: {filestr}"
+                f"Saved devs_commits_data df for {n_repos_omnirepo} repos with {len(omnirepo)} devs to file: {writeout_path}"
             )
 
             return omnirepo  # RETURN MERGED DATASET
@@ -149,16 +157,24 @@ parser.add_argument(
     "-c",
     "--commits-data-per-dev-file",
     metavar="COMMITS_DATA_PER_DEV_FILE",
-    help="Path to .csv file containing commits data (line per repo-individual), eg 'commits-data-per-dev_x5828-repos_2025-02-15.csv'.",
+    help="Path to .csv (or .parquet) file containing commits data (line per repo-individual), eg 'commits-data-per-dev_x5828-repos_2025-02-15.csv'.",
     type=str,
 )
 parser.add_argument(
     "-i",
     "--issues-data-per-dev-file",
     metavar="ISSUES_DATA_PER_DEV_FILE",
-    help="Path to .csv file containing issues data (line per repo-individual), eg 'issues-data-per-dev_x1716-repos_2024-12-11.csv'.",
+    help="Path to .csv (or .parquet) file containing issues data (line per repo-individual), eg 'issues-data-per-dev_x1716-repos_2024-12-11.csv'.",
     type=str,
 )
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for per-dev data written out: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
 
 
 if __name__ == "__main__":
@@ -186,7 +202,9 @@ if __name__ == "__main__":
         f"Running data combination pre-analysis preparation methods on commits data file {commits_data} and issues file {issues_data}."
     )
 
-    prepdatacombined = PrepDataCombined(in_notebook=False, logger=logger)
+    prepdatacombined = PrepDataCombined(
+        in_notebook=False, logger=logger, storage_format=args.storage_format
+    )
 
     combined_data = prepdatacombined.process_multi_origin_data(
         commits_data_file=commits_data,
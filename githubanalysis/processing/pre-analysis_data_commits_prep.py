@@ -1,14 +1,15 @@
 """Collate COMMITS datafiles, generate dataframes ready for analysis."""
 
 from pathlib import Path
+import argparse
 import datetime
-import os
-import re
 import pandas as pd
 import logging
 import category_encoders as ce
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import read_frame, write_frame
+from githubanalysis.processing.dataset_catalog import find_stage_files
 
 
 class PrepDataCommits:
@@ -22,6 +23,7 @@ class PrepDataCommits:
         self,
         in_notebook: bool,
         logger: None | logging.Logger = None,
+        storage_format: str = "csv",
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -40,6 +42,8 @@ class PrepDataCommits:
         )  # at start of script to avoid midnight/long-run issues
         self.read_location = Path("data/" if not in_notebook else "../../data/")
         self.write_location = Path("data/" if not in_notebook else "../../data/")
+        # "csv" or "parquet" (typed columns; needs pyarrow) for per-dev files written out
+        self.storage_format = storage_format
 
     def process_commits(
         self,
@@ -57,11 +61,8 @@ class PrepDataCommits:
         """
         start_time = datetime.datetime.now()
 
-        repolist = [
-            f
-            for f in os.listdir(read_location)
-            if re.match(r"(commits_cats_stats_).*(.csv)", f)
-        ]
+        # latest commits_cats_stats file per repo (via dataset catalog if there is one)
+        repolist = find_stage_files(read_location, "commits_cats_stats")
         logger.info("{repolist}")
 
         multirepo = pd.DataFrame()
@@ -71,8 +72,8 @@ class PrepDataCommits:
 
         for repofile in repolist:
             logger.debug(f"{repofile}")
-            tmplocat = f"{read_location}{repofile}"
-            repo = pd.read_csv(tmplocat)
+            tmplocat = repofile
+            repo = read_frame(tmplocat)
             logger.debug(f"{len(repo)}")  # this number is N of Commits per repo
 
             ce_OHE = ce.OneHotEncoder(
@@ -226,9 +227,12 @@ class PrepDataCommits:
             :, ~devs_commits_data.columns.duplicated()
         ]  # remove duplicated 2 columns
 
-        filestr = f"commits-data-per-dev_x{devs_commits_data['repo_name'].nunique()}-repos_{self.current_date_info}.csv"
-        filestr = Path(self.write_location, filestr)
-        devs_commits_data.to_csv(path_or_buf=filestr, header=True, index=False)
+        filestr = f"commits-data-per-dev_x{devs_commits_data['repo_name'].nunique()}-repos_{self.current_date_info}"
+        filestr = write_frame(
+            devs_commits_data,
+            path_stem=str(Path(self.write_location, filestr)),
+            storage_format=self.storage_format,
+        )
 
         end_time = datetime.datetime.now()
 
@@ -242,7 +246,19 @@ class PrepDataCommits:
         return devs_commits_data
 
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for per-dev data written out: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
+
+
 if __name__ == "__main__":
+    args = parser.parse_args()
     logger = loggit.get_default_logger(
         console=True,
         set_level_to="DEBUG",
@@ -250,6 +266,8 @@ if __name__ == "__main__":
         in_notebook=False,
     )
 
-    prepdatacommits = PrepDataCommits(in_notebook=False, logger=logger)
+    prepdatacommits = PrepDataCommits(
+        in_notebook=False, logger=logger, storage_format=args.storage_format
+    )
 
     prepdatacommits.process_commits(read_location="data/", write_location="data/")
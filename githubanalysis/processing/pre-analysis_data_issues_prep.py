@@ -1,15 +1,15 @@
 """Collate ISSUES datafiles, generate dataframes ready for analysis."""
 
 from pathlib import Path
+import argparse
 import datetime
-import os
-import re
 import pandas as pd
 import logging
 import numpy as np
-from ast import literal_eval
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import from_stored, read_frame, write_frame
+from githubanalysis.processing.dataset_catalog import find_stage_files
 
 
 class PrepDataIssues:
@@ -23,6 +23,7 @@ class PrepDataIssues:
         self,
         in_notebook: bool,
         logger: None | logging.Logger = None,
+        storage_format: str = "csv",
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -41,6 +42,8 @@ class PrepDataIssues:
         )  # at start of script to avoid midnight/long-run issues
         self.read_location = Path("data/" if not in_notebook else "../../data/")
         self.write_location = Path("data/" if not in_notebook else "../../data/")
+        # "csv" or "parquet" (typed columns; needs pyarrow) for per-dev files written out
+        self.storage_format = storage_format
 
     def process_issues(
         self,
@@ -74,11 +77,8 @@ class PrepDataIssues:
 
         start_time = datetime.datetime.now()
 
-        repolist = [
-            f
-            for f in os.listdir(read_location)
-            if re.match(r"(processed-issues_).*(.csv)", f)
-        ]
+        # latest processed-issues file per repo (via dataset catalog if there is one)
+        repolist = find_stage_files(read_location, "processed-issues")
 
         self.logger.debug(f"Operating on list of repositories: {repolist}")
         self.logger.debug(".........................")
@@ -92,11 +92,13 @@ class PrepDataIssues:
         list_of_repos = []
 
         for repofile in repolist:
-            logger.debug(f"Working on file: {repofile}")
+            self.logger.debug(f"Working on file: {repofile}")
             # self.logger.debug(file)
-            tmplocat = Path(read_location, repofile)
+            tmplocat = Path(repofile)
             # self.logger.debug(tmplocat)
-            repo = pd.read_csv(tmplocat)
+            # one row per issue, numbered from 0: csv files hold the issues
+            # workflow's index as an 'Unnamed: 0' column, Parquet files as the index
+            repo = read_frame(tmplocat).reset_index(drop=True)
             self.logger.debug(f"repo issues data shape: {repo.shape}")
             # self.logger.debug(len(repo.index))
 
@@ -112,7 +114,7 @@ class PrepDataIssues:
                 "repo_name": tmpname,
                 "n_issues_total": len(repo),
                 "assignees_list_usernames": (
-                    repo["assignees_list_usernames"] != "[]"
+                    repo["assignees_list_usernames"].apply(from_stored).str.len() > 0
                 ).sum(),
             }
             tmpdf_nonempty_fields = pd.DataFrame(tmp_nonempty_fields, index=[0])
@@ -137,16 +139,22 @@ class PrepDataIssues:
                 ].apply(lambda x: "['GHNONISSUECREATOR']")
 
             exploded_devs["assigned_devs"] = repo["assignees_list_usernames"].apply(
-                literal_eval
+                from_stored
             )
             exploded_devs = exploded_devs.explode(column="assigned_devs")
 
             exploded_devs["assigned_devs"] = exploded_devs["assigned_devs"].fillna(
                 "unassigned"
             )
-            tmp_assigns = pd.DataFrame(
-                exploded_devs.groupby(["assigned_devs"], as_index=False).nunique()
-            )  # as_index=False allows joins
+            # exploded rows keep their issue's row number as index, so the
+            # number of unique index values per dev is their number of issues
+            tmp_assigns = (
+                exploded_devs.index.to_series()
+                .groupby(exploded_devs["assigned_devs"])
+                .nunique()
+                .rename("n_issues_assigned")
+                .reset_index()
+            )  # reset_index() gives assigned_devs column for joins
             tmp_assigns["repo_name"] = tmpname
 
             assignees = tmp_assigns.drop(
@@ -160,7 +168,6 @@ class PrepDataIssues:
                     exploded_devs["assigned_devs"] != "unassigned"
                 ].index.unique()
             )  # unique number of issues assigned to anybody(s)
-            assignees = assignees.rename(columns={"Unnamed: 0": "n_issues_assigned"})
 
             assignees["pc_issues_assigned_of_assigned"] = (
                 assignees["n_issues_assigned"] / total_unique_assigned_issues_ids
@@ -198,13 +205,15 @@ class PrepDataIssues:
             )
 
             tmpdf["n_of_issues_creators"] = len(tmpdf)
-            logger.debug(f"Number of issue creators for repo {tmpdf} is: {len(tmpdf)}")
+            self.logger.debug(
+                f"Number of issue creators for repo {tmpname} is: {len(tmpdf)}"
+            )
 
             multirepo = pd.concat([multirepo, tmpdf], axis=0, ignore_index=True)
             multirepo_assigns = pd.concat(
                 [multirepo_assigns, assignees], axis=0, ignore_index=True
             )
-            logger.debug("----")
+            self.logger.debug("----")
             # end of loop
 
             # # join issues data and assignment data to give single richer df
@@ -250,8 +259,11 @@ class PrepDataIssues:
         )
 
         # write out issues data with informative filename
-        filestr = f"{write_location}issues-data-per-dev_x{devs_issues_data['repo_name'].nunique()}-repos_x{len(devs_issues_data)}-repo-individuals_{self.current_date_info}.csv"
-        devs_issues_data.to_csv(path_or_buf=filestr, header=True, index=False)
+        filestr = write_frame(
+            devs_issues_data,
+            path_stem=f"{write_location}issues-data-per-dev_x{devs_issues_data['repo_name'].nunique()}-repos_x{len(devs_issues_data)}-repo-individuals_{self.current_date_info}",
+            storage_format=self.storage_format,
+        )
 
         end_time = datetime.datetime.now()
 
@@ -265,7 +277,19 @@ class PrepDataIssues:
         return devs_issues_data
 
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for per-dev data written out: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
+
+
 if __name__ == "__main__":
+    args = parser.parse_args()
     logger = loggit.get_default_logger(
         console=True,
         set_level_to="DEBUG",
@@ -273,6 +297,8 @@ if __name__ == "__main__":
         in_notebook=False,
     )
 
-    prepdataissues = PrepDataIssues(in_notebook=False, logger=logger)
+    prepdataissues = PrepDataIssues(
+        in_notebook=False, logger=logger, storage_format=args.storage_format
+    )
 
     prepdataissues.process_issues(read_location="data/", write_location="data/")
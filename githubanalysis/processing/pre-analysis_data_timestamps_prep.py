@@ -1,15 +1,15 @@
 """Get timestamp and interaction types info for issues AND commits datasets."""
 
 from pathlib import Path
+import argparse
 import datetime
-import os
-import re
-from ast import literal_eval
 import pandas as pd
 import logging
 
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import from_stored, read_frame, write_frame
+from githubanalysis.processing.dataset_catalog import find_stage_files
 
 pd.options.mode.copy_on_write = True
 
@@ -27,6 +27,7 @@ class PrepDataTimes:
         self,
         in_notebook: bool,
         logger: None | logging.Logger = None,
+        storage_format: str = "csv",
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -45,6 +46,8 @@ class PrepDataTimes:
         )  # at start of script to avoid midnight/long-run issues
         self.read_location = Path("data/" if not in_notebook else "../../data/")
         self.write_location = Path("data/" if not in_notebook else "../../data/")
+        # "csv" or "parquet" (typed columns; needs pyarrow) for per-dev files written out
+        self.storage_format = storage_format
 
     def get_commit_interactions(self, datafile: str | Path) -> pd.DataFrame:
         """
@@ -56,11 +59,10 @@ class PrepDataTimes:
         """
         pd.options.mode.copy_on_write = True
 
-        commitsdf = pd.read_csv(datafile, index_col=0, lineterminator="\n")
-
-        # remove unwanted columns:
-        commitsdf = commitsdf[
-            [
+        # read only wanted columns (from parquet files; csv are cut down after):
+        commitsdf = read_frame(
+            datafile,
+            columns=[
                 "repo_name",
                 "author_username",
                 "author_fullname",
@@ -68,8 +70,10 @@ class PrepDataTimes:
                 "commit_sha",
                 "author_commit_date",
                 "commit_message",
-            ]
-        ]
+            ],
+            index_col=0,
+            lineterminator="\n",
+        )
 
         # deal with issue data (NOT pull request) only:
         interactions_df_commits = commitsdf
@@ -111,14 +115,10 @@ class PrepDataTimes:
         """
         pd.options.mode.copy_on_write = True
 
-        rawissuesdf = pd.read_csv(datafile, index_col=0, lineterminator="\n")
-        assert (
-            len(rawissuesdf) != 0
-        ), f"File does not contain a dataframe; check input file {datafile}"
-
-        # remove unwanted columns ahead of data melt / reshape:
-        rawissuesdf = rawissuesdf[
-            [
+        # read only columns wanted for data melt / reshape:
+        rawissuesdf = read_frame(
+            datafile,
+            columns=[
                 "repo_name",
                 "issue_author_username",
                 "author_association",
@@ -128,8 +128,13 @@ class PrepDataTimes:
                 "closed_at",
                 "closed_by",
                 "pull_request",
-            ]
-        ]
+            ],
+            index_col=0,
+            lineterminator="\n",
+        )
+        assert (
+            len(rawissuesdf) != 0
+        ), f"File does not contain a dataframe; check input file {datafile}"
 
         # create open issues df set; copy datetime info into new column, create interaction column to mimic melt() on closed issues
 
@@ -185,7 +190,7 @@ class PrepDataTimes:
 
         # pull out the closed_by info:
         issuesdf["closer"] = issuesdf["closed_by"].apply(
-            lambda row: row if pd.isna(row) else literal_eval(row)["login"]
+            lambda row: row if pd.isna(row) else from_stored(row)["login"]
         )
 
         # update gh_username based on closer data if issue is closed
@@ -473,13 +478,6 @@ class PrepDataTimes:
 
         return status_df
 
-    _COMMITS_PATTERN = re.compile(
-        r"^processed-commits_(.*)[0-9]{4}-[0-9]{2}-[0-9]{2}\.csv$"
-    )
-    _ISSUES_PATTERN = re.compile(
-        r"^processed-issues_(.*)[0-9]{4}-[0-9]{2}-[0-9]{2}\.csv$"
-    )
-
     def interactions_data_workflow(
         self,
         read_location: str | Path,
@@ -494,33 +492,10 @@ class PrepDataTimes:
 
         start_time = datetime.datetime.now()
 
-        # commit_matches = list(
-        #     filter(
-        #         lambda x: x is not None,
-        #         (re.match(self._COMMITS_PATTERN, f) for f in os.listdir(read_location)),
-        #     )
-        # )
-
-        issues_files_repolist = [
-            f for f in os.listdir(read_location) if re.match(self._ISSUES_PATTERN, f)
-        ]
-
-        # for i in commit_matches:
-        #     assert i
-        #     name = i.group(1)
-
-        # get all the processed-commits files from the folder:
-        commits_files_repolist = [
-            f
-            for f in os.listdir(read_location)
-            if re.match(r"(processed-commits_).*(\.csv)", f)
-        ]
+        # get latest processed-commits file per repo (via dataset catalog if there is one):
+        commits_files_repolist = find_stage_files(read_location, "processed-commits")
         # same for issues files:
-        issues_files_repolist = [
-            f
-            for f in os.listdir(read_location)
-            if re.match(r"(processed-issues_).*(\.csv)", f)
-        ]
+        issues_files_repolist = find_stage_files(read_location, "processed-issues")
 
         self.logger.info(
             f"Working on {len(commits_files_repolist)} files for commits and {len(issues_files_repolist)} issues data files"
@@ -530,7 +505,7 @@ class PrepDataTimes:
         issues_interactions = pd.DataFrame()
 
         for file in commits_files_repolist:
-            file = Path(read_location, file)
+            file = Path(file)
             if file.exists():
                 self.logger.debug(f"Running get_commit_interactions on file {file}.")
                 commits_interactions_next = self.get_commit_interactions(file)
@@ -543,7 +518,7 @@ class PrepDataTimes:
         )
 
         for file in issues_files_repolist:
-            file = Path(read_location, file)
+            file = Path(file)
             if file.exists():
                 self.logger.debug(
                     f"Running get_issues_PRs_interactions on file {file}."
@@ -587,13 +562,15 @@ class PrepDataTimes:
             n_repos_all_interactions_data = int(
                 all_interactions_data.groupby("repo_name").ngroups
             )
-            filestr = f"merged-interactions-data-per-dev_x{n_repos_all_interactions_data}-repos_{self.current_date_info}.csv"
+            filestr = f"merged-interactions-data-per-dev_x{n_repos_all_interactions_data}-repos_{self.current_date_info}"
             writeout_path = Path(write_location, filestr)
 
             try:
                 # WRITE OUT THIS SUPER IMPORTANT DATA TO FILE!
-                all_interactions_data.to_csv(
-                    path_or_buf=writeout_path, header=True, index=False
+                writeout_path = write_frame(
+                    all_interactions_data,
+                    path_stem=str(writeout_path),
+                    storage_format=self.storage_format,
                 )
 
                 self.logger.info(f"Merged dataset file written out to {writeout_path}")
@@ -605,7 +582,7 @@ class PrepDataTimes:
                 )
 
                 self.logger.info(
-                    f"Saved devs_commits_data df for {n_repos_all_interactions_data} repos with {len(all_interactions_data)} devs to file: {filestr}"
+                    f"Saved devs_commits_data df for {n_repos_all_interactions_data} repos with {len(all_interactions_data)} devs to file: {writeout_path}"
                 )
 
                 return all_interactions_data  # RETURN MERGED DATASET
@@ -623,7 +600,19 @@ class PrepDataTimes:
             raise
 
 
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for per-dev data written out: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
+
+
 if __name__ == "__main__":
+    args = parser.parse_args()
     logger = loggit.get_default_logger(
         console=True,
         set_level_to="DEBUG",
@@ -635,7 +624,9 @@ if __name__ == "__main__":
         "Running data timestamps pre-analysis preparation methods on processed- commits and issues files."
     )
 
-    prepdatatimes = PrepDataTimes(in_notebook=False, logger=logger)
+    prepdatatimes = PrepDataTimes(
+        in_notebook=False, logger=logger, storage_format=args.storage_format
+    )
 
     times_data = prepdatatimes.interactions_data_workflow(
         read_location="data/",
@@ -0,0 +1,73 @@
+"""Declared fields of GH API payloads used downstream, and projection of raw payloads onto them."""
+
+# Nested dicts of the fields to keep from each payload: `True` keeps a
+# field's value whole; a dict keeps only those sub-fields (of the value, or
+# of each item if the value is a list). Fields missing from a payload stay
+# missing, and None values are kept as None.
+
+# REST /repos/{repo}/commits listing items, as used by
+# CommitReformatter.reformat_commits_object() and incremental commit checkpoints
+COMMIT_SCHEMA = {
+    "sha": True,
+    "commit": {
+        "author": {"name": True, "email": True, "date": True},
+        "committer": {"name": True, "email": True, "date": True},
+        "message": True,
+    },
+    "author": {"login": True},
+    "committer": {"login": True},
+}
+
+# REST /repos/{repo}/issues listing items, as used by
+# RunIssues.format_issues_object(), upsert_issues() and the pre-analysis prep
+ISSUE_SCHEMA = {
+    "id": True,
+    "number": True,
+    "state": True,
+    "title": True,
+    "created_at": True,
+    "updated_at": True,
+    "closed_at": True,
+    "author_association": True,
+    "comments": True,
+    "labels": {"name": True},
+    "milestone": {"number": True, "title": True, "state": True},
+    "body": True,
+    "locked": True,
+    "performed_via_github_app": {"slug": True},
+    "user": {"login": True},
+    "assignees": {"login": True},
+    "state_reason": True,
+    "pull_request": {"merged_at": True},
+    "closed_by": {"login": True},
+}
+
+
+def project(value, schema: dict | bool):
+    """
+    `value` cut down to the fields in `schema` (see COMMIT_SCHEMA).
+
+    :param value: GH API payload (or part of one)
+    :type: dict | list | None
+    :param schema: fields to keep; `True` keeps `value` whole
+    :type: dict | bool
+    :returns: projected copy of `value`
+    """
+    if schema is True or value is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, schema) for item in value]
+    if not isinstance(value, dict):  # eg GH changed a field's type; keep it as is
+        return value
+    return {
+        field: project(value[field], sub_schema)
+        for field, sub_schema in schema.items()
+        if field in value
+    }
+
+
+def project_records(records: list[dict], schema: dict | None) -> list[dict]:
+    """Each of `records` projected onto `schema`; `schema` None keeps them whole."""
+    if schema is None:
+        return records
+    return [project(record, schema) for record in records]
@@ -3,9 +3,11 @@
 import pandas as pd
 import logging
 import datetime
-import json
+from typing import Iterable
 
 import utilities.get_default_logger as loggit
+from utilities.frame_storage import write_frame
+from githubanalysis.processing.get_all_branches_commits import iter_branch_commits
 
 
 class CommitReformatter:
@@ -41,88 +43,105 @@ class CommitReformatter:
         """
         Reformat previously-made commit data (from get_all_branches_commits() ) into pd.DataFrame.
         """
+        return self.reformat_commits_records(
+            (branch, record)
+            for branch, commit_records in unique_commits_all_branches.items()
+            for record in commit_records
+        )
+
+    def reformat_commits_records(
+        self, branch_commit_records: Iterable[tuple[str, dict]]
+    ) -> pd.DataFrame:
+        """
+        Reformat `(branch_sha, commit)` pairs (eg streamed from a raw commits
+        file by iter_branch_commits()) into pd.DataFrame, one row per pair.
+        """
         repo_name = self.sanitised_repo_name.replace("-", "/")
 
-        columns = [
-            "repo_name",
-            "branch_sha",
-            "commit_sha",
-            "author_fullname",
-            "author_commit_date",
-            "comitter_commit_date",
-            "commit_message",
-            "author_username",
-            "comitter_username",
-        ]
-
-        frame = []
-
-        for branch, commit_records in unique_commits_all_branches.items():
-            for record in commit_records:
-                author = record["author"]
-                committer = record["committer"]
-                commit = record["commit"]
-
-                record_list = [
-                    repo_name,
-                    branch,
-                    record["sha"],
-                ]
-
-                if commit:
-                    record_list.append(
-                        commit["author"]["name"]
-                        if commit["author"] is not None
-                        else None
-                    )
-                    record_list.append(
-                        commit["author"]["date"]
-                        if commit["author"] is not None
-                        else None
-                    )
-                    record_list.append(
-                        commit["committer"]["date"]
-                        if commit["committer"] is not None
-                        else None
-                    )
-                    record_list.append(commit["message"])
-
-                record_list.append(author.get("login") if author is not None else None)
-                record_list.append(
-                    committer.get("login") if committer is not None else None
+        # built column by column (no per-row lists), then made into a frame in one go
+        branch_shas: list[str] = []
+        commit_shas: list[str] = []
+        author_fullnames: list[str | None] = []
+        author_dates: list[str | None] = []
+        committer_dates: list[str | None] = []
+        messages: list[str | None] = []
+        author_usernames: list[str | None] = []
+        committer_usernames: list[str | None] = []
+
+        for branch, record in branch_commit_records:
+            branch_shas.append(branch)
+            commit_shas.append(record["sha"])
+
+            commit = record["commit"]
+            if commit:
+                commit_author = commit["author"]
+                commit_committer = commit["committer"]
+                author_fullnames.append(
+                    commit_author["name"] if commit_author is not None else None
                 )
+                author_dates.append(
+                    commit_author["date"] if commit_author is not None else None
+                )
+                committer_dates.append(
+                    commit_committer["date"] if commit_committer is not None else None
+                )
+                messages.append(commit["message"])
+            else:
+                author_fullnames.append(None)
+                author_dates.append(None)
+                committer_dates.append(None)
+                messages.append(None)
+
+            author = record["author"]
+            committer = record["committer"]
+            author_usernames.append(author.get("login") if author is not None else None)
+            committer_usernames.append(
+                committer.get("login") if committer is not None else None
+            )
 
-                frame.append(record_list)
-
-        self.reformatted_commits = pd.DataFrame(frame, columns=columns)
+        self.reformatted_commits = pd.DataFrame(
+            {
+                "repo_name": [repo_name] * len(commit_shas),
+                "branch_sha": branch_shas,
+                "commit_sha": commit_shas,
+                "author_fullname": author_fullnames,
+                "author_commit_date": author_dates,
+                "comitter_commit_date": committer_dates,
+                "commit_message": messages,
+                "author_username": author_usernames,
+                "comitter_username": committer_usernames,
+            },
+            dtype=object,
+        )
 
         return self.reformatted_commits
 
     def reformat_commits_from_file(self, commits_file: str):
         """
-        Reformat raw commit data from json file into pd.DataFrame appropes format.
+        Reformat raw commit data from file into pd.DataFrame appropes format.
+        Commits are read one at a time from .ndjson(.gz/.zst) files, rather
+        than loading the whole file first (old .json files are read whole).
         """
-
-        with open(commits_file, "r") as raw_commits_file:
-            raw_commits = json.load(raw_commits_file)
-
-        return self.reformat_commits_object(raw_commits)
+        return self.reformat_commits_records(iter_branch_commits(commits_file))
 
     def save_formatted_commits(
-        self, write_out_location, out_filename="processed-commits"
-    ):
+        self, write_out_location, out_filename="processed-commits", storage_format="csv"
+    ) -> str:
         """
-        Save the reformatted commits data out to csv file.
+        Save the reformatted commits data out to csv (or parquet) file; returns path written to.
         """
 
         if self.in_notebook:
-            write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}_{self.current_date_info}.csv"  # look further up for correct path
+            write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}_{self.current_date_info}"  # look further up for correct path
         else:
-            write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}_{self.current_date_info}.csv"
+            write_out = f"{write_out_location}{out_filename}_{self.sanitised_repo_name}_{self.current_date_info}"
 
         if self.reformatted_commits is not None:
-            self.reformatted_commits.to_csv(
-                path_or_buf=write_out, mode="w", index=True, header=True
+            return write_frame(
+                self.reformatted_commits,
+                path_stem=write_out,
+                storage_format=storage_format,
+                index=True,
             )
         else:
             raise RuntimeError(
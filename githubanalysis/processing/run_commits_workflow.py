@@ -6,9 +6,17 @@ import pandas as pd
 from logging import Logger
 import utilities.get_default_logger as loggit
 from utilities.check_gh_reponse import RepoNotFoundError
+from utilities.parallel_repo_runner import run_repos_in_parallel, summarise_runs
 
 
-def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
+def single_repo_method(
+    repo_name: str,
+    logger: Logger,
+    changes_source: str = "rest",
+    incremental: bool = False,
+    resume: bool = True,
+    storage_format: str = "csv",
+) -> pd.DataFrame | None:
     """
     This is used by multi_repo_method()
     """
@@ -17,6 +25,10 @@ def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
         in_notebook=False,  # TODO
         config_path="githubanalysis/config.cfg",  # TODO make this editable and useful
         write_read_location="data/",  # TODO
+        changes_source=changes_source,
+        incremental=incremental,
+        resume=resume,
+        storage_format=storage_format,
     )
     try:
         return runcommits.do_it_all()
@@ -32,27 +44,82 @@ def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
         return None
 
 
-def read_repos_from_file(filename, logger: Logger) -> dict[str, pd.DataFrame | None]:
+def read_repos_from_file(
+    filename,
+    logger: Logger,
+    changes_source: str = "rest",
+    incremental: bool = False,
+    n_workers: int = 1,
+    resume: bool = True,
+    storage_format: str = "csv",
+) -> dict[str, pd.DataFrame | None]:
     with open(filename, "r") as f:
         repos = [txtline.strip() for txtline in f.readlines()]
-        return multi_repo_method(repo_names=repos, logger=logger)
+        return multi_repo_method(
+            repo_names=repos,
+            logger=logger,
+            changes_source=changes_source,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
 
 def multi_repo_method(
-    repo_names: list[str], logger: Logger
+    repo_names: list[str],
+    logger: Logger,
+    changes_source: str = "rest",
+    incremental: bool = False,
+    n_workers: int = 1,
+    resume: bool = True,
+    storage_format: str = "csv",
 ) -> dict[str, pd.DataFrame | None]:
     """
     Loop through several repos from a file input, running
-    single_repo_method() on each.
+    single_repo_method() on each; in `n_workers` processes if more than 1.
+    Logs a summary table of successes and failures at the end.
     Return dictionary of repodfs with repo_name as key.
     """
     repo_names = list(sorted(set(repo_names)))
+    if n_workers > 1:
+        collation_dict, _ = run_repos_in_parallel(
+            repo_names=repo_names,
+            single_repo_fn=single_repo_method,
+            logger=logger,
+            n_workers=n_workers,
+            log_prefix="run_commits_workflow",
+            changes_source=changes_source,
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
+        return collation_dict
+
     collation_dict = {}
+    rows = []
     for repo in repo_names:
         logger.info(f"Trying to reading repo {repo} data from GH API.")
         print(f"Getting repo data for {repo}.")
-        collation_dict[repo] = single_repo_method(repo_name=repo, logger=logger)
+        collation_dict[repo] = single_repo_method(
+            repo_name=repo,
+            logger=logger,
+            changes_source=changes_source,
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
         logger.info(f"Completed repo data get for {repo}.")
+        rows.append(
+            {
+                "repo_name": repo,
+                "status": "failed" if collation_dict[repo] is None else "ok",
+                "n_rows": None
+                if collation_dict[repo] is None
+                else len(collation_dict[repo]),
+            }
+        )
+    logger.info(f"Run summary:\n{summarise_runs(rows).to_string()}")
     return collation_dict
 
 
@@ -78,12 +145,53 @@ parser.add_argument(
     nargs="+",  # this is convention indicating that there's many
     help="NameS of the multiple repos to workflow",
 )
+parser.add_argument(
+    "-c",
+    "--changes-source",
+    metavar="SOURCE",
+    help="Where to get per-commit changes from: 'rest' (default; one request per commit, includes filenames), 'graphql' (batched counts only, no vasilescu categories) or 'git' (commits and changes from one local mirror clone)",
+    type=str,
+    choices=["rest", "graphql", "git"],
+    default="rest",
+)
+parser.add_argument(
+    "-i",
+    "--incremental",
+    help="Only fetch commits added since the last run, merging them into the stored commits for each repo",
+    action="store_true",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    metavar="N",
+    help="Number of worker processes to run repos in, sharing the rate limit budget (Default: 1; one repo at a time)",
+    type=int,
+    default=1,
+)
+parser.add_argument(
+    "--fresh",
+    help="Re-run every workflow stage, ignoring stages recorded as done by earlier runs",
+    action="store_true",
+)
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for processed data: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
 
 if __name__ == "__main__":
     args = parser.parse_args()
     filepath: str | None = args.filepath_for_repos_list
     repo_name: str | None = args.repo_name
     several_repo_names: list[str] = args.several_repo_names
+    changes_source: str = args.changes_source
+    incremental: bool = args.incremental
+    n_workers: int = args.workers
+    resume: bool = not args.fresh
+    storage_format: str = args.storage_format
 
     logger = loggit.get_default_logger(
         console=True,
@@ -104,12 +212,35 @@ if __name__ == "__main__":
 
     if repo_name is not None:
         logger.info(f"Running single repo method on {repo_name}")
-        single_repo_method(repo_name=repo_name, logger=logger)
+        single_repo_method(
+            repo_name=repo_name,
+            logger=logger,
+            changes_source=changes_source,
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
     elif several_repo_names is not None:
         logger.info(f"Running multi repo method on list: {several_repo_names}")
-        multi_repo_method(repo_names=several_repo_names, logger=logger)
+        multi_repo_method(
+            repo_names=several_repo_names,
+            logger=logger,
+            changes_source=changes_source,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
     elif filepath is not None:
         logger.info(f"Running multi repo method on repos in file: {filepath}")
-        read_repos_from_file(filename=filepath, logger=logger)
+        read_repos_from_file(
+            filename=filepath,
+            logger=logger,
+            changes_source=changes_source,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
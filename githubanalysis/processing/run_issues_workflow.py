@@ -5,18 +5,39 @@ import pandas as pd
 from logging import Logger
 import utilities.get_default_logger as loggit
 from utilities.check_gh_reponse import RepoNotFoundError
+from utilities.parallel_repo_runner import run_repos_in_parallel, summarise_runs
 
 from githubanalysis.processing.get_all_pages_issues import NoIssuesError
 from githubanalysis.processing.issues_workflow import RunIssues
 
 
-def read_repos_from_file(filename, logger: Logger) -> dict[str, pd.DataFrame | None]:
+def read_repos_from_file(
+    filename,
+    logger: Logger,
+    incremental: bool = False,
+    n_workers: int = 1,
+    resume: bool = True,
+    storage_format: str = "csv",
+) -> dict[str, pd.DataFrame | None]:
     with open(filename, "r") as f:
         repos = [txtline.strip() for txtline in f.readlines()]
-        return multi_repo_method(repo_names=repos, logger=logger)
+        return multi_repo_method(
+            repo_names=repos,
+            logger=logger,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
 
-def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
+def single_repo_method(
+    repo_name: str,
+    logger: Logger,
+    incremental: bool = False,
+    resume: bool = True,
+    storage_format: str = "csv",
+) -> pd.DataFrame | None:
     """
     This is used by multi_repo_method()
     """
@@ -26,6 +47,9 @@ def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
         in_notebook=False,
         config_path="githubanalysis/config.cfg",
         write_read_location="data/",
+        incremental=incremental,
+        resume=resume,
+        storage_format=storage_format,
     )
 
     try:
@@ -48,19 +72,55 @@ def single_repo_method(repo_name: str, logger: Logger) -> pd.DataFrame | None:
 
 
 def multi_repo_method(
-    repo_names: list[str], logger: Logger
+    repo_names: list[str],
+    logger: Logger,
+    incremental: bool = False,
+    n_workers: int = 1,
+    resume: bool = True,
+    storage_format: str = "csv",
 ) -> dict[str, pd.DataFrame | None]:
     """
     Loop through several repos from a file input, running
-    single_repo_method() on each.
+    single_repo_method() on each; in `n_workers` processes if more than 1.
+    Logs a summary table of successes and failures at the end.
     Return dictionary of repodfs with repo_name as key.
     """
     repo_names = list(sorted(set(repo_names)))
+    if n_workers > 1:
+        collation_dict, _ = run_repos_in_parallel(
+            repo_names=repo_names,
+            single_repo_fn=single_repo_method,
+            logger=logger,
+            n_workers=n_workers,
+            log_prefix="run_issues_workflow",
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
+        return collation_dict
+
     collation_dict = {}
+    rows = []
     for repo in repo_names:
         logger.info(f"Trying to read repo {repo} issue data from GH API.")
-        collation_dict[repo] = single_repo_method(repo_name=repo, logger=logger)
+        collation_dict[repo] = single_repo_method(
+            repo_name=repo,
+            logger=logger,
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
         logger.info(f"Completed repo issue data get for {repo}.")
+        rows.append(
+            {
+                "repo_name": repo,
+                "status": "failed" if collation_dict[repo] is None else "ok",
+                "n_rows": None
+                if collation_dict[repo] is None
+                else len(collation_dict[repo]),
+            }
+        )
+    logger.info(f"Run summary:\n{summarise_runs(rows).to_string()}")
     return collation_dict
 
 
@@ -86,6 +146,33 @@ parser.add_argument(
     nargs="+",  # this is convention indicating that there's many
     help="NameS of the multiple repos to workflow",
 )
+parser.add_argument(
+    "-i",
+    "--incremental",
+    help="Only fetch issues updated since the last run, merging them into the stored issues for each repo",
+    action="store_true",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    metavar="N",
+    help="Number of worker processes to run repos in, sharing the rate limit budget (Default: 1; one repo at a time)",
+    type=int,
+    default=1,
+)
+parser.add_argument(
+    "--fresh",
+    help="Re-run every workflow stage, ignoring stages recorded as done by earlier runs",
+    action="store_true",
+)
+parser.add_argument(
+    "--storage-format",
+    metavar="FORMAT",
+    help="File format for processed data: 'csv' (default) or 'parquet' (typed columns, smaller and faster to load; needs pyarrow)",
+    type=str,
+    choices=["csv", "parquet"],
+    default="csv",
+)
 
 
 if __name__ == "__main__":
@@ -93,6 +180,10 @@ if __name__ == "__main__":
     filepath: str | None = args.filepath_for_repos_list
     repo_name: str | None = args.repo_name
     several_repo_names: list[str] = args.several_repo_names
+    incremental: bool = args.incremental
+    n_workers: int = args.workers
+    resume: bool = not args.fresh
+    storage_format: str = args.storage_format
 
     logger = loggit.get_default_logger(
         console=True,
@@ -113,12 +204,32 @@ if __name__ == "__main__":
 
     if repo_name is not None:
         logger.info(f"Running single repo issues method on {repo_name}")
-        single_repo_method(repo_name=repo_name, logger=logger)
+        single_repo_method(
+            repo_name=repo_name,
+            logger=logger,
+            incremental=incremental,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
     elif several_repo_names is not None:
         logger.info(f"Running multi repo issues method on list: {several_repo_names}")
-        multi_repo_method(repo_names=several_repo_names, logger=logger)
+        multi_repo_method(
+            repo_names=several_repo_names,
+            logger=logger,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
 
     elif filepath is not None:
         logger.info(f"Running multi repo issues method on repos in file: {filepath}")
-        read_repos_from_file(filename=filepath, logger=logger)
+        read_repos_from_file(
+            filename=filepath,
+            logger=logger,
+            incremental=incremental,
+            n_workers=n_workers,
+            resume=resume,
+            storage_format=storage_format,
+        )
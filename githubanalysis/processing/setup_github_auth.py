@@ -25,3 +25,21 @@ def setup_github_auth(config_path="githubanalysis/config.cfg") -> str:
         raise RuntimeError(
             "Github authentication failed. Check config file format and permissions in your github account."
         )
+
+
+def setup_github_auth_tokens(config_path="githubanalysis/config.cfg") -> list[str]:
+    """
+    Get ALL GitHub access tokens from user-generated config.cfg file: the
+    `token` plus any listed under optional `extra_tokens`, one per line.
+    :param config_path: file path of config.cfg file. Default='githubanalysis/config.cfg'.
+    :type: str
+    :returns: list of access tokens, main `token` first
+    :rtype: list[str]
+    """
+    token = setup_github_auth(config_path=config_path)
+
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    extra_tokens = config["ACCESS"].get("extra_tokens", "").split()
+
+    return list(dict.fromkeys([token, *extra_tokens]))  # unique, in order
@@ -3,12 +3,11 @@
 import pandas as pd
 import datetime
 from datetime import timezone
-import requests
-from requests.adapters import HTTPAdapter, Retry
 import logging
 
 import utilities.get_default_logger as loggit
 from utilities.check_gh_reponse import raise_if_response_error, run_with_retries
+from utilities.github_session import make_github_session, DEFAULT_ETAG_CACHE_PATH
 import githubanalysis.processing.setup_github_auth as ghauth
 import githubanalysis.analysis.calc_days_since_repo_creation as dayssince
 
@@ -30,6 +29,7 @@ class RepoStatsSummariser:
         config_path: str,
         write_read_location: str,
         logger: None | logging.Logger = None,
+        etag_cache_path: str | None = DEFAULT_ETAG_CACHE_PATH,
     ) -> None:
         if logger is None:
             self.logger = loggit.get_default_logger(
@@ -50,15 +50,12 @@ class RepoStatsSummariser:
         self.sanitised_repo_name = repo_name.replace("/", "-")
         self.repo_name = repo_name
         self.write_read_location = write_read_location
-        self.s = requests.Session()
-        retries = Retry(
-            total=10,
-            connect=5,
-            read=3,
-            backoff_factor=1,
-            status_forcelist=[202, 502, 503, 504],
+        if etag_cache_path is not None and in_notebook:
+            etag_cache_path = f"../../{etag_cache_path}"
+        # conditional requests: unchanged responses on refresh runs come back as 304s
+        self.s = make_github_session(
+            etag_cache_path=etag_cache_path, config_path=config_path
         )
-        self.s.mount("https://", HTTPAdapter(max_retries=retries))
         self.gh_token = ghauth.setup_github_auth(config_path=config_path)
         self.headers = {"Authorization": "token " + self.gh_token}
 
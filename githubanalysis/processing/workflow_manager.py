@@ -2,38 +2,84 @@
 
 from pathlib import Path
 import json
+import sqlite3
 from typing import Any
 
 
 class WorkflowManager:
+    """
+    Key-value store of workflow management info, in a SQLite file so each
+    get/set is an indexed lookup / single-row atomic write, and several
+    worker processes can use it at once.
+    Values must be json-serialisable.
+    Any existing `workflow_management_info.json` is imported the first time.
+    """
+
     filepath: Path
 
-    def __init__(self) -> None:
+    def __init__(self, filepath: str | Path | None = None) -> None:
         repo_root = Path(__file__).parent.parent
-        self.filepath = repo_root / "workflow_management_info.json"
-        if not self.filepath.exists():
-            with open(self.filepath, mode="w") as filehandle:
-                json.dump({}, filehandle)
+        if filepath is None:
+            filepath = repo_root / "workflow_management_info.sqlite"
+        self.filepath = Path(filepath)
 
-    def set(self, key: str, value: Any):
-        with open(self.filepath, mode="r") as filehandle:
-            file_contents = json.load(filehandle)
+        self.conn = sqlite3.connect(self.filepath, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
 
-        assert isinstance(
-            file_contents, dict
-        ), "This really ought to be a dict, we just created it."
+        legacy_filepath = self.filepath.with_suffix(".json")
+        if legacy_filepath.exists():
+            self._import_json(legacy_filepath)
 
-        file_contents[key] = value
+    def __del__(self):
+        if getattr(self, "conn", None) is not None:
+            self.conn.close()
 
-        with open(self.filepath, mode="w") as filehandle:
-            json.dump(file_contents, filehandle)
+    def _import_json(self, legacy_filepath: Path):
+        # worker processes starting at once can all see the json. The write
+        # lock makes them import it one at a time; inserts don't overwrite,
+        # so a repeat import changes nothing. The json is only moved after
+        # commit, so a process finding it gone can already read its values.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            with open(legacy_filepath, mode="r") as filehandle:
+                file_contents = json.load(filehandle)
 
-    def get(self, key: str, default: Any = None):
-        with open(self.filepath, mode="r") as filehandle:
-            file_contents = json.load(filehandle)
+            assert isinstance(
+                file_contents, dict
+            ), f"Expected dict in legacy workflow management file {legacy_filepath}."
+
+            # keep values already in the store; then the json is no longer needed
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO info VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in file_contents.items()),
+            )
+        except FileNotFoundError:  # moved by another process since exists()
+            self.conn.rollback()
+            return
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-        assert isinstance(
-            file_contents, dict
-        ), "This really ought to be a dict, we just created it."
+        try:
+            legacy_filepath.rename(legacy_filepath.with_suffix(".json.imported"))
+        except FileNotFoundError:  # moved by another process importing it too
+            pass
 
-        return file_contents.get(key, default)
+    def set(self, key: str, value: Any):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO info VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def get(self, key: str, default: Any = None):
+        row = self.conn.execute(
+            "SELECT value FROM info WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
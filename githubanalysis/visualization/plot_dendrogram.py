@@ -7,6 +7,7 @@ import gc
 import logging
 import utilities.get_default_logger as loggit
 
+import numpy as np
 import pandas as pd
 
 from matplotlib import pyplot as plt
@@ -52,6 +53,8 @@ class Dendrogrammer:
         colours: list | dict,
         file_name: str = "sample_dendrogram_",
         save_type: str = "png",  # one of: ['png', 'pdf', 'svg']
+        ward_clustering: np.ndarray
+        | None = None,  # linkage of clustering_data, if already computed
     ):
         # THIS IS THE SCIPY HIERARCHICAL CLUSTERING METHODS
         self.logger.info(
@@ -68,10 +71,13 @@ class Dendrogrammer:
         sys.setrecursionlimit(100000)  # attempt to address recursion limit error
         gc.collect()  # garbage collection to free up space/mem: spring cleaning!
 
-        ward_clustering = linkage(clustering_data, method="ward", metric="euclidean")
-        self.logger.info(
-            "Created ward clustering linkage object, now attempting to generate dendrogram"
-        )
+        if ward_clustering is None:
+            ward_clustering = linkage(
+                clustering_data, method="ward", metric="euclidean"
+            )
+            self.logger.info(
+                "Created ward clustering linkage object, now attempting to generate dendrogram"
+            )
 
         plt.figure(figsize=(25, 10))
         plt.xlabel("Clustered Repo-individuals")
@@ -103,6 +109,8 @@ class Dendrogrammer:
         show_leaves: bool = False,
         file_name: str = "sample_dendrogram_leafcounts",
         save_type: str = "pdf",  # one of: ['png', 'pdf', 'svg']
+        ward_clustering: np.ndarray
+        | None = None,  # linkage of clustering_data, if already computed
     ):
         assert isinstance(show_leaves, bool), "show_leaves must be boolean"
         # THIS IS THE SCIPY HIERARCHICAL CLUSTERING METHODS
@@ -120,10 +128,13 @@ class Dendrogrammer:
         sys.setrecursionlimit(100000)  # attempt to address recursion limit error
         gc.collect()  # garbage collection to free up space/mem: spring cleaning!
 
-        ward_clustering = linkage(clustering_data, method="ward", metric="euclidean")
-        self.logger.info(
-            "Created ward clustering linkage object, now attempting to generate dendrogram"
-        )
+        if ward_clustering is None:
+            ward_clustering = linkage(
+                clustering_data, method="ward", metric="euclidean"
+            )
+            self.logger.info(
+                "Created ward clustering linkage object, now attempting to generate dendrogram"
+            )
 
         plt.figure(figsize=(25, 10))
         plt.xlabel("Clustered Repo-individuals")
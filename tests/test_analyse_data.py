@@ -0,0 +1,69 @@
+"""Testing for clustering steps of the data analysis workflow."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import AgglomerativeClustering
+from sklearn.metrics import adjusted_rand_score, calinski_harabasz_score
+
+from githubanalysis.analysis.analyse_data import DataAnalyser
+import utilities.get_default_logger as loggit
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+
+
+@pytest.fixture
+def clustering_data() -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    centres = rng.random((4, 5)) * 100
+    return pd.DataFrame(
+        np.concatenate([centre + rng.normal(0, 5, (60, 5)) for centre in centres]),
+        columns=[f"pc_var{i}" for i in range(5)],
+    )
+
+
+@pytest.fixture
+def dataanalyser(tmp_path, monkeypatch) -> DataAnalyser:
+    monkeypatch.chdir(tmp_path)  # writes out to data/ and images/
+    (tmp_path / "data").mkdir()
+    (tmp_path / "images").mkdir()
+    return DataAnalyser(dataset_name="test", in_notebook=False, logger=logger)
+
+
+def test_evaluate_n_clusters_matches_refitting_per_n(dataanalyser, clustering_data):
+    # Act:
+    eval_df = dataanalyser.evaluate_n_clusters(clustering_data, max_clusters_to_eval=6)
+    # Assert:
+    assert list(eval_df["N_clusters_evaluated"]) == [2, 3, 4, 5, 6]
+    for n_clusters, ch_score in zip(
+        eval_df["N_clusters_evaluated"], eval_df["CH_score"]
+    ):
+        refit_labels = AgglomerativeClustering(
+            n_clusters=n_clusters, metric="euclidean", linkage="ward"
+        ).fit_predict(clustering_data)
+        assert ch_score == pytest.approx(
+            calinski_harabasz_score(clustering_data, refit_labels)
+        )
+
+
+def test_do_clustering_reuses_linkage(dataanalyser, clustering_data):
+    # Arrange:
+    dataanalyser.evaluate_n_clusters(clustering_data, max_clusters_to_eval=6)
+    ward_clustering = dataanalyser.get_ward_linkage(clustering_data)
+    # Act:
+    cluster_labels = dataanalyser.do_clustering(clustering_data, best_n_clusters=4)
+    # Assert:
+    assert len(dataanalyser.ward_linkages) == 1
+    assert dataanalyser.get_ward_linkage(clustering_data.copy()) is ward_clustering
+    refit_labels = AgglomerativeClustering(
+        n_clusters=4, metric="euclidean", linkage="ward"
+    ).fit_predict(clustering_data)
+    assert adjusted_rand_score(cluster_labels, refit_labels) == 1.0
+    # different data gets its own linkage
+    dataanalyser.get_ward_linkage(clustering_data.iloc[:100])
+    assert len(dataanalyser.ward_linkages) == 2
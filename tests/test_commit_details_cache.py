@@ -0,0 +1,73 @@
+"""Testing for on-disk commit details cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from githubanalysis.processing.commit_details_cache import CommitDetailsCache
+
+commit_json = {
+    "sha": "e29c765b5adb6eb1d964502a4a7e26ab3f3027f8",
+    "files": [
+        {"filename": ".gitignore", "changes": 43, "additions": 43, "deletions": 0}
+    ],
+}
+
+
+def test_cache_round_trip(tmp_path):
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache.sqlite")
+    assert cache.get("FlicAnderson/peramagroon", commit_json["sha"]) is None
+
+    cache.put("FlicAnderson/peramagroon", commit_json["sha"], commit_json)
+
+    assert cache.get("FlicAnderson/peramagroon", commit_json["sha"]) == commit_json
+    # keyed by repo AND sha
+    assert cache.get("FlicAnderson/other-repo", commit_json["sha"]) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_persists_between_instances(tmp_path):
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache.sqlite")
+    cache.put("FlicAnderson/peramagroon", commit_json["sha"], commit_json)
+    cache.close()
+
+    reopened = CommitDetailsCache(path=f"{tmp_path}/cache.sqlite")
+    assert reopened.get("FlicAnderson/peramagroon", commit_json["sha"]) == commit_json
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache.sqlite")
+    for i in range(10):
+        cache.put("FlicAnderson/peramagroon", f"sha{i}", {"files": [i] * 50})
+    entry_size = cache.total_size() // 10
+
+    cache.get("FlicAnderson/peramagroon", "sha0")  # sha0 now most recently used
+    cache.max_size_bytes = entry_size * 10
+    cache.put("FlicAnderson/peramagroon", "sha10", {"files": [10] * 50})
+
+    assert cache.total_size() <= cache.max_size_bytes
+    assert len(cache) < 11
+    assert cache.get("FlicAnderson/peramagroon", "sha0") is not None
+    assert cache.get("FlicAnderson/peramagroon", "sha1") is None
+
+
+def test_cache_shared_between_threads(tmp_path):
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache.sqlite")
+
+    def put_and_get(i: int):
+        cache.put("FlicAnderson/peramagroon", f"sha{i}", {"files": [i]})
+        return cache.get("FlicAnderson/peramagroon", f"sha{i}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        got = list(executor.map(put_and_get, range(200)))
+
+    assert got == [{"files": [i]} for i in range(200)]
+    assert len(cache) == 200
+
+
+def test_cache_file_only_made_on_first_use(tmp_path):
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache/cache.sqlite")
+    cache.close()
+    assert not (tmp_path / "cache").exists()
+
+    cache = CommitDetailsCache(path=f"{tmp_path}/cache/cache.sqlite")
+    assert cache.get("FlicAnderson/peramagroon", commit_json["sha"]) is None
+    assert (tmp_path / "cache" / "cache.sqlite").exists()
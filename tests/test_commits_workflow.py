@@ -1,12 +1,23 @@
 """Test the whole commits workflow script."""
 
+import random
+import threading
+import time
+
 import pytest
 import pandas as pd
 
 from githubanalysis.processing.get_all_branches_commits import AllBranchesCommitsGetter
 import githubanalysis.processing.run_commits_workflow as runner
+from githubanalysis.processing.commits_workflow import RunCommits
+from githubanalysis.processing.get_commit_changes import CommitChanges
+from githubanalysis.processing.reformat_commits import CommitReformatter
+from githubanalysis.analysis.vasilescu_commit_files_classification import (
+    Vasilescu_Commit_Classifier,
+)
 from utilities.check_gh_reponse import (
     RepoNotFoundError,
+    UnexpectedAPIError,
 )
 import utilities.get_default_logger as loggit
 
@@ -92,7 +103,7 @@ def test_outputs_read_in_match():
 
 
 @pytest.mark.xfail(reason="Fails remotely: relies on GH config file")
-def test_commits_workflow_raises_404():
+def test_commits_workflow_raises_404(tmp_path):
     """
     This should confirm that the workflow reacts appropriately
     (RepoNotFoundError at 404) when given an inaccessible repo_name.
@@ -105,7 +116,7 @@ def test_commits_workflow_raises_404():
         repo_name=repo_404,
         in_notebook=False,
         config_path="githubanalysis/config.cfg",
-        write_read_location="data/",
+        write_read_location=f"{tmp_path}/",
         logger=logger,
     )
 
@@ -115,7 +126,7 @@ def test_commits_workflow_raises_404():
 
 
 @pytest.mark.xfail(reason="Fails remotely: relies on GH config file")
-def test_run_commits_workflow_succeeds():
+def test_run_commits_workflow_succeeds(tmp_path):
     """
     This should confirm that the workflow reacts appropriately
     (RepoNotFoundError at 404) when given an inaccessible repo_name.
@@ -128,7 +139,7 @@ def test_run_commits_workflow_succeeds():
         repo_name=repo,
         in_notebook=False,
         config_path="githubanalysis/config.cfg",
-        write_read_location="data/",
+        write_read_location=f"{tmp_path}/",
         logger=logger,
     )
 
@@ -136,3 +147,217 @@ def test_run_commits_workflow_succeeds():
     assert len(runcommits.do_it_all()) == len(
         read_in_csv_file(workflow_outputs)
     ), "Workflow outputs lengths don't match anymore."
+
+
+def test_run_commits_makes_no_files_until_run(tmp_path):
+    # Act:
+    RunCommits(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        write_read_location=f"{tmp_path}/",
+        logger=logger,
+    )
+    # Assert:
+    assert not (tmp_path / "workflow_jobs.sqlite").exists()
+
+
+def test_classify_commits_matches_workflow_outputs(tmp_path):
+    # Arrange:
+    runcommits = RunCommits(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        write_read_location=f"{tmp_path}/",
+        logger=logger,
+    )
+    commits_changes = pd.read_csv(commit_details).dropna(
+        subset=["n_files_changed", "n_changes"]
+    )
+    expected = pd.read_csv(workflow_outputs)
+    # Act:
+    categories = runcommits.classify_commits(commits_changes)
+    # Assert:
+    assert list(categories.columns) == [
+        "hattori_lanza_content_cat",
+        "hattori_lanza_size_cat",
+        "vasilescu_category",
+    ]
+    for column in categories.columns:
+        assert list(categories[column]) == list(expected[column]), column
+
+
+def test_reformat_commits_matches_processed_csv():
+    # Arrange:
+    reformatter = CommitReformatter(
+        repo_name="FlicAnderson/peramagroon", in_notebook=False, logger=logger
+    )
+    expected = read_in_csv_file(processed_csv)
+    # Act:
+    reformatted = reformatter.reformat_commits_from_file(deduplicatedjson)
+    # Assert:
+    assert list(reformatted.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(
+        reformatted.fillna(""), expected.fillna("").astype(object)
+    )
+
+
+def test_reformat_commits_record_without_commit_details():
+    # Arrange:
+    reformatter = CommitReformatter(
+        repo_name="FlicAnderson/peramagroon", in_notebook=False, logger=logger
+    )
+    record = {"sha": "abc123", "commit": None, "author": None, "committer": None}
+    # Act:
+    reformatted = reformatter.reformat_commits_records([("branch1", record)])
+    # Assert:
+    assert reformatted.iloc[0].tolist() == [
+        "FlicAnderson/peramagroon",
+        "branch1",
+        "abc123",
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+    ]
+
+
+def make_commit_changes(
+    tmp_path, monkeypatch, changes: dict[str, list[str]], failing: set[str]
+) -> CommitChanges:
+    """
+    CommitChanges answering from `changes` (sha: list of filenames) instead
+    of the API, slowly and so in any order; `failing` shas raise.
+    """
+    config_path = tmp_path / "config.cfg"
+    config_path.write_text("[ACCESS]\ntoken = not-a-real-token\n")
+    commitchanges = CommitChanges(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path=str(config_path),
+        logger=logger,
+        cache_path=None,
+    )
+
+    def get_commit_changes_with_retries(commit_hash: str, max_retries=25):
+        time.sleep(random.uniform(0, 0.005))
+        if commit_hash in failing:
+            raise UnexpectedAPIError(f"unexpected response for {commit_hash}")
+        filenames = changes[commit_hash]
+        if not filenames:
+            return None
+        return pd.DataFrame(
+            {"commit_hash": commit_hash, "filename": filenames, "changes": 2}
+        )
+
+    monkeypatch.setattr(
+        commitchanges,
+        "get_commit_changes_with_retries",
+        get_commit_changes_with_retries,
+    )
+    return commitchanges
+
+
+def test_getcommitschangesvcats_pipeline_keeps_order_and_skips_errors(
+    tmp_path, monkeypatch
+):
+    # Arrange:
+    runcommits = RunCommits(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        write_read_location=f"{tmp_path}/",
+        logger=logger,
+        enrich_workers=4,
+        classify_chunk_size=7,
+        progress_every=10,
+    )
+    commits = [f"sha{i}" for i in range(60)]
+    changes = {
+        commit: [["README.md"], ["main.py", "test_main.py"], []][i % 3]
+        for i, commit in enumerate(commits)
+    }
+    commitchanges = make_commit_changes(
+        tmp_path, monkeypatch, changes, failing={"sha4", "sha31"}
+    )
+    classifier = Vasilescu_Commit_Classifier(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        logger=logger,
+    )
+    # Act:
+    n_files, n_changes, v_category = runcommits.getcommitschangesvcats(
+        commitchanges,
+        pd.DataFrame({"commit_sha": commits}),
+        classifier,
+    )
+    # Assert:
+    expected_commits = [c for c in commits if c not in {"sha4", "sha31"}]
+    assert [commit for _, commit in n_files] == expected_commits
+    assert [commit for _, commit in n_changes] == expected_commits
+    assert [commit for _, commit in v_category] == expected_commits
+    for (files, commit), (total, _), (category, _) in zip(
+        n_files, n_changes, v_category
+    ):
+        filenames = changes[commit]
+        assert files == (len(filenames) or None)
+        assert total == (2 * len(filenames) or None)
+        if not filenames:
+            assert category == "no_categorisation [EMPTY]"
+        else:
+            one_commit = pd.DataFrame({"commit_sha": commit, "filename": filenames})
+            assert category == classifier.classify_commit_files(one_commit)[commit]
+
+
+def test_getcommitschangesvcats_pipeline_reraises_base_exceptions(
+    tmp_path, monkeypatch
+):
+    # Arrange:
+    runcommits = RunCommits(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        write_read_location=f"{tmp_path}/",
+        logger=logger,
+        enrich_workers=4,
+    )
+    commits = [f"sha{i}" for i in range(20)]
+    commitchanges = make_commit_changes(
+        tmp_path, monkeypatch, {commit: ["README.md"] for commit in commits}, set()
+    )
+    get_changes = commitchanges.get_commit_changes_with_retries
+
+    def get_changes_exiting(commit_hash: str, max_retries=25):
+        if commit_hash == "sha7":
+            raise SystemExit("worker told to exit")
+        return get_changes(commit_hash)
+
+    monkeypatch.setattr(
+        commitchanges, "get_commit_changes_with_retries", get_changes_exiting
+    )
+    classifier = Vasilescu_Commit_Classifier(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        logger=logger,
+    )
+    raised = []
+
+    def run():
+        try:
+            runcommits.getcommitschangesvcats(
+                commitchanges, pd.DataFrame({"commit_sha": commits}), classifier
+            )
+        except BaseException as e:
+            raised.append(e)
+
+    # Act: in a thread, so a hang fails the test rather than blocking it
+    pipeline = threading.Thread(target=run, daemon=True)
+    pipeline.start()
+    pipeline.join(timeout=30)
+    # Assert:
+    assert not pipeline.is_alive(), "pipeline hung waiting for a failed worker"
+    assert len(raised) == 1 and isinstance(raised[0], SystemExit)
@@ -0,0 +1,63 @@
+"""Testing for partitioned dataset store and catalog."""
+
+import pandas as pd
+
+from githubanalysis.processing.dataset_catalog import DatasetCatalog, find_stage_files
+
+
+def test_latest_partition_per_repo(tmp_path):
+    catalog = DatasetCatalog(root=f"{tmp_path}/dataset/")
+    df = pd.DataFrame({"commit_sha": ["abc"]})
+
+    old = catalog.write(df, "commits_cats_stats", "owner-repo", "2024-10-16")
+    new = catalog.write(df, "commits_cats_stats", "owner-repo", "2024-10-17")
+    other = catalog.write(df, "commits_cats_stats", "owner-other", "2024-10-01")
+    catalog.write(df, "processed-commits", "owner-repo", "2024-10-18")
+
+    assert new.endswith(
+        "repo=owner-repo/date=2024-10-17/stage=commits_cats_stats/part.csv"
+    )
+    assert catalog.latest_paths("commits_cats_stats") == {
+        "owner-repo": new,
+        "owner-other": other,
+    }
+    assert find_stage_files(tmp_path, "commits_cats_stats") == [other, new]
+    assert old != new
+
+
+def test_find_stage_files_flat_fallback(tmp_path):
+    for filename in [
+        "processed-issues_owner-repo_2024-10-16.csv",
+        "processed-issues_owner-repo_2024-10-17.csv",
+        "processed-issues_owner-other_2024-10-01.parquet",
+        "processed-commits_owner-repo_2024-10-17.csv",
+        "notes.txt",
+    ]:
+        (tmp_path / filename).write_text("")
+
+    assert find_stage_files(tmp_path, "processed-issues") == [
+        str(tmp_path / "processed-issues_owner-other_2024-10-01.parquet"),
+        str(tmp_path / "processed-issues_owner-repo_2024-10-17.csv"),
+    ]
+
+    catalog = DatasetCatalog(root=f"{tmp_path}/dataset/")
+    assert catalog.import_flat_files(tmp_path) == 4
+    assert catalog.latest_path("processed-issues", "owner-repo") == str(
+        tmp_path / "processed-issues_owner-repo_2024-10-17.csv"
+    )
+
+
+def test_catalog_makes_nothing_until_written(tmp_path):
+    catalog = DatasetCatalog(root=f"{tmp_path}/dataset/")
+
+    stem = catalog.partition_stem("processed-commits", "owner-repo", "2024-10-17")
+
+    assert catalog.latest_paths("processed-commits") == {}
+    assert not (tmp_path / "dataset").exists()
+    catalog.write(
+        pd.DataFrame({"commit_sha": ["abc"]}),
+        "processed-commits",
+        "owner-repo",
+        "2024-10-17",
+    )
+    assert catalog.latest_path("processed-commits", "owner-repo") == f"{stem}.csv"
@@ -0,0 +1,49 @@
+"""Testing for csv / parquet DataFrame storage."""
+
+import numpy as np
+import pandas as pd
+
+from utilities.frame_storage import from_stored, read_frame, typed_columns, write_frame
+
+
+def make_commits_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "repo_name": ["owner/repo", "owner/repo"],
+            "commit_sha": ["abc", "def"],
+            "author_commit_date": ["2024-10-17T15:16:33Z", "2024-10-18T09:00:00Z"],
+            "hattori_lanza_size_cat": ["tiny", "large"],
+        }
+    )
+
+
+def test_typed_columns():
+    typed = typed_columns(make_commits_df())
+    assert str(typed["author_commit_date"].dtype) == "datetime64[ns, UTC]"
+    assert typed["hattori_lanza_size_cat"].dtype == "category"
+    assert typed["commit_sha"].dtype == object
+
+
+def test_csv_roundtrip_with_columns(tmp_path):
+    path = write_frame(make_commits_df(), path_stem=f"{tmp_path}/commits")
+    assert path.endswith("commits.csv")
+
+    df = read_frame(path, columns=["commit_sha", "hattori_lanza_size_cat"])
+    assert list(df.columns) == ["commit_sha", "hattori_lanza_size_cat"]
+    assert list(df["commit_sha"]) == ["abc", "def"]
+
+
+def test_parquet_roundtrip_with_columns(tmp_path):
+    path = write_frame(
+        make_commits_df(), path_stem=f"{tmp_path}/commits", storage_format="parquet"
+    )
+
+    df = read_frame(path, columns=["author_commit_date", "hattori_lanza_size_cat"])
+    assert list(df.columns) == ["author_commit_date", "hattori_lanza_size_cat"]
+    assert df["author_commit_date"].iloc[0] == pd.Timestamp("2024-10-17T15:16:33Z")
+
+
+def test_from_stored():
+    assert from_stored("['a', 'b']") == ["a", "b"]
+    assert from_stored(np.array(["a", "b"], dtype=object)) == ["a", "b"]
+    assert from_stored({"login": "a"}) == {"login": "a"}
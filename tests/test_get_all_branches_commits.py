@@ -2,8 +2,22 @@
 
 import pytest
 import json
+import re
+import threading
+import time
 
-from githubanalysis.processing.get_all_branches_commits import AllBranchesCommitsGetter
+from githubanalysis.processing.get_all_branches_commits import (
+    AllBranchesCommitsGetter,
+    merge_commits,
+)
+import utilities.get_default_logger as loggit
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
 
 # def test_get_all_branches_commits():
 #     # Arrange:
@@ -61,3 +75,114 @@ def test_get_all_branches_commits_N_branches():
     assert (
         len(expecteddeduplicatedjson) == len(output_get_all_branches_commits)
     ), f"The length of branches reading in deduplicated json {deduplicatedjson} and length of output (number of branches) generated by running get_all_branches_commits() on test repo 'FlicAnderson/peramagroon' are different. Check this!"
+
+
+def test_merge_commits_incremental():
+    # Arrange:
+    expecteddeduplicatedjson = setup_deduplicated_data(deduplicatedjson)
+    branch_sha, commits = next(iter(expecteddeduplicatedjson.items()))
+    new_commit = {"sha": "0" * 40, "commit": {}}
+    # Act:
+    merged = merge_commits(
+        expecteddeduplicatedjson,
+        {"1" * 40: [new_commit, commits[0]], branch_sha: []},
+    )
+    # Assert:
+    assert merged[branch_sha] == commits  # stored commits kept as they were
+    assert merged["1" * 40] == [new_commit]  # already-stored commit deduplicated
+    assert sum(len(c) for c in merged.values()) == 1 + sum(
+        len(c) for c in expecteddeduplicatedjson.values()
+    )
+
+
+class StubResponse:
+    def __init__(self, page: int, remaining: int):
+        self.status_code = 200
+        self.ok = True
+        self.headers = {"x-ratelimit-remaining": str(remaining)}
+        self.page = page
+
+    def json(self) -> list[dict]:
+        return [{"sha": f"page{self.page}-commit{i}"} for i in range(2)]
+
+
+class StubSession:
+    """
+    Answers commit page requests with `remaining` rate limit left. Later
+    pages answer faster, so pages got at once come back out of order.
+    Keeps the number of requests in flight as each page was requested.
+    """
+
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.in_flight_at_page: dict[int, int] = {}
+
+    def get(self, url: str, headers: dict) -> StubResponse:
+        page = int(re.search(r"&page=(\d+)", url).group(1))
+        with self.lock:
+            self.in_flight += 1
+            self.in_flight_at_page[page] = self.in_flight
+        time.sleep(0.05 / page)
+        with self.lock:
+            self.in_flight -= 1
+        return StubResponse(page, self.remaining)
+
+
+def make_stubbed_getter(tmp_path, remaining: int) -> AllBranchesCommitsGetter:
+    config_path = tmp_path / "config.cfg"
+    config_path.write_text("[ACCESS]\ntoken = not-a-real-token\n")
+    allbranchescommitsgetter = AllBranchesCommitsGetter(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path=str(config_path),
+        logger=logger,
+        max_workers=4,
+        etag_cache_path=None,
+        checkpoint_dir=None,
+        keep_full_payload=True,
+    )
+    allbranchescommitsgetter.s = StubSession(remaining)
+    return allbranchescommitsgetter
+
+
+def grab_pages(allbranchescommitsgetter, n_pages: int) -> list[dict]:
+    return allbranchescommitsgetter._multipage_commit_grabber(
+        commit_links={
+            "last": {
+                "url": f"https://api.github.com/repos/x?page_size=2&page={n_pages}"
+            }
+        },
+        repos_api_url="https://api.github.com/repos/",
+        repo_name="FlicAnderson/peramagroon",
+        branch="feature",
+        per_pg=2,
+    )
+
+
+def test_multipage_commit_grabber_keeps_page_order(tmp_path):
+    # Arrange:
+    allbranchescommitsgetter = make_stubbed_getter(tmp_path, remaining=5000)
+    # Act:
+    commits = grab_pages(allbranchescommitsgetter, n_pages=10)
+    # Assert:
+    assert [commit["sha"] for commit in commits] == [
+        f"page{page}-commit{i}" for page in range(1, 11) for i in range(2)
+    ]
+    in_flight = allbranchescommitsgetter.s.in_flight_at_page.values()
+    assert 1 < max(in_flight) <= 4  # pages got several at once, max_workers at most
+
+
+def test_multipage_commit_grabber_sequential_on_low_rate_limit(tmp_path):
+    # Arrange: rate limit remaining (3) below max_workers (4) from the first response
+    allbranchescommitsgetter = make_stubbed_getter(tmp_path, remaining=3)
+    # Act:
+    commits = grab_pages(allbranchescommitsgetter, n_pages=8)
+    # Assert:
+    assert [commit["sha"] for commit in commits] == [
+        f"page{page}-commit{i}" for page in range(1, 9) for i in range(2)
+    ]
+    in_flight_at_page = allbranchescommitsgetter.s.in_flight_at_page
+    assert max(in_flight_at_page[page] for page in range(1, 5)) > 1  # first batch
+    assert all(in_flight_at_page[page] == 1 for page in range(5, 9))
@@ -0,0 +1,125 @@
+"""Testing for issue-getting helper code."""
+
+from githubanalysis.processing.get_all_pages_issues import (
+    IssueGetter,
+    make_url,
+    upsert_issues,
+    max_updated_at,
+)
+import utilities.get_default_logger as loggit
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+
+
+def make_issue(id: int, number: int, updated_at: str, state: str = "open") -> dict:
+    return {"id": id, "number": number, "updated_at": updated_at, "state": state}
+
+
+def test_make_url_since():
+    url = make_url(
+        repos_api_url="https://api.github.com/repos/",
+        repo_name="FlicAnderson/peramagroon",
+        state="all",
+        pulls=True,
+        per_pg=100,
+        page=1,
+        since="2024-10-17T15:16:33Z",
+    )
+    assert "since=2024-10-17T15:16:33Z" in url
+    assert "sort=updated" in url
+
+
+def test_upsert_issues_replaces_by_id():
+    stored = [
+        make_issue(11, 2, "2024-10-01T00:00:00Z"),
+        make_issue(10, 1, "2024-09-01T00:00:00Z"),
+    ]
+    new = [
+        make_issue(10, 1, "2024-10-20T00:00:00Z", state="closed"),  # updated
+        make_issue(12, 3, "2024-10-21T00:00:00Z"),  # newly created
+    ]
+
+    upserted = upsert_issues(stored, new)
+
+    assert [issue["number"] for issue in upserted] == [3, 2, 1]
+    assert upserted[2]["state"] == "closed"
+    assert max_updated_at(upserted) == "2024-10-21T00:00:00Z"
+    assert max_updated_at([]) is None
+
+
+class StubResponse:
+    def __init__(self, issues: list[dict], next_url: str | None):
+        self.status_code = 200
+        self.ok = True
+        self.headers = {}
+        self.issues = issues
+        self.links = {} if next_url is None else {"next": {"url": next_url}}
+
+    def json(self) -> list[dict]:
+        return self.issues
+
+
+class StubSession:
+    """Answers issue listing requests from `pages`, keyed by url."""
+
+    def __init__(self, pages: dict[str, StubResponse]):
+        self.pages = pages
+
+    def get(self, url: str, headers: dict) -> StubResponse:
+        return self.pages[url]
+
+
+def test_page_issues_grabber_resume_drops_issues_repeated_across_pages(tmp_path):
+    # Arrange: page 1 got before a failure; since then a new issue (13) was
+    # created, pushing issue 11 from page 1 onto page 2, and 12 onto page 3
+    config_path = tmp_path / "config.cfg"
+    config_path.write_text("[ACCESS]\ntoken = not-a-real-token\n")
+    issuesgetter = IssueGetter(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path=str(config_path),
+        logger=logger,
+        etag_cache_path=None,
+        checkpoint_dir=f"{tmp_path}/checkpoints/",
+        keep_full_payload=True,
+    )
+    checkpoint = issuesgetter.make_checkpoint()
+    checkpoint.append(
+        1,
+        [
+            make_issue(10, 4, "2024-10-04T00:00:00Z"),
+            make_issue(11, 3, "2024-10-03T00:00:00Z"),
+        ],
+        next_url="page2",
+    )
+    issuesgetter.s = StubSession(
+        {
+            "page2": StubResponse(
+                [
+                    make_issue(11, 3, "2024-10-03T00:00:00Z"),
+                    make_issue(12, 2, "2024-10-02T00:00:00Z"),
+                ],
+                next_url="page3",
+            ),
+            "page3": StubResponse(
+                [
+                    make_issue(12, 2, "2024-10-02T00:00:00Z"),
+                    make_issue(9, 1, "2024-10-01T00:00:00Z"),
+                ],
+                next_url=None,
+            ),
+        }
+    )
+    # Act:
+    issues = issuesgetter._page_issues_grabber(
+        repos_api_url="https://api.github.com/repos/",
+        repo_name="FlicAnderson/peramagroon",
+        checkpoint=checkpoint,
+    )
+    # Assert:
+    assert [issue["id"] for issue in issues] == [10, 11, 12, 9]
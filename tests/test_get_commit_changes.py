@@ -0,0 +1,160 @@
+"""Testing for batched (GraphQL) commit changes code."""
+
+import pandas as pd
+
+from utilities.check_gh_reponse import UnexpectedAPIError
+from githubanalysis.processing.get_commit_changes import (
+    CommitChanges,
+    make_commits_graphql_query,
+    parse_commits_graphql_response,
+)
+import utilities.get_default_logger as loggit
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+
+shas = [
+    "e29c765b5adb6eb1d964502a4a7e26ab3f3027f8",
+    "f7ff11185b6944e067ef60660bb12dd58204daa8",
+    "0000000000000000000000000000000000000000",
+]
+
+
+def test_make_commits_graphql_query_aliases():
+    query = make_commits_graphql_query("FlicAnderson/peramagroon", shas)
+    assert 'repository(owner: "FlicAnderson", name: "peramagroon")' in query
+    for i, sha in enumerate(shas):
+        assert f'c{i}: object(oid: "{sha}")' in query
+
+
+def test_parse_commits_graphql_response():
+    response_json = {
+        "data": {
+            "repository": {
+                "c0": {
+                    "oid": shas[0],
+                    "additions": 43,
+                    "deletions": 0,
+                    "changedFilesIfAvailable": 1,
+                },
+                "c1": {
+                    "oid": shas[1],
+                    "additions": 0,
+                    "deletions": 0,
+                    "changedFilesIfAvailable": 0,
+                },
+                "c2": None,  # sha not found in repo
+            }
+        },
+        "errors": [{"type": "NOT_FOUND", "path": ["repository", "c2"]}],
+    }
+
+    totals = parse_commits_graphql_response(response_json, shas)
+
+    assert len(totals) == 2
+    assert totals[0] == {
+        "commit_hash": shas[0],
+        "n_files_changed": 1,
+        "n_changes": 43,
+        "additions": 43,
+        "deletions": 0,
+    }
+    # empty commits give None, matching REST path get_commit_changes() returning None
+    assert totals[1]["n_files_changed"] is None
+    assert totals[1]["n_changes"] is None
+
+
+def test_parse_commits_graphql_response_skips_unresolved_nodes():
+    response_json = {
+        "data": {
+            "repository": {
+                "c0": None,  # sha not found in repo
+                "c1": {},  # sha of a tree/blob: `... on Commit` fields absent
+                "c2": {
+                    "oid": shas[2],
+                    "additions": 5,
+                    "deletions": 2,
+                    "changedFilesIfAvailable": None,  # too big to count
+                },
+            }
+        }
+    }
+
+    assert parse_commits_graphql_response(response_json, shas) == []
+
+
+class StubResponse:
+    status_code = 200
+    ok = True
+    headers: dict = {}
+
+    def __init__(self, response_json: dict):
+        self.response_json = response_json
+
+    def json(self) -> dict:
+        return self.response_json
+
+
+def test_get_commits_changes_batch_falls_back_to_rest(tmp_path, monkeypatch):
+    # Arrange:
+    config_path = tmp_path / "config.cfg"
+    config_path.write_text("[ACCESS]\ntoken = not-a-real-token\n")
+    commitchanges = CommitChanges(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path=str(config_path),
+        logger=logger,
+        cache_path=None,
+    )
+    response_json = {
+        "data": {
+            "repository": {
+                "c0": {
+                    "oid": shas[0],
+                    "additions": 43,
+                    "deletions": 0,
+                    "changedFilesIfAvailable": 1,
+                },
+                "c1": None,
+                "c2": None,
+            }
+        },
+        "errors": [{"type": "NOT_FOUND", "path": ["repository", "c1"]}],
+    }
+    monkeypatch.setattr(
+        commitchanges.s, "post", lambda url, headers, json: StubResponse(response_json)
+    )
+
+    def get_commit_changes_with_retries(commit_hash: str, max_retries=25):
+        if commit_hash == shas[2]:  # not found by REST either
+            raise UnexpectedAPIError(f"No commit found for SHA: {commit_hash}")
+        return pd.DataFrame(
+            {
+                "commit_hash": commit_hash,
+                "filename": ["README.md", "main.py"],
+                "changes": [3, 4],
+                "additions": [2, 4],
+                "deletions": [1, 0],
+            }
+        )
+
+    monkeypatch.setattr(
+        commitchanges,
+        "get_commit_changes_with_retries",
+        get_commit_changes_with_retries,
+    )
+    # Act:
+    totals = commitchanges.get_commits_changes_batch(shas)
+    # Assert:
+    assert list(totals["commit_hash"]) == shas[:2]
+    assert totals.iloc[1].to_dict() == {
+        "commit_hash": shas[1],
+        "n_files_changed": 2,
+        "n_changes": 7,
+        "additions": 6,
+        "deletions": 1,
+    }
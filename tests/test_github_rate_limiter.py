@@ -0,0 +1,59 @@
+"""Testing for client-side GH API rate limiter."""
+
+from time import time
+
+from utilities.github_token_pool import TokenPool
+from utilities.github_rate_limiter import RateLimiter
+
+
+def test_rate_not_slowed_by_remaining_budget():
+    pool = TokenPool(["a", "b"])
+    reset = str(int(time()) + 100)
+    pool.update("a", {"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": reset})
+    pool.update("b", {"X-RateLimit-Remaining": "50", "X-RateLimit-Reset": reset})
+    limiter = RateLimiter(pool, max_rate=10)
+
+    # 150 requests left: no need to spread them out until the reset
+    assert limiter.rate() == 10
+    assert limiter.status()["requests_remaining"] == 150
+    assert limiter.estimate_seconds(150) == 15
+    # more than are left: the rest wait for the reset
+    assert 110 < limiter.estimate_seconds(200) < 121
+    # workers sharing the tokens split the pace
+    assert RateLimiter(pool, max_rate=10, share=0.5).rate() == 5
+
+
+def test_default_limiter_lets_short_runs_go_at_full_pace():
+    limiter = RateLimiter(TokenPool(["a"]))  # no rate limit headers seen yet
+
+    start = time()
+    waits = [limiter.acquire() for _ in range(15)]
+
+    # default bucket starts full at 10 requests, then refills at 10/s
+    assert waits[:10] == [0] * 10
+    assert time() - start < 1
+
+
+def test_acquire_allows_burst_then_paces():
+    pool = TokenPool(["a"])
+    pool.update(
+        "a",
+        {"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": str(int(time()) + 10)},
+    )
+    limiter = RateLimiter(pool, max_rate=50, burst=3)
+
+    waits = [limiter.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert all(0 < wait <= 1 / 50 + 0.01 for wait in waits[3:])
+
+
+def test_acquire_waits_for_reset_when_exhausted():
+    pool = TokenPool(["a"])
+    pool.update(
+        "a", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time()) + 1)}
+    )
+    limiter = RateLimiter(pool)
+
+    assert limiter.rate() == 0
+    assert 0 < limiter.acquire() <= 1.5
@@ -0,0 +1,72 @@
+"""Testing for conditional (ETag) requests in shared GH API session setup."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from utilities.github_session import ConditionalHTTPAdapter, ETagStore
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serves fixed json with an ETag, replying 304 if client already has it."""
+
+    etag = '"abc123"'
+    body = b'[{"sha": "e29c765b5adb6eb1d964502a4a7e26ab3f3027f8"}]'
+    n_full_responses = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("X-RateLimit-Remaining", "4999")
+            self.end_headers()
+            return
+        ETagHandler.n_full_responses += 1
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("X-RateLimit-Remaining", "4998")
+        self.send_header("Link", '<http://localhost/?page=2>; rel="next"')
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), ETagHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/repos/FlicAnderson/peramagroon"
+    httpd.shutdown()
+
+
+def test_conditional_request_reuses_stored_body(server, tmp_path):
+    s = requests.Session()
+    s.mount("http://", ConditionalHTTPAdapter(ETagStore(f"{tmp_path}/etags.sqlite")))
+
+    first = s.get(server)
+    second = s.get(server)
+
+    assert first.status_code == second.status_code == 200
+    assert not first.from_etag_cache
+    assert second.from_etag_cache
+    assert second.json() == first.json()
+    assert second.links == first.links
+    # fresh rate limit headers come from the 304 response
+    assert second.headers["X-RateLimit-Remaining"] == "4999"
+    assert ETagHandler.n_full_responses == 1
+
+
+def test_etag_store_file_made_on_first_use(server, tmp_path):
+    store = ETagStore(f"{tmp_path}/cache/etags.sqlite")
+    s = requests.Session()
+    s.mount("http://", ConditionalHTTPAdapter(store))
+    assert not (tmp_path / "cache").exists()
+
+    s.get(server)
+
+    assert (tmp_path / "cache" / "etags.sqlite").is_file()
@@ -0,0 +1,123 @@
+"""Testing for GitHub access token pool."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import time
+
+import pytest
+import requests
+
+from utilities.github_rate_limiter import RateLimiter
+from utilities.github_token_pool import TokenPool, TokenPoolAuth
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """Token 'spent' is out of requests; any other token is fine."""
+
+    def do_GET(self):
+        reset = str(int(time()) + 600)
+        if self.path == "/not-modified":
+            self.send_response(304)
+            self.send_header("X-RateLimit-Remaining", "4000")
+            self.send_header("X-RateLimit-Reset", reset)
+            self.end_headers()
+            return
+        if self.headers.get("Authorization") == "token spent":
+            self.send_response(403)
+            self.send_header("X-RateLimit-Remaining", "0")
+        else:
+            self.send_response(200)
+            self.send_header("X-RateLimit-Remaining", "4000")
+        self.send_header("X-RateLimit-Reset", reset)
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("X-RateLimit-Resource", "graphql")
+        self.send_header("X-RateLimit-Remaining", "4900")
+        self.send_header("X-RateLimit-Reset", str(int(time()) + 600))
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/"
+    httpd.shutdown()
+
+
+def test_choose_token_with_most_remaining():
+    pool = TokenPool(["a", "b"])
+    future = str(int(time()) + 600)
+    pool.update("a", {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": future})
+    pool.update("b", {"X-RateLimit-Remaining": "300", "X-RateLimit-Reset": future})
+    assert pool.choose() == "b"
+    assert pool.budget() == 310
+    # other resources' limits don't count towards core budget
+    pool.update(
+        "b",
+        {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": future,
+            "X-RateLimit-Resource": "graphql",
+        },
+    )
+    assert pool.choose() == "b"
+
+
+def test_rate_limited_token_is_swapped(server):
+    pool = TokenPool(["spent", "fresh"])
+    # 'spent' looks best until a response says otherwise
+    pool.remaining["fresh"] = 100
+    pool.reset["fresh"] = int(time()) + 600
+    s = requests.Session()
+    s.auth = TokenPoolAuth(pool)
+
+    response = s.get(server)
+
+    assert response.status_code == 200
+    assert response.request.headers["Authorization"] == "token fresh"
+    assert pool.remaining["spent"] == 0
+    assert pool.choose() == "fresh"
+
+
+def test_all_tokens_rate_limited(server):
+    pool = TokenPool(["spent"])
+    s = requests.Session()
+    s.auth = TokenPoolAuth(pool)
+
+    assert s.get(server).status_code == 403
+
+
+def test_not_modified_and_graphql_requests_not_charged_to_core(server):
+    pool = TokenPool(["a"])
+    graphql_pool = TokenPool(["a"], resource="graphql")
+    limiter = RateLimiter(pool, max_rate=0.5, burst=1)
+    graphql_limiter = RateLimiter(graphql_pool, max_rate=0.5, burst=1)
+    s = requests.Session()
+    s.auth = TokenPoolAuth(
+        pool,
+        rate_limiter=limiter,
+        graphql_token_pool=graphql_pool,
+        graphql_rate_limiter=graphql_limiter,
+    )
+
+    start = time()
+    for _ in range(3):
+        assert s.get(f"{server}not-modified").status_code == 304
+    assert s.post(f"{server}graphql", json={"query": "{}"}).status_code == 200
+
+    # at 0.5 requests/s, any charge past the first would have waited 2s
+    assert time() - start < 1
+    assert limiter.tokens == 1
+    assert graphql_limiter.tokens < 1
+    assert graphql_pool.remaining["a"] == 4900
+    assert pool.remaining["a"] == 4000
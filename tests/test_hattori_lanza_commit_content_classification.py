@@ -0,0 +1,69 @@
+"""Testing for Hattori-Lanza commit message content classification."""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from githubanalysis.analysis.hattori_lanza_commit_content_classification import (
+    Hattori_Lanza_Content_Classification,
+)
+import utilities.get_default_logger as loggit
+
+processedcsv = "tests/testdata/processed-csv__processed-commits_FlicAnderson-peramagroon_2024-10-17.csv"
+
+logger = loggit.get_default_logger(
+    console=False,
+    set_level_to="INFO",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+classifier = Hattori_Lanza_Content_Classification(logger=logger)
+
+
+def keyword_by_keyword(commit_message: str) -> str:
+    """Reference: one re.search per keyword, categories in priority order."""
+    if commit_message is None or commit_message == "":
+        return "empty_message"
+    for category, keywords in classifier.categories_priority:
+        for keyword in keywords:
+            if re.search(keyword, commit_message, flags=re.IGNORECASE):
+                return category
+    return "no_categorisation"
+
+
+messages = [
+    "Fix bug in merge of branches",  # management beats corrective
+    "improper handling",  # 'improper' holds 'proper' (corrective) only
+    "Add new feature",
+    "Updated README",
+    "emerged",  # 'merg' inside a word still counts
+    "typo",
+    "TODO: tidy",
+    "addresses the ISSUE",
+    "",
+]
+
+
+def test_content_classification_matches_keyword_search():
+    for message in messages:
+        assert classifier.hattori_lanza_commit_content_classification(
+            message
+        ) == keyword_by_keyword(message), message
+
+
+def test_classify_many():
+    processed = pd.read_csv(processedcsv, index_col=0)
+    commit_messages = pd.concat(
+        [processed["commit_message"], pd.Series(messages + [None, np.nan])],
+        ignore_index=True,
+    )
+
+    categories = classifier.classify_many(commit_messages)
+
+    assert categories.index.equals(commit_messages.index)
+    assert list(categories) == [
+        keyword_by_keyword(message if isinstance(message, str) else None)
+        for message in commit_messages
+    ]
+    assert list(categories[-3:]) == ["empty_message"] * 3
@@ -1,6 +1,9 @@
+import numpy as np
+import pandas as pd
 import pytest
 from githubanalysis.analysis.hattori_lanza_commit_size_classification import (
     hattori_lanza_commit_size_classification,
+    classify_commit_sizes,
 )
 
 from typing import cast
@@ -51,3 +54,27 @@ def test_hattori_lanza_commit_size_classification_large():
     assert hattori_lanza_commit_size_classification(126) == "large"
     assert hattori_lanza_commit_size_classification(100000) == "large"
     assert hattori_lanza_commit_size_classification(100000000000) == "large"
+
+
+def test_classify_commit_sizes():
+    commit_sizes = pd.Series([0, 1, 5, 6, 25, 26, 125, 126, 100000, None, np.nan])
+    expected = [
+        None,
+        "tiny",
+        "tiny",
+        "small",
+        "small",
+        "medium",
+        "medium",
+        "large",
+        "large",
+        None,
+        None,
+    ]
+    assert list(classify_commit_sizes(commit_sizes)) == expected
+    assert list(classify_commit_sizes(commit_sizes.iloc[:9])) == [
+        hattori_lanza_commit_size_classification(int(n)) for n in commit_sizes.iloc[:9]
+    ]
+
+    with pytest.raises(Exception):
+        classify_commit_sizes(pd.Series([3, -1]))
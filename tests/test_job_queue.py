@@ -0,0 +1,54 @@
+"""Testing for durable workflow job queue."""
+
+import pytest
+
+from githubanalysis.processing.job_queue import JobQueue
+
+
+def test_run_stage_records_attempts_and_errors(tmp_path):
+    jobqueue = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    output = tmp_path / "processed-commits_owner-repo_2024-10-17.csv"
+
+    with pytest.raises(ValueError):
+        with jobqueue.run_stage("commits", "owner/repo", "fetched"):
+            raise ValueError("borked")
+
+    failed = jobqueue.get("commits", "owner/repo", "fetched")
+    assert failed["status"] == "failed"
+    assert "borked" in failed["last_error"]
+    assert jobqueue.done_output("commits", "owner/repo", "fetched") is None
+
+    with jobqueue.run_stage("commits", "owner/repo", "fetched") as job:
+        output.write_text("commit_sha\n")
+        job["output_path"] = str(output)
+
+    done = jobqueue.get("commits", "owner/repo", "fetched")
+    assert done["status"] == "done"
+    assert done["attempts"] == 2
+    assert done["last_error"] is None
+    assert jobqueue.done_output("commits", "owner/repo", "fetched") == str(output)
+    assert len(jobqueue.summary("commits")) == 1
+
+
+def test_done_output_out_of_date(tmp_path):
+    jobqueue = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    output = tmp_path / "out.csv"
+    output.write_text("x\n")
+
+    for stage in ["fetched", "enriched"]:
+        with jobqueue.run_stage("commits", "owner/repo", stage) as job:
+            job["output_path"] = str(output)
+    assert jobqueue.done_output(
+        "commits", "owner/repo", "enriched", depends_on="fetched"
+    ) == str(output)
+
+    # re-fetching means enriched output needs redoing
+    jobqueue.start("commits", "owner/repo", "fetched")
+    assert (
+        jobqueue.done_output("commits", "owner/repo", "enriched", depends_on="fetched")
+        is None
+    )
+
+    # as does a deleted output file
+    output.unlink()
+    assert jobqueue.done_output("commits", "owner/repo", "fetched") is None
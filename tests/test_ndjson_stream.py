@@ -0,0 +1,63 @@
+"""Testing for streaming (compressed) ndjson write-out of raw GH API dumps."""
+
+import gzip
+
+import pytest
+
+from utilities.ndjson_stream import NDJSONWriter, iter_ndjson, ndjson_path, read_ndjson
+from githubanalysis.processing.get_all_branches_commits import (
+    iter_branch_commits,
+    read_branch_commits,
+    write_branch_commits,
+)
+from githubanalysis.processing.reformat_commits import CommitReformatter
+
+deduplicatedjson = "tests/testdata/deduplicated-commits__all-branches-commits_FlicAnderson-peramagroon_2024-10-17_deduplicated.json"
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_ndjson_round_trip(tmp_path, codec):
+    path = ndjson_path(f"{tmp_path}/all-issues_owner-repo_2024-10-17", codec)
+    records = [{"id": 1, "labels": ["bug"]}, {"id": 2, "body": "line\nbreak"}]
+
+    with NDJSONWriter(path) as writer:
+        writer.write(records[0])
+        writer.write_many(records[1:])
+
+    assert writer.n_records == 2
+    assert read_ndjson(path) == records
+    if codec == "gzip":
+        assert path.endswith(".ndjson.gz")
+        with gzip.open(path, "rt") as f:
+            assert len(f.readlines()) == 2
+
+
+def test_ndjson_writer_failure_leaves_no_file(tmp_path):
+    path = f"{tmp_path}/all-issues_owner-repo_2024-10-17.ndjson.gz"
+
+    with pytest.raises(RuntimeError):
+        with NDJSONWriter(path) as writer:
+            writer.write({"id": 1})
+            raise RuntimeError("API request failed part-way")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_branch_commits_stream_matches_json(tmp_path):
+    expected = read_branch_commits(deduplicatedjson)  # old whole-file json dump
+    path = ndjson_path(f"{tmp_path}/all-branches-commits_FlicAnderson-peramagroon")
+
+    with NDJSONWriter(path) as writer:
+        for branch_sha, commits in expected.items():
+            write_branch_commits(writer, branch_sha, commits)
+
+    assert read_branch_commits(path) == expected
+    assert len(list(iter_ndjson(path))) == sum(len(c) for c in expected.values())
+
+    reformatter = CommitReformatter(
+        repo_name="FlicAnderson/peramagroon", in_notebook=False
+    )
+    from_stream = reformatter.reformat_commits_from_file(path)
+    from_object = reformatter.reformat_commits_object(expected)
+    assert from_stream.equals(from_object)
+    assert next(iter_branch_commits(path))[0] == next(iter(expected))
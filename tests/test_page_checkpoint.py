@@ -0,0 +1,99 @@
+"""Testing for paginator page checkpoints."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from githubanalysis.processing.get_all_pages_issues import IssueGetter
+from githubanalysis.processing.page_checkpoint import PageCheckpoint
+
+
+class IssuePagesHandler(BaseHTTPRequestHandler):
+    """Three pages of two issues each, linked by `next`."""
+
+    pages_requested: list[int] = []
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query)["page"][0])
+        IssuePagesHandler.pages_requested.append(page)
+        self.send_response(200)
+        if page < 3:
+            next_url = f"http://127.0.0.1:{self.server.server_port}/owner/repo/issues?page={page + 1}"
+            self.send_header("Link", f'<{next_url}>; rel="next"')
+        self.end_headers()
+        issues = [{"id": page * 10 + i} for i in range(2)]
+        self.wfile.write(json.dumps(issues).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    IssuePagesHandler.pages_requested = []
+    httpd = HTTPServer(("127.0.0.1", 0), IssuePagesHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/"
+    httpd.shutdown()
+
+
+def test_checkpoint_reload_ignores_partial_line(tmp_path):
+    path = tmp_path / "checkpoint.ndjson"
+    checkpoint = PageCheckpoint(path)
+    checkpoint.append(2, ["c", "d"])
+    checkpoint.append(1, ["a", "b"], next_url="https://next")
+    with open(path, "a") as spill_file:
+        spill_file.write('{"page": 3, "items": ["e"')  # died mid-write
+
+    reloaded = PageCheckpoint(path)
+
+    assert len(reloaded) == 2
+    assert reloaded.items() == ["a", "b", "c", "d"]
+    assert reloaded.resume_point() == (2, None)
+    reloaded.clear()
+    assert not path.exists()
+
+
+def test_checkpoint_append_after_partial_line(tmp_path):
+    path = tmp_path / "checkpoint.ndjson"
+    checkpoint = PageCheckpoint(path)
+    checkpoint.append(1, ["a"], next_url="u2")
+    with open(path, "a") as spill_file:
+        spill_file.write('{"page": 2, "items": ["b"')  # died mid-write
+
+    resumed = PageCheckpoint(path)
+    resumed.append(2, ["b"], next_url="u3")
+    resumed.append(3, ["c"])
+    reloaded = PageCheckpoint(path)
+
+    assert reloaded.resume_point() == (3, None)
+    assert reloaded.items() == ["a", "b", "c"]
+
+
+def test_issue_grabber_resumes_from_checkpoint(server, tmp_path):
+    config_path = tmp_path / "config.cfg"
+    config_path.write_text("[ACCESS]\ntoken = testing\n")
+    issuesgetter = IssueGetter(
+        repo_name="owner/repo",
+        in_notebook=False,
+        config_path=str(config_path),
+        logger=None,
+        etag_cache_path=None,
+        checkpoint_dir=f"{tmp_path}/",
+    )
+    checkpoint = issuesgetter.make_checkpoint()
+    checkpoint.append(
+        1, [{"id": 10}, {"id": 11}], next_url=f"{server}owner/repo/issues?page=2"
+    )
+
+    all_issues = issuesgetter._page_issues_grabber(
+        server, "owner/repo", checkpoint=checkpoint
+    )
+
+    assert IssuePagesHandler.pages_requested == [2, 3]
+    assert [issue["id"] for issue in all_issues] == [10, 11, 20, 21, 30, 31]
+    assert checkpoint.resume_point() == (3, None)
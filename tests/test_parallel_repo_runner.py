@@ -0,0 +1,42 @@
+"""Testing for process-pool multi-repo runner."""
+
+import logging
+
+import pandas as pd
+
+from utilities.parallel_repo_runner import run_repos_in_parallel
+
+
+def fake_single_repo_method(repo_name: str, logger: logging.Logger, n_rows: int):
+    if repo_name == "owner/handled-failure":
+        return None
+    if repo_name == "owner/unhandled-failure":
+        raise ValueError("borked")
+    return pd.DataFrame({"x": range(n_rows)})
+
+
+def test_run_repos_in_parallel_isolates_failures(tmp_path):
+    repos = [
+        "owner/ok-a",
+        "owner/handled-failure",
+        "owner/unhandled-failure",
+        "owner/ok-b",
+    ]
+
+    results, summary = run_repos_in_parallel(
+        repo_names=repos,
+        single_repo_fn=fake_single_repo_method,
+        logger=logging.getLogger("test_parallel_repo_runner"),
+        n_workers=2,
+        log_prefix="testing",
+        log_location=f"{tmp_path}/",
+        config_path="no/such/config.cfg",
+        n_rows=3,
+    )
+
+    assert set(results) == set(repos)
+    assert len(results["owner/ok-a"]) == 3
+    assert results["owner/unhandled-failure"] is None
+    assert list(summary["status"]) == ["failed", "failed", "ok", "ok"]
+    assert list(summary["n_rows"].dropna()) == [3, 3]
+    assert len(list(tmp_path.glob("testing_worker-*_logs.txt"))) > 0
@@ -0,0 +1,66 @@
+"""Testing for combining per-dev commits and issues data."""
+
+import importlib
+
+import pandas as pd
+import pytest
+
+from utilities.frame_storage import read_frame, write_frame
+import utilities.get_default_logger as loggit
+
+# module name isn't a valid identifier, so can't be imported with `import`
+combined_prep = importlib.import_module(
+    "githubanalysis.processing.pre-analysis_data_combined_prep"
+)
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+
+
+@pytest.mark.parametrize("storage_format", ["csv", "parquet"])
+def test_per_dev_data_merged_and_written(tmp_path, storage_format):
+    # Arrange:
+    commits = pd.DataFrame(
+        {
+            "repo_name": ["owner/repo", "owner/repo"],
+            "author_username": ["ann", "bob"],
+            "n_commits": [3, 1],
+            "pc_repo_commits": [75.0, 25.0],
+        }
+    )
+    issues = pd.DataFrame(
+        {
+            "repo_name": ["owner/repo", "owner/repo"],
+            "issue_username": ["ann", "cat"],
+            "issue_author_username": ["ann", "cat"],
+            "assigned_devs": [None, "cat"],
+            "n_issues": [2, 2],
+            "pc_repo_issues": [50.0, 50.0],
+            "n_issues_assigned": [0, 1],
+            "pc_issues_assigned_of_assigned": [0.0, 100.0],
+        }
+    )
+    commits_file = write_frame(commits, f"{tmp_path}/commits", storage_format)
+    issues_file = write_frame(issues, f"{tmp_path}/issues", storage_format)
+    prepdatacombined = combined_prep.PrepDataCombined(
+        in_notebook=False, logger=logger, storage_format=storage_format
+    )
+    # Act:
+    omnirepo = prepdatacombined.process_multi_origin_data(
+        commits_data_file=commits_file,
+        issues_data_file=issues_file,
+        read_location=tmp_path,
+        write_location=tmp_path,
+    )
+    # Assert:
+    written = list(tmp_path.glob(f"merged-data-per-dev_x1-repos_*.{storage_format}"))
+    assert len(written) == 1
+    merged = read_frame(written[0]).sort_values("gh_username", ignore_index=True)
+    assert list(merged["gh_username"]) == ["ann", "bob", "cat"]
+    assert list(merged["_dataset_source"]) == ["Both", "Only Commits", "Only Issues"]
+    assert list(merged["n_commits"]) == [3, 1, 0]
+    assert len(omnirepo) == 3
@@ -0,0 +1,63 @@
+"""Testing for per-dev issues data prep."""
+
+import importlib
+
+import pandas as pd
+import pytest
+
+from utilities.frame_storage import read_frame, write_frame
+import utilities.get_default_logger as loggit
+
+# module name isn't a valid identifier, so can't be imported with `import`
+issues_prep = importlib.import_module(
+    "githubanalysis.processing.pre-analysis_data_issues_prep"
+)
+
+logger = loggit.get_default_logger(
+    console=True,
+    set_level_to="DEBUG",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+
+
+@pytest.mark.parametrize("storage_format", ["csv", "parquet"])
+def test_per_dev_issues_data_from_processed_issues(tmp_path, storage_format):
+    # Arrange: processed issues as written by RunIssues.save_formatted_issues()
+    processed_issues = pd.DataFrame(
+        {
+            "repo_name": ["owner/repo"] * 4,
+            "issue_id": [11, 12, 13, 14],
+            "issue_state": ["open", "closed", "open", "open"],
+            "issue_labels": [[], [{"name": "bug"}], [], []],
+            "issue_author_username": ["ann", "ann", "bob", "ann"],
+            "assignees_list_usernames": [["ann", "cat"], ["cat"], [], None],
+        }
+    )
+    write_frame(
+        processed_issues,
+        f"{tmp_path}/processed-issues_owner-repo_2024-10-17",
+        storage_format,
+        index=True,
+    )
+    prepdataissues = issues_prep.PrepDataIssues(
+        in_notebook=False, logger=logger, storage_format=storage_format
+    )
+    # Act:
+    devs_issues_data = prepdataissues.process_issues(
+        read_location=tmp_path, write_location=f"{tmp_path}/"
+    )
+    # Assert:
+    by_dev = devs_issues_data.set_index("issue_username")
+    assert by_dev.loc["ann", "n_issues"] == 3
+    assert by_dev.loc["bob", "n_issues"] == 1
+    assert by_dev.loc["ann", "n_issues_assigned"] == 1
+    assert by_dev.loc["cat", "n_issues_assigned"] == 2
+    assert by_dev.loc["cat", "n_issues"] == 0
+    # 3 issues assigned to anyone (incl. unassigned-issue creator placeholder)
+    assert by_dev.loc["cat", "pc_issues_assigned_of_assigned"] == pytest.approx(
+        2 / 3 * 100
+    )
+    written = list(tmp_path.glob(f"issues-data-per-dev_x1-repos_*.{storage_format}"))
+    assert len(written) == 1
+    assert len(read_frame(written[0])) == len(devs_issues_data)
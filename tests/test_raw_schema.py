@@ -0,0 +1,90 @@
+"""Testing for projection of raw GH API payloads onto fields used downstream."""
+
+import json
+
+from githubanalysis.processing.raw_schema import (
+    COMMIT_SCHEMA,
+    ISSUE_SCHEMA,
+    project,
+    project_records,
+)
+from githubanalysis.processing.reformat_commits import CommitReformatter
+from githubanalysis.processing.issues_workflow import RunIssues
+
+deduplicatedjson = "tests/testdata/deduplicated-commits__all-branches-commits_FlicAnderson-peramagroon_2024-10-17_deduplicated.json"
+
+user = {
+    "login": "FlicAnderson",
+    "id": 5812129,
+    "avatar_url": "https://avatars.githubusercontent.com/u/5812129?v=4",
+    "url": "https://api.github.com/users/FlicAnderson",
+}
+issue = {
+    "url": "https://api.github.com/repos/FlicAnderson/peramagroon/issues/3",
+    "id": 101,
+    "number": 3,
+    "state": "closed",
+    "title": "Fix the thing",
+    "created_at": "2024-10-16T15:16:33Z",
+    "updated_at": "2024-10-17T15:16:33Z",
+    "closed_at": "2024-10-17T15:16:33Z",
+    "author_association": "OWNER",
+    "comments": 2,
+    "labels": [{"id": 1, "name": "bug", "color": "d73a4a", "default": True}],
+    "milestone": None,
+    "body": "It's broken.",
+    "locked": False,
+    "performed_via_github_app": None,
+    "user": user,
+    "assignees": [user],
+    "state_reason": "completed",
+    "pull_request": {
+        "url": "https://api.github.com/repos/FlicAnderson/peramagroon/pulls/3",
+        "merged_at": None,
+    },
+    "closed_by": user,
+    "reactions": {"total_count": 0},
+}
+
+
+def test_project_keeps_declared_fields():
+    assert project(issue["labels"], ISSUE_SCHEMA["labels"]) == [{"name": "bug"}]
+    assert project(None, ISSUE_SCHEMA["closed_by"]) is None
+    assert project({"sha": "abc"}, COMMIT_SCHEMA) == {
+        "sha": "abc"
+    }  # missing stays missing
+    assert project_records([issue], None) == [issue]
+
+
+def test_projected_commits_reformat_the_same():
+    with open(deduplicatedjson) as f:
+        commits = json.load(f)
+    projected = {
+        branch_sha: project_records(branch_commits, COMMIT_SCHEMA)
+        for branch_sha, branch_commits in commits.items()
+    }
+
+    reformatter = CommitReformatter(
+        repo_name="FlicAnderson/peramagroon", in_notebook=False
+    )
+    assert reformatter.reformat_commits_object(projected).equals(
+        reformatter.reformat_commits_object(commits)
+    )
+    assert len(json.dumps(projected)) < len(json.dumps(commits)) / 5
+
+
+def test_projected_issues_format_the_same(tmp_path):
+    runissues = RunIssues(
+        repo_name="FlicAnderson/peramagroon",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        write_read_location=f"{tmp_path}/",
+    )
+    full = runissues.format_issues_object([issue])
+    projected = runissues.format_issues_object(project_records([issue], ISSUE_SCHEMA))
+
+    nested = ["issue_labels", "pull_request", "closed_by"]
+    assert projected.drop(columns=nested).equals(full.drop(columns=nested))
+    assert projected.loc[0, "closed_by"]["login"] == "FlicAnderson"
+    assert projected.loc[0, "pull_request"] is not None
+    assert projected.loc[0, "issue_labels"] == [{"name": "bug"}]
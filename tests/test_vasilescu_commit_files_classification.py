@@ -0,0 +1,129 @@
+"""Testing for Vasilescu et al. commit filetype classification."""
+
+import re
+
+import pandas as pd
+
+from githubanalysis.analysis.vasilescu_commit_files_classification import (
+    Vasilescu_Commit_Classifier,
+    filename_memo_stats,
+    first_matching_category,
+)
+import utilities.get_default_logger as loggit
+
+logger = loggit.get_default_logger(
+    console=False,
+    set_level_to="INFO",
+    log_name="logs/testing_logs.txt",
+    in_notebook=False,
+)
+classifier = Vasilescu_Commit_Classifier(
+    repo_name="FlicAnderson/peramagroon",
+    in_notebook=False,
+    config_path="githubanalysis/config.cfg",
+    logger=logger,
+)
+
+filenames = [
+    "README.md",
+    "docs/conf.py",  # doc directory beats code extension
+    "main.lua",  # '.*\.l' (doc) matches anywhere, not only as extension
+    "src/Thing.PY",
+    "setup.py",
+    "po/fr.po",
+    "/po/x",
+    "figures/plot.jpeg",
+    "Makefile",
+    "tests/test_thing.py",
+    "test/data.csv",
+    ".github/workflows/ci.yml",
+    "lib/library/thing",
+    "chess game.pgn",
+    "CITATION.cff",
+    "LICENSE",
+    "data.json",
+    "noextension",
+]
+
+
+def rule_by_rule(filestr: str) -> str:
+    """Reference: one re.search per rule, categories in order."""
+    for cat, filetypes in classifier.cat_list_dict.items():
+        for filetype in filetypes:
+            if re.search(filetype, filestr, flags=re.IGNORECASE):
+                return cat
+    return "no_categorisation"
+
+
+def generated_filenames() -> list[str]:
+    """Every extension named in the rules, in and out of directories that rules pick out."""
+    extensions = {
+        extension
+        for filetypes in classifier.cat_list_dict.values()
+        for filetype in filetypes
+        for extension in re.findall(r"\\\.([a-z0-9]+)", filetype)
+    }
+    return [
+        f"{directory}{name}.{extension}"
+        for directory in ["", "src/", "docs/", "po/", "test/", "build/", "icons/"]
+        for name in ["thing", "README", "test_thing"]
+        for extension in sorted(extensions)
+    ]
+
+
+def test_check_category_matches_rule_by_rule():
+    for filestr in filenames + generated_filenames():
+        assert classifier.vasilescu_check_category(
+            category="any", filestr=filestr
+        ) == rule_by_rule(filestr), filestr
+
+    assert classifier.vasilescu_check_category("code", "docs/conf.py") == "code"
+    assert (
+        classifier.vasilescu_check_category("img", "docs/conf.py")
+        == "no_categorisation"
+    )
+
+
+def test_classify_filenames_and_commit_tie_breaker():
+    categories = classifier.classify_filenames(pd.Series(filenames + filenames[:3]))
+    assert list(categories) == [rule_by_rule(f) for f in filenames + filenames[:3]]
+
+    commit_changes_df = pd.DataFrame({"filename": ["setup.py", "README.md", "x.csv"]})
+    assert classifier.vasilescu_commit_files_classification(
+        commit_changes_df, "abc"
+    ) == ("doc", "abc")
+
+
+def test_filename_memo_shared_across_classifiers():
+    first_matching_category.cache_clear()
+    other_repo_classifier = Vasilescu_Commit_Classifier(
+        repo_name="JeschkeLab/DeerLab",
+        in_notebook=False,
+        config_path="githubanalysis/config.cfg",
+        logger=logger,
+    )
+
+    classifier.classify_filenames(["README.md", "setup.py"])
+    other_repo_classifier.classify_filenames(["readme.MD", "setup.py", "src/x.c"])
+
+    stats = filename_memo_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 3, 3)
+    assert stats["hit_rate"] == 0.4
+
+
+def test_classify_commit_files():
+    commit_files = pd.DataFrame(
+        {
+            "commit_sha": ["a", "a", "a", "b", "c", "c"],
+            "filename": ["setup.py", "README.md", "x.csv", "x.csv", "src/y.c", "z.py"],
+        }
+    )
+    v_cats = classifier.classify_commit_files(commit_files)
+    assert v_cats.to_dict() == {
+        commit: classifier.vasilescu_commit_files_classification(
+            files.reset_index(drop=True), commit
+        )[0]
+        for commit, files in commit_files.groupby("commit_sha")
+    }
+    # 'x.csv' is code, not db: code's '.cs' rule is checked first
+    assert v_cats.to_dict() == {"a": "doc", "b": "code", "c": "code"}
@@ -0,0 +1,49 @@
+"""Testing for WorkflowManager key-value store."""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from githubanalysis.processing.workflow_manager import WorkflowManager
+
+
+def test_get_set_and_json_import(tmp_path):
+    legacy = tmp_path / "info.json"
+    legacy.write_text(json.dumps({"old_key": [1, 2]}))
+
+    manager = WorkflowManager(filepath=tmp_path / "info.sqlite")
+    assert manager.get("old_key") == [1, 2]
+    assert not legacy.exists()
+
+    assert manager.get("missing", default="nope") == "nope"
+    manager.set("repo", {"done": True})
+    manager.set("repo", {"done": False})
+
+    # visible to other connections (eg other worker processes)
+    assert WorkflowManager(filepath=tmp_path / "info.sqlite").get("repo") == {
+        "done": False
+    }
+
+
+def open_manager(filepath: str) -> list:
+    return WorkflowManager(filepath=filepath).get("old_key")
+
+
+def test_json_imported_once_by_concurrent_processes(tmp_path):
+    legacy = tmp_path / "info.json"
+    legacy.write_text(json.dumps({"old_key": [1, 2]}))
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        got = list(executor.map(open_manager, [str(tmp_path / "info.sqlite")] * 8))
+
+    assert got == [[1, 2]] * 8
+    assert not legacy.exists()
+    assert (tmp_path / "info.json.imported").exists()
+
+
+def test_json_import_skipped_if_already_moved(tmp_path):
+    legacy = tmp_path / "info.json"
+    manager = WorkflowManager(filepath=tmp_path / "info.sqlite")
+    # as if another process imported and moved it after our exists() check
+    manager._import_json(legacy)
+    manager.set("repo", {"done": True})
+    assert manager.get("repo") == {"done": True}
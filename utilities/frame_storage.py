@@ -0,0 +1,122 @@
+"""Write and read workflow DataFrames as CSV or (typed, columnar) Parquet."""
+
+import importlib.util
+from ast import literal_eval
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STORAGE_FORMATS = ["csv", "parquet"]
+
+# columns stored as timestamps / categoricals in Parquet files
+DATE_COLUMNS = [
+    "author_commit_date",
+    "comitter_commit_date",
+    "created_at",
+    "updated_at",
+    "closed_at",
+]
+CATEGORY_COLUMNS = [
+    "repo_name",
+    "branch_sha",
+    "vasilescu_category",
+    "hattori_lanza_content_cat",
+    "hattori_lanza_size_cat",
+    "issue_state",
+    "author_association",
+    "issues_state_reason",
+]
+
+
+def check_parquet_engine():
+    """Parquet needs pyarrow (in requirements.txt) or fastparquet installed."""
+    if (
+        importlib.util.find_spec("pyarrow") is None
+        and importlib.util.find_spec("fastparquet") is None
+    ):
+        raise ImportError(
+            "Parquet storage needs pyarrow installed: `pip install -r requirements.txt`."
+        )
+
+
+def frame_path(path_stem: str, storage_format: str = "csv") -> str:
+    """`path_stem` (path without extension) with the file extension for `storage_format`."""
+    assert (
+        storage_format in STORAGE_FORMATS
+    ), f"storage_format must be one of {STORAGE_FORMATS}, not {storage_format}."
+    return f"{path_stem}.{storage_format}"
+
+
+def typed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of `df` with known date columns as UTC timestamps and label columns as categoricals."""
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_frame(
+    df: pd.DataFrame,
+    path_stem: str,
+    storage_format: str = "csv",
+    index: bool = False,
+) -> str:
+    """
+    Write `df` out to `path_stem` + '.csv' or '.parquet'; returns the path written to.
+    Parquet files keep column types (see typed_columns()), and lists/dicts
+    (eg issue labels) as nested values rather than their string repr.
+
+    :param df: data to write out
+    :type: pd.DataFrame
+    :param path_stem: file path without extension
+    :type: str
+    :param storage_format: 'csv' or 'parquet' (Default: 'csv')
+    :type: str
+    :param index: whether to write out the index too (Default: False)
+    :type: bool
+    :returns: path written to
+    :rtype: str
+    """
+    path = frame_path(path_stem, storage_format)
+    if storage_format == "parquet":
+        check_parquet_engine()
+        typed_columns(df).to_parquet(path, index=index)
+    else:
+        df.to_csv(path_or_buf=path, header=True, index=index, na_rep="", mode="w")
+    return path
+
+
+def from_stored(value):
+    """
+    Python list/dict for a list- or dict-valued cell: csv files hold their
+    string repr (so literal_eval it), Parquet files hold them natively
+    (lists come back as numpy arrays).
+    """
+    if isinstance(value, str):
+        return literal_eval(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def read_frame(
+    path: str | Path,
+    columns: list[str] | None = None,
+    **csv_kwargs,
+) -> pd.DataFrame:
+    """
+    Read a DataFrame written by write_frame() (or any csv), choosing the
+    reader from the file extension. Only `columns` are read from Parquet
+    files; csv files are read whole then cut down to `columns`.
+    `csv_kwargs` are passed to pd.read_csv() only.
+    """
+    if Path(path).suffix == ".parquet":
+        check_parquet_engine()
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path, **csv_kwargs)
+    return df if columns is None else df[columns]
@@ -0,0 +1,101 @@
+"""Client-side pacing of GH API requests, from rate limit headers seen on responses."""
+
+import threading
+from time import sleep, time
+
+from utilities.github_token_pool import TokenPool, get_token_pool
+
+# GitHub's secondary rate limits kick in well below the primary hourly
+# limit for bursts of requests, so cap the pace regardless of budget.
+MAX_REQUESTS_PER_SECOND = 10.0
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every session using the same TokenPool.
+
+    By default the bucket holds `burst` (10) requests and starts full; it
+    refills at `max_rate` (MAX_REQUESTS_PER_SECOND, 10/s), keeping clear
+    of GitHub's secondary rate limits. The hourly (primary) limit doesn't
+    slow requests down while the tokens have requests remaining, as seen
+    in `X-RateLimit-Remaining` headers (5000 per token until a response
+    says otherwise), so short runs go at full pace. Once every token is
+    used up, `acquire()` waits for the first reset instead of running into
+    403/429s and then sleeping.
+    When several processes share the tokens, each should set `share` to
+    its fraction of the pace (eg 1/n_workers).
+    """
+
+    def __init__(
+        self,
+        token_pool: TokenPool,
+        max_rate: float = MAX_REQUESTS_PER_SECOND,
+        burst: int = 10,
+        share: float = 1.0,
+    ) -> None:
+        self.token_pool = token_pool
+        self.max_rate = max_rate
+        self.burst = burst
+        assert 0 < share <= 1, "share must be in (0, 1]."
+        self.share = share
+        self.tokens = float(burst)
+        self.last_refill = time()
+        self.lock = threading.Lock()
+
+    def rate(self) -> float:
+        """Current refill rate in requests per second; 0 while every token is used up."""
+        if self.token_pool.budget() <= 0:
+            return 0.0
+        return self.max_rate * self.share
+
+    def acquire(self) -> float:
+        """Wait until a request may be sent; returns seconds waited."""
+        with self.lock:
+            now = time()
+            rate = self.rate()
+            if rate <= 0:  # every token used up: wait for first reset
+                wait = max(0.0, self.token_pool.next_reset() - now)
+                self.tokens = float(self.burst) - 1  # full again after reset
+                self.last_refill = now + wait
+            else:
+                self.tokens = min(
+                    float(self.burst), self.tokens + (now - self.last_refill) * rate
+                )
+                self.last_refill = now
+                self.tokens -= 1  # take this request's token now, even if in debt
+                wait = max(0.0, -self.tokens / rate)
+        if wait > 0:
+            sleep(wait)
+        return wait
+
+    def refund(self) -> None:
+        """Give back a request's charge, eg when it turned out not to count against the limit."""
+        with self.lock:
+            self.tokens = min(float(self.burst), self.tokens + 1)
+
+    def status(self) -> dict:
+        """Current budget for logging / progress estimates."""
+        return {
+            "requests_remaining": self.token_pool.budget(),
+            "requests_per_second": round(self.rate(), 3),
+            "next_reset": self.token_pool.next_reset(),
+        }
+
+    def estimate_seconds(self, n_requests: int) -> float:
+        """Rough time needed for `n_requests` more requests at current pace."""
+        seconds = n_requests / (self.max_rate * self.share)
+        if n_requests > self.token_pool.budget():  # some wait for the next reset
+            seconds += max(0.0, self.token_pool.next_reset() - time())
+        return seconds
+
+
+_rate_limiters: dict[tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(config_path: str, resource: str = "core") -> RateLimiter:
+    """Shared RateLimiter for the TokenPool of config file at `config_path` and rate limit `resource`."""
+    if (config_path, resource) not in _rate_limiters:
+        _rate_limiters[(config_path, resource)] = RateLimiter(
+            get_token_pool(config_path, resource)
+        )
+    return _rate_limiters[(config_path, resource)]
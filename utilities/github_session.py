@@ -0,0 +1,216 @@
+"""Shared requests.Session setup for GH API fetchers, with conditional (ETag / Last-Modified) requests."""
+
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from requests.structures import CaseInsensitiveDict
+
+from utilities.github_token_pool import TokenPoolAuth, get_token_pool
+from utilities.github_rate_limiter import get_rate_limiter
+
+DEFAULT_ETAG_CACHE_PATH = "data/etag_cache.sqlite"
+
+
+class ETagStore:
+    """
+    Keeps the ETag / Last-Modified validators and body of the last 200
+    response for each GET url, so refresh runs can send conditional
+    requests and reuse the stored body when GitHub replies 304 Not
+    Modified (which doesn't count against the rate limit).
+    The SQLite file is only opened (and made) on first use, so sessions
+    that never send a GET don't leave one behind.
+    """
+
+    path: Path
+
+    def __init__(self, path: str = DEFAULT_ETAG_CACHE_PATH) -> None:
+        self.path = Path(path)
+        # one connection shared by a session's threads (see _multipage_commit_grabber)
+        self.lock = threading.Lock()
+        self.conn: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Connection to the store, opened on first call; call with self.lock held."""
+        if self.conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL
+                )
+                """
+            )
+            self.conn.commit()
+        return self.conn
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def get(self, url: str) -> tuple[str | None, str | None, dict, bytes] | None:
+        with self.lock:
+            row = (
+                self.connect()
+                .execute(
+                    "SELECT etag, last_modified, headers, body FROM responses WHERE url = ?",
+                    (url,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        etag, last_modified, headers, body = row
+        return etag, last_modified, json.loads(headers), zlib.decompress(body)
+
+    def put(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        headers: dict,
+        body: bytes,
+    ) -> None:
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (
+                        url,
+                        etag,
+                        last_modified,
+                        json.dumps(headers),
+                        zlib.compress(body),
+                    ),
+                )
+
+
+class ConditionalHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that adds If-None-Match / If-Modified-Since to GET requests
+    for urls seen before, and turns a 304 reply back into the stored 200
+    response (with the 304's fresh rate limit headers), so calling code
+    doesn't need to know a cached body was used.
+    Responses served this way have `from_etag_cache = True`.
+    """
+
+    def __init__(self, etag_store: ETagStore, **kwargs) -> None:
+        self.etag_store = etag_store
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        stored = self.etag_store.get(request.url)
+        if stored is not None:
+            etag, last_modified, _, _ = stored
+            if etag is not None:
+                request.headers["If-None-Match"] = etag
+            if last_modified is not None:
+                request.headers["If-Modified-Since"] = last_modified
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and stored is not None:
+            _, _, headers, body = stored
+            cached = requests.Response()
+            cached.status_code = 200
+            cached.reason = "OK"
+            cached.headers = CaseInsensitiveDict(headers)
+            for header, value in response.headers.items():
+                if header.lower().startswith("x-ratelimit"):
+                    cached.headers[header] = value
+            cached._content = body
+            cached._content_consumed = True
+            cached.encoding = response.encoding
+            cached.url = response.url
+            cached.request = request
+            cached.connection = self
+            cached.elapsed = response.elapsed
+            cached.from_etag_cache = True
+            response.close()
+            return cached
+
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag is not None or last_modified is not None:
+                self.etag_store.put(
+                    url=request.url,
+                    etag=etag,
+                    last_modified=last_modified,
+                    headers=dict(response.headers),
+                    body=response.content,
+                )
+        response.from_etag_cache = False
+        return response
+
+    def close(self):
+        super().close()
+        self.etag_store.close()
+
+
+def make_github_session(
+    etag_cache_path: str | None = DEFAULT_ETAG_CACHE_PATH,
+    pool_maxsize: int = 10,
+    config_path: str | None = None,
+) -> requests.Session:
+    """
+    Set up a requests.Session with the retry settings used for all GH API
+    fetchers. Unless `etag_cache_path` is None, GET requests are sent as
+    conditional requests using validators stored at `etag_cache_path`.
+    If `config_path` is given, each request is authorised with whichever
+    of the config file's tokens has most rate limit left (see TokenPool);
+    this replaces any Authorization header passed in with the request.
+    Requests are also paced by the RateLimiters shared by all sessions
+    using that config file (one for REST, one for GraphQL), to spread
+    them over the rate limit window; 304 replies aren't charged.
+
+    :param etag_cache_path: path of SQLite file storing ETags and bodies; None disables conditional requests. (Default: 'data/etag_cache.sqlite')
+    :type: str | None
+    :param pool_maxsize: number of connections to keep for reuse, ie at least the number of threads sharing the session. (Default: 10)
+    :type: int
+    :param config_path: file path of config.cfg file with GitHub access token(s). (Default: None; no session-level auth)
+    :type: str | None
+    :returns: session with https:// adapter mounted
+    :rtype: requests.Session
+    """
+    s = requests.Session()
+    retries = Retry(
+        total=10,
+        connect=5,
+        read=3,
+        backoff_factor=1,
+        status_forcelist=[202, 502, 503, 504],
+    )
+    if etag_cache_path is None:
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=pool_maxsize)
+    else:
+        adapter = ConditionalHTTPAdapter(
+            etag_store=ETagStore(path=etag_cache_path),
+            max_retries=retries,
+            pool_maxsize=pool_maxsize,
+        )
+    s.mount("https://", adapter)
+    if config_path is not None:
+        s.auth = TokenPoolAuth(
+            get_token_pool(config_path),
+            rate_limiter=get_rate_limiter(config_path),
+            graphql_token_pool=get_token_pool(config_path, "graphql"),
+            graphql_rate_limiter=get_rate_limiter(config_path, "graphql"),
+        )
+    return s
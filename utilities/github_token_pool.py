@@ -0,0 +1,165 @@
+"""Pool of GitHub access tokens, each request using the token with most rate limit remaining."""
+
+import threading
+from time import time
+from urllib.parse import urlparse
+
+from requests.auth import AuthBase
+
+import githubanalysis.processing.setup_github_auth as ghauth
+
+# GH API primary rate limit for authenticated requests per hour;
+# assumed for tokens until a response says otherwise.
+DEFAULT_RATE_LIMIT = 5000
+
+
+def request_resource(url: str) -> str:
+    """GH rate limit resource ('core' or 'graphql') that a request to `url` counts against."""
+    return "graphql" if urlparse(url).path.rstrip("/").endswith("/graphql") else "core"
+
+
+class TokenPool:
+    """
+    Tracks `X-RateLimit-Remaining` / `X-RateLimit-Reset` per token from
+    responses, and hands out the token with the most requests left.
+    Each pool tracks one rate limit `resource` ('core' REST or 'graphql'),
+    as GitHub counts those separately.
+    Thread safe, so one pool can be shared by all sessions in a process.
+    """
+
+    def __init__(self, tokens: list[str], resource: str = "core") -> None:
+        assert len(tokens) > 0, "TokenPool needs at least one token."
+        self.tokens = tokens
+        self.resource = resource
+        self.remaining: dict[str, int] = {token: DEFAULT_RATE_LIMIT for token in tokens}
+        self.reset: dict[str, int] = {token: 0 for token in tokens}
+        self.lock = threading.Lock()
+
+    def _headroom(self, token: str, now: float) -> int:
+        if self.reset[token] <= now:  # limit has reset since last seen
+            return DEFAULT_RATE_LIMIT
+        return self.remaining[token]
+
+    def choose(self) -> str:
+        """Token with most requests remaining (earliest reset if all are used up)."""
+        now = time()
+        with self.lock:
+            return max(
+                self.tokens,
+                key=lambda token: (self._headroom(token, now), -self.reset[token]),
+            )
+
+    def update(self, token: str, headers) -> None:
+        """Record rate limit state for `token` from response `headers`."""
+        # GraphQL and search have separate limits; only track this pool's one.
+        if headers.get("X-RateLimit-Resource", "core") != self.resource:
+            return
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        with self.lock:
+            self.remaining[token] = int(remaining)
+            self.reset[token] = int(reset)
+
+    def budget(self) -> int:
+        """Total requests remaining across all tokens."""
+        now = time()
+        with self.lock:
+            return sum(self._headroom(token, now) for token in self.tokens)
+
+    def next_reset(self) -> int:
+        """Epoch seconds of the earliest upcoming reset among the tokens."""
+        now = time()
+        with self.lock:
+            upcoming = [reset for reset in self.reset.values() if reset > now]
+        return min(upcoming, default=int(now))
+
+
+class TokenPoolAuth(AuthBase):
+    """
+    requests auth using a TokenPool: sets the Authorization header for each
+    request from the pool, and if a token turns out to be rate limited,
+    resends the request with another token that still has requests left.
+    Only when every token is used up does the 403/429 reach the caller
+    (where run_with_retries() waits for the reset).
+    GraphQL requests are authorised and paced from `graphql_token_pool`
+    and `graphql_rate_limiter` (if given), as their budget is separate.
+    Conditional requests answered 304 Not Modified don't count against
+    the rate limit, so their pacing charge is given back.
+    """
+
+    def __init__(
+        self,
+        token_pool: TokenPool,
+        rate_limiter=None,
+        graphql_token_pool: TokenPool | None = None,
+        graphql_rate_limiter=None,
+    ) -> None:
+        self.token_pool = token_pool
+        # utilities.github_rate_limiter.RateLimiter pacing each request, or None
+        self.rate_limiter = rate_limiter
+        self.graphql_token_pool = (
+            graphql_token_pool if graphql_token_pool is not None else token_pool
+        )
+        self.graphql_rate_limiter = graphql_rate_limiter
+
+    def pool_and_limiter(self, url: str) -> tuple:
+        """TokenPool and RateLimiter (or None) for the rate limit a request to `url` counts against."""
+        if request_resource(url) == "graphql":
+            return self.graphql_token_pool, self.graphql_rate_limiter
+        return self.token_pool, self.rate_limiter
+
+    def __call__(self, r):
+        token_pool, rate_limiter = self.pool_and_limiter(r.url)
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        r.headers["Authorization"] = "token " + token_pool.choose()
+        r.register_hook("response", self.handle_response)
+        return r
+
+    def handle_response(self, r, **kwargs):
+        token_pool, rate_limiter = self.pool_and_limiter(r.request.url)
+        token = r.request.headers["Authorization"].removeprefix("token ")
+        token_pool.update(token, r.headers)
+        if rate_limiter is not None and (
+            r.status_code == 304 or getattr(r, "from_etag_cache", False)
+        ):
+            rate_limiter.refund()
+
+        tries = len(token_pool.tokens) - 1
+        while (
+            tries > 0
+            and r.status_code in (403, 429)
+            and r.headers.get("X-RateLimit-Remaining") == "0"
+        ):
+            next_token = token_pool.choose()
+            if next_token == token:
+                break  # every token used up
+            tries -= 1
+            r.content  # consume content so connection can be released
+            r.close()
+            prep = r.request.copy()
+            prep.headers["Authorization"] = "token " + next_token
+            _r = r.connection.send(prep, **kwargs)
+            _r.history.append(r)
+            _r.request = prep
+            r, token = _r, next_token
+            token_pool.update(token, r.headers)
+        return r
+
+
+_token_pools: dict[tuple[str, str], TokenPool] = {}
+
+
+def get_token_pool(config_path: str, resource: str = "core") -> TokenPool:
+    """
+    Shared TokenPool of all tokens in config file at `config_path` for rate
+    limit `resource`, so every session in this process sees the same quota tracking.
+    """
+    if (config_path, resource) not in _token_pools:
+        _token_pools[(config_path, resource)] = TokenPool(
+            ghauth.setup_github_auth_tokens(config_path=config_path),
+            resource=resource,
+        )
+    return _token_pools[(config_path, resource)]
@@ -0,0 +1,120 @@
+"""Write and read raw GH API dumps as (optionally compressed) newline-delimited json, one record at a time."""
+
+import gzip
+import importlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# codec name: file extension
+NDJSON_CODECS = {
+    "none": ".ndjson",
+    "gzip": ".ndjson.gz",
+    "zstd": ".ndjson.zst",
+}
+
+# orjson (not in requirements.txt) decodes lines several times faster than json; used if installed
+if importlib.util.find_spec("orjson") is not None:
+    json_loads = importlib.import_module("orjson").loads
+else:
+    json_loads = json.loads
+
+
+def check_zstd():
+    """zstd needs the zstandard package, which isn't in requirements.txt."""
+    if importlib.util.find_spec("zstandard") is None:
+        raise ImportError(
+            "zstd compressed ndjson needs zstandard installed: `pip install zstandard`."
+        )
+
+
+def ndjson_path(path_stem: str, codec: str = "gzip") -> str:
+    """`path_stem` (path without extension) with the file extension for `codec`."""
+    assert (
+        codec in NDJSON_CODECS
+    ), f"codec must be one of {list(NDJSON_CODECS)}, not {codec}."
+    return f"{path_stem}{NDJSON_CODECS[codec]}"
+
+
+def open_ndjson(
+    path: str | Path, mode: str = "r", codec_from: str | Path | None = None
+):
+    """
+    Open `path` as text for reading ('r') or writing ('w'), (de)compressing
+    by its file extension (or that of `codec_from`, if given).
+    """
+    suffix = Path(codec_from if codec_from is not None else path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    if suffix == ".zst":
+        check_zstd()
+        zstandard = importlib.import_module("zstandard")
+        return zstandard.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NDJSONWriter:
+    """
+    Write records one json object per line as they arrive, so whole
+    dumps are never held in memory or serialised in one go.
+    Lines are written to `<path>.part`, which is moved to `path` only
+    when the writer is closed without error: a failed run never leaves a
+    partial file behind that a rerun would take as complete.
+
+    Example:
+
+    with NDJSONWriter('data/all-issues_JeschkeLab-DeerLab_2024-10-17.ndjson.gz') as writer:
+        for page in pages:
+            writer.write_many(page)
+    """
+
+    path: Path
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.part_path = self.path.with_name(f"{self.path.name}.part")
+        self._file = open_ndjson(self.part_path, "w", codec_from=self.path)
+        self.n_records = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self.n_records += 1
+
+    def write_many(self, records: Iterable) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> str:
+        """Finish the file and move it into place; returns its path."""
+        self._file.close()
+        os.replace(self.part_path, self.path)
+        return str(self.path)
+
+    def abort(self) -> None:
+        """Drop the partly written file."""
+        self._file.close()
+        self.part_path.unlink(missing_ok=True)
+
+
+def iter_ndjson(path: str | Path) -> Iterator:
+    """Records from ndjson file `path` one at a time (blank lines skipped)."""
+    with open_ndjson(path, "r") as ndjson_file:
+        for line in ndjson_file:
+            if line.strip():
+                yield json_loads(line)
+
+
+def read_ndjson(path: str | Path) -> list:
+    return list(iter_ndjson(path))
@@ -0,0 +1,128 @@
+"""Run a per-repo workflow function over many repos in a pool of worker processes."""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+
+import pandas as pd
+
+import utilities.get_default_logger as loggit
+from utilities.github_rate_limiter import get_rate_limiter
+
+_worker_logger: logging.Logger | None = None
+
+
+def _init_worker(log_location: str, log_prefix: str, config_path: str, n_workers: int):
+    """
+    Set up each worker process: its own log file, and a 1/n_workers share
+    of the GH API request pace so the workers together keep under the cap.
+    """
+    global _worker_logger
+    _worker_logger = loggit.get_default_logger(
+        console=False,
+        set_level_to="INFO",
+        log_name=f"{log_location}{log_prefix}_worker-{os.getpid()}_logs.txt",
+        in_notebook=False,
+    )
+    if os.path.exists(config_path):
+        for resource in ["core", "graphql"]:
+            get_rate_limiter(config_path, resource).share = 1 / n_workers
+
+
+def _run_one(single_repo_fn: Callable, repo_name: str, fn_kwargs: dict):
+    assert _worker_logger is not None, "worker not initialised"
+    _worker_logger.info(f"Trying to read repo {repo_name} data from GH API.")
+    start = time.time()
+    result = single_repo_fn(repo_name=repo_name, logger=_worker_logger, **fn_kwargs)
+    seconds = round(time.time() - start, 1)
+    _worker_logger.info(f"Completed repo data get for {repo_name} in {seconds}s.")
+    return result, seconds, os.getpid()
+
+
+def summarise_runs(rows: list[dict]) -> pd.DataFrame:
+    """Summary table of repo runs, failures first."""
+    summary = pd.DataFrame(
+        rows, columns=["repo_name", "status", "n_rows", "seconds", "worker"]
+    )
+    return summary.sort_values(["status", "repo_name"]).reset_index(drop=True)
+
+
+def run_repos_in_parallel(
+    repo_names: list[str],
+    single_repo_fn: Callable,
+    logger: logging.Logger,
+    n_workers: int = 4,
+    log_prefix: str = "run_workflow",
+    log_location: str = "logs/",
+    config_path: str = "githubanalysis/config.cfg",
+    **fn_kwargs,
+) -> tuple[dict[str, pd.DataFrame | None], pd.DataFrame]:
+    """
+    Run `single_repo_fn(repo_name=..., logger=..., **fn_kwargs)` for each
+    repo in `repo_names` across `n_workers` processes.
+    `single_repo_fn` should handle its own per-repo errors and return None
+    for failed repos (as the runners' single_repo_method() do); anything it
+    does raise is logged and the repo counted as failed, so one repo can't
+    stop the rest.
+
+    :param repo_names: repos to run, as 'owner/repo'
+    :type: list[str]
+    :param single_repo_fn: module-level (picklable) function to run per repo
+    :type: Callable
+    :param logger: logger for the main process
+    :type: logging.Logger
+    :param n_workers: number of worker processes (Default: 4)
+    :type: int
+    :param log_prefix: each worker logs to `<log_location><log_prefix>_worker-<pid>_logs.txt` (Default: 'run_workflow')
+    :type: str
+    :param log_location: path of location to write worker log files to (Default: 'logs/')
+    :type: str
+    :param config_path: config file whose tokens' rate limit budget workers share (Default: 'githubanalysis/config.cfg')
+    :type: str
+    :returns: dict of results keyed by repo name, and summary table with a row per repo
+    :rtype: tuple[dict, pd.DataFrame]
+    """
+    assert n_workers > 0, "n_workers must be at least 1."
+    collation_dict: dict[str, pd.DataFrame | None] = {}
+    rows = []
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(log_location, log_prefix, config_path, n_workers),
+    ) as executor:
+        futures = {
+            executor.submit(_run_one, single_repo_fn, repo, fn_kwargs): repo
+            for repo in repo_names
+        }
+        for n_done, future in enumerate(as_completed(futures), start=1):
+            repo = futures[future]
+            try:
+                result, seconds, worker = future.result()
+            except Exception as e:
+                logger.error(
+                    f"Encountered repo-getting-workflow-borking error in repo {repo}; error {e}"
+                )
+                result, seconds, worker = None, None, None
+            collation_dict[repo] = result
+            rows.append(
+                {
+                    "repo_name": repo,
+                    "status": "failed" if result is None else "ok",
+                    "n_rows": None if result is None else len(result),
+                    "seconds": seconds,
+                    "worker": worker,
+                }
+            )
+            logger.info(
+                f"Completed repo data get for {repo} ({n_done} of {len(repo_names)})."
+            )
+
+    summary = summarise_runs(rows)
+    n_failed = (summary["status"] == "failed").sum()
+    logger.info(
+        f"Ran {len(summary)} repos: {len(summary) - n_failed} succeeded, {n_failed} failed.\n{summary.to_string()}"
+    )
+    return collation_dict, summary